@@ -0,0 +1,49 @@
+"""
+Compares the time taken and the bytes read to anonymize a flows file and parse the anonymized flows file afterwards
+and to anonymize and parse it in a single pass (anonymize.anonymize_and_parse_file).
+
+Usage: python benchmarks/bench_anonymize_and_parse.py [FLOWS_FILE] [REPEAT]
+"""
+
+import contextlib as _contextlib
+import io as _io
+import tempfile as _tempfile
+from pathlib import Path
+
+import benchutils as _benchutils
+from pss_api_parser.backend import anonymize as _anonymize
+from pss_api_parser.backend import parse as _parse
+
+
+DEFAULT_REPEAT = 3
+
+
+def anonymize_then_parse(file_path: Path, output_folder: Path) -> tuple:
+    anonymized_file_path = _anonymize.anonymize_file(file_path, output_folder)
+    with _contextlib.redirect_stdout(_io.StringIO()):
+        return anonymized_file_path, _parse.parse_flows_file(str(anonymized_file_path))
+
+
+def measure(function, file_path: Path, output_folder: Path, repeat: int) -> tuple:
+    (anonymized_file_path, api_structure), seconds, *_ = _benchutils.measure(function, file_path, output_folder, repeat=repeat)
+    structure_file_path = output_folder / f"{function.__name__}.json"
+    _parse.store_structure_json(structure_file_path, api_structure)
+    return anonymized_file_path.stat().st_size, structure_file_path.read_bytes(), seconds
+
+
+def main(file_path: Path, repeat: int) -> None:
+    file_size = file_path.stat().st_size
+    print(f"Anonymizing and parsing {file_path}: {file_size} bytes, best of {repeat}")
+
+    with _tempfile.TemporaryDirectory() as output_folder:
+        anonymized_size, expected_result, two_passes = measure(anonymize_then_parse, file_path, Path(output_folder), repeat)
+        _, result, single_pass = measure(_anonymize.anonymize_and_parse_file, file_path, Path(output_folder), repeat)
+    if result != expected_result:
+        raise AssertionError("The parsed structures differ")
+
+    print(f"Anonymize, then parse: {two_passes:.3f} s, {file_size + anonymized_size} bytes read")
+    print(f"Single pass:           {single_pass:.3f} s, {file_size} bytes read ({two_passes / single_pass:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(*_benchutils.get_arguments(Path(_benchutils.EXAMPLE_FLOWS_FILE_PATH), DEFAULT_REPEAT))
@@ -0,0 +1,55 @@
+"""
+Compares the peak memory and time taken to scrub a base64-encoded, gzip-compressed response by inflating it as a whole
+and chunk by chunk (anonymize.anonymize_response_content).
+
+The response is made of the responses in the example capture, repeated to reach the size of the large responses of ShipService and UserService.
+
+Usage: python benchmarks/bench_anonymize_compressed_response.py [FLOWS_FILE] [SCALE]
+"""
+
+import base64 as _base64
+import zlib as _zlib
+
+import benchutils as _benchutils
+from pss_api_parser.backend import anonymize as _anonymize
+from pss_api_parser.backend import flowsreader as _flowsreader
+
+
+DEFAULT_SCALE = 5
+GZIP_WBITS = _zlib.MAX_WBITS | 16
+
+
+def anonymize_compressed_response_content_as_a_whole(content: bytes) -> bytes:
+    inflated_content = _zlib.decompress(_base64.b64decode(content), GZIP_WBITS)
+    compressor = _zlib.compressobj(wbits=GZIP_WBITS)
+    return _base64.b64encode(compressor.compress(_anonymize.anonymize_response_content(inflated_content)) + compressor.flush())
+
+
+def compress(content: bytes) -> bytes:
+    compressor = _zlib.compressobj(wbits=GZIP_WBITS)
+    return _base64.b64encode(compressor.compress(content) + compressor.flush())
+
+
+def measure(function, content: bytes) -> tuple:
+    result, seconds, _, peak = _benchutils.measure(function, content, trace_memory=True)
+    return result, seconds, peak - len(result)
+
+
+def main(file_path: str, scale: int) -> None:
+    inflated_content = (
+        b"".join(flow.response.content for flow in _flowsreader.read_flows(file_path) if flow.response and flow.response.content) * scale
+    )
+    content = compress(inflated_content)
+    print(f"Scrubbing a compressed response of {len(content) / 2**20:.1f} MiB ({len(inflated_content) / 2**20:.1f} MiB inflated)")
+
+    expected_result, as_a_whole, as_a_whole_peak = measure(anonymize_compressed_response_content_as_a_whole, content)
+    result, chunked, chunked_peak = measure(_anonymize.anonymize_response_content, content)
+    if _zlib.decompress(_base64.b64decode(result), GZIP_WBITS) != _zlib.decompress(_base64.b64decode(expected_result), GZIP_WBITS):
+        raise AssertionError("The scrubbed responses differ")
+
+    print(f"Inflating as a whole:     {as_a_whole:.3f} s, {as_a_whole_peak / 2**20:.1f} MiB peak besides the result")
+    print(f"Inflating chunk by chunk: {chunked:.3f} s, {chunked_peak / 2**20:.1f} MiB peak besides the result")
+
+
+if __name__ == "__main__":
+    main(*_benchutils.get_arguments(_benchutils.EXAMPLE_FLOWS_FILE_PATH, DEFAULT_SCALE))
@@ -0,0 +1,61 @@
+"""
+Compares the time taken to scrub the responses in the example capture by replacing each match in the whole decoded response (previous implementation)
+and in a single pass over the bytes (anonymize.anonymize_response_content).
+
+The responses can be scaled up by repeating their contents, like the large responses of ShipService and UserService.
+
+Usage: python benchmarks/bench_anonymize_response.py [FLOWS_FILE] [SCALE]
+"""
+
+import re as _re
+
+import benchutils as _benchutils
+from pss_api_parser.backend import anonymize as _anonymize
+from pss_api_parser.backend import flowsreader as _flowsreader
+from pss_api_parser.backend import utils as _utils
+
+
+DEFAULT_SCALE = 10
+RX_PROPERTIES = _re.compile("( (" + "|".join(_anonymize.__ENTITY_PROPERTY_NAMES) + ')="(.*?)")', _re.IGNORECASE | _re.MULTILINE)
+
+
+def anonymize_response_content_by_replacing(content: bytes) -> bytes:
+    # The implementation replaced by anonymize_response_content
+    response_content = content.decode("utf-8")
+    for match in RX_PROPERTIES.finditer(response_content):
+        matched_string, property_name, property_value = match.groups()
+        try:
+            int(property_value)
+            property_value = "0" * len(property_value)
+        except ValueError:
+            try:
+                _utils.parse_pss_datetime(property_value)
+                property_value = "2016-01-06T00:00:00"
+            except ValueError:
+                property_value = "x" * len(property_value)
+        response_content = response_content.replace(matched_string, f' {property_name}="{property_value}"')
+    return response_content.encode("utf-8")
+
+
+def anonymize_response_contents(function, contents: list) -> list:
+    return [function(content) for content in contents]
+
+
+def main(file_path: str, scale: int) -> None:
+    contents = [flow.response.content * scale for flow in _flowsreader.read_flows(file_path) if flow.response and flow.response.content]
+    match_count = sum(len(RX_PROPERTIES.findall(content.decode("utf-8"))) for content in contents)
+    print(
+        f"Scrubbing {len(contents)} responses from {file_path} repeated {scale}x: {sum(map(len, contents))} bytes, {match_count} confidential properties"
+    )
+
+    expected_result, replacing, *_ = _benchutils.measure(anonymize_response_contents, anonymize_response_content_by_replacing, contents)
+    result, single_pass, *_ = _benchutils.measure(anonymize_response_contents, _anonymize.anonymize_response_content, contents)
+    if result != expected_result:
+        raise AssertionError("The scrubbed responses differ")
+
+    print(f"Replacing each match: {replacing:.3f} s")
+    print(f"Single pass:          {single_pass:.3f} s ({replacing / single_pass:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*_benchutils.get_arguments(_benchutils.EXAMPLE_FLOWS_FILE_PATH, DEFAULT_SCALE))
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark for the data type classification of XML attribute and query parameter values.
+
+Usage: python benchmarks/bench_determine_data_type.py [FLOWS_FILE]
+"""
+
+import base64 as _base64
+import zlib as _zlib
+from xml.etree import ElementTree as _ElementTree
+
+from mitmproxy.io import FlowReader as _FlowReader
+
+import benchutils as _benchutils
+from pss_api_parser.backend import datatypes as _datatypes
+
+
+REPEAT = 3
+
+
+def classify(function, values: list) -> list:
+    return [function(value) for value in values]
+
+
+def read_values(file_path: str) -> list:
+    result = []
+    with open(file_path, "rb") as fp:
+        for flow in _FlowReader(fp).stream():
+            result.extend(flow.request.query.values())
+            if not flow.response or not flow.response.text:
+                continue
+            try:
+                root = _ElementTree.fromstring(flow.response.text)
+            except _ElementTree.ParseError:
+                root = _ElementTree.fromstring(_zlib.decompress(_base64.b64decode(flow.response.content), _zlib.MAX_WBITS | 32).decode("utf-8"))
+            for element in root.iter():
+                result.extend(element.attrib.values())
+    return result
+
+
+def main(file_path: str) -> None:
+    values = read_values(file_path)
+    print(f"Classifying {len(values)} values ({len(set(values))} distinct) from: {file_path}")
+
+    def determine_data_type_slow(value: str) -> str | None:
+        # The trial conversion only gets called for non-empty values
+        return _datatypes.__determine_str_data_type_slow(value) if value else None
+
+    mismatches = [value for value in values if _datatypes.determine_data_type(value) != determine_data_type_slow(value)]
+    if mismatches:
+        raise AssertionError(f"Classification differs for {len(mismatches)} values, e.g.: {mismatches[:5]}")
+
+    trial_conversion = _benchutils.measure(classify, determine_data_type_slow, values, repeat=REPEAT).seconds
+    uncached = _benchutils.measure(classify, _datatypes.__determine_str_data_type, values, repeat=REPEAT).seconds
+    cached = _benchutils.measure(classify, _datatypes.determine_data_type, values, repeat=REPEAT).seconds
+
+    print(f"Trial conversion:        {trial_conversion:.3f} s")
+    print(f"Recognizers, no cache:   {uncached:.3f} s ({trial_conversion / uncached:.1f}x)")
+    print(f"Recognizers with cache:  {cached:.3f} s ({trial_conversion / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*_benchutils.get_arguments(_benchutils.EXAMPLE_FLOWS_FILE_PATH))
@@ -0,0 +1,47 @@
+"""
+Reports the memory retained by parsed flow details with and without references to the original mitmproxy flows.
+
+Usage: python benchmarks/bench_flowdetails_memory.py [FLOWS_FILE]
+"""
+
+import gc as _gc
+import sys as _sys
+
+import benchutils as _benchutils
+from pss_api_parser.backend import parse as _parse
+from pss_api_parser.backend.flowdetails import PssFlowDetails
+
+
+def get_flow_details(file_path: str, keep_original_flows: bool) -> list:
+    result = list(
+        _parse.__get_flow_details_from_flow_records(_parse.__read_flow_records_from_file(file_path, keep_original_flows=keep_original_flows))
+    )
+    _gc.collect()
+    return result
+
+
+def measure_retained_flow_details(file_path: str, keep_original_flows: bool) -> tuple:
+    flow_details, _, retained, peak = _benchutils.measure(get_flow_details, file_path, keep_original_flows, trace_memory=True)
+    return len(flow_details), retained, peak
+
+
+def measure_parse_peak(file_path: str, keep_original_flows: bool) -> int:
+    return _benchutils.measure(lambda: _parse.parse_flows_file(file_path, keep_original_flows=keep_original_flows), trace_memory=True).peak
+
+
+def main(file_path: str) -> None:
+    print(f"Flows file: {file_path}")
+    print(f"PssFlowDetails instance size: {_sys.getsizeof(PssFlowDetails({}))} bytes (slotted, no __dict__)")
+
+    for keep_original_flows in (True, False):
+        label = "with original flows   " if keep_original_flows else "without original flows"
+        flow_count, retained, peak = measure_retained_flow_details(file_path, keep_original_flows)
+        print(f"All {flow_count} flow details {label}: {retained / 2**20:7.2f} MiB retained, {peak / 2**20:7.2f} MiB peak")
+
+    for keep_original_flows in (True, False):
+        label = "with original flows   " if keep_original_flows else "without original flows"
+        print(f"parse_flows_file {label}: {measure_parse_peak(file_path, keep_original_flows) / 2**20:7.2f} MiB peak")
+
+
+if __name__ == "__main__":
+    main(*_benchutils.get_arguments(_benchutils.EXAMPLE_FLOWS_FILE_PATH))
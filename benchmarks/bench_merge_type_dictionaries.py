@@ -0,0 +1,116 @@
+"""
+Compares the memory allocated and the time taken when widening the type dictionaries of all endpoints and entities in the examples
+by merging them pairwise (previous recursive implementation and merge_type_dictionaries) and in place (TypeDictionaryAccumulator).
+
+Each endpoint's and entity's type dictionaries get merged repeatedly, as when merging many captures of the same API.
+
+Usage: python benchmarks/bench_merge_type_dictionaries.py [REPEAT]
+"""
+
+import benchutils as _benchutils
+from pss_api_parser.backend import datatypes as _datatypes
+from pss_api_parser.backend import parse as _parse
+from pss_api_parser.backend import structurefile as _structurefile
+
+
+DEFAULT_REPEAT = 20
+EXAMPLES_STRUCTURE_FILE_PATHS = (
+    _benchutils.EXAMPLE_STRUCTURE_FILE_PATH,
+    "examples/pss_api_overrides.json",
+    "examples/pss_api_steam_anonymized.json",
+)
+TYPE_DICTIONARY_FIELDS = ("content_parameters", "content_structure", "query_parameters", "response_structure")
+
+
+def merge_type_dictionaries_recursive(d1: dict, d2: dict) -> dict:
+    # The implementation replaced by TypeDictionaryAccumulator
+    if d1 and not d2:
+        return dict(d1)
+    if not d1 and d2:
+        return dict(d2)
+
+    result = {}
+    result_names = set(d1.keys()).union(set(d2.keys()))
+    for name in result_names:
+        type1 = d1.get(name)
+        type2 = d2.get(name)
+        if type1 is None:
+            result[name] = type2
+        elif type2 is None:
+            result[name] = type1
+        elif isinstance(type1, dict) and isinstance(type2, dict):
+            result[name] = merge_type_dictionaries_recursive(type1, type2)
+        elif isinstance(type1, dict):
+            result[name] = type1
+        elif isinstance(type2, dict):
+            result[name] = type2
+        elif not isinstance(type1, str) or not isinstance(type2, str):
+            pass
+        elif _datatypes.TYPE_ORDER_LOOKUP.get(type1, 100) >= _datatypes.TYPE_ORDER_LOOKUP.get(type2, 100):
+            result[name] = type1
+        else:
+            result[name] = type2
+    return result
+
+
+def read_type_dictionaries() -> dict:
+    # Returns the type dictionaries by endpoint, field and entity, in the order they've been found
+    result = {}
+    for flow_details in _parse.__get_flow_details_from_flow_records(_parse.__read_flow_records_from_file(_benchutils.EXAMPLE_FLOWS_FILE_PATH)):
+        flow_dict = dict(flow_details)
+        for name in TYPE_DICTIONARY_FIELDS:
+            result.setdefault((flow_details.service, flow_details.endpoint, name), []).append(flow_dict[name] or {})
+
+    for file_path in EXAMPLES_STRUCTURE_FILE_PATHS:
+        structure_dict = _structurefile.read_structure_dict(file_path)
+        for service, endpoints in structure_dict.get("endpoints", {}).items():
+            for endpoint, flow_dict in endpoints.items():
+                for name in TYPE_DICTIONARY_FIELDS:
+                    result.setdefault((service, endpoint, name), []).append(flow_dict.get(name) or {})
+        for entity_name, properties in structure_dict.get("entities", {}).items():
+            result.setdefault((entity_name,), []).append(properties)
+    return result
+
+
+def merge_pairwise(type_dictionaries: dict, repeat: int, merge_function) -> dict:
+    result = {}
+    for key, dicts in type_dictionaries.items():
+        merged = {}
+        for _ in range(repeat):
+            for d in dicts:
+                merged = merge_function(merged, d)
+        result[key] = merged
+    return result
+
+
+def merge_in_place(type_dictionaries: dict, repeat: int) -> dict:
+    result = {}
+    for key, dicts in type_dictionaries.items():
+        accumulator = _datatypes.TypeDictionaryAccumulator()
+        for _ in range(repeat):
+            for d in dicts:
+                accumulator.add(d)
+        result[key] = accumulator.result
+    return result
+
+
+def main(repeat: int) -> None:
+    type_dictionaries = read_type_dictionaries()
+    print(f"Merging the type dictionaries of {len(type_dictionaries)} endpoint fields and entities {repeat} times")
+
+    expected_result, *recursive = _benchutils.measure(merge_pairwise, type_dictionaries, repeat, merge_type_dictionaries_recursive, trace_memory=True)
+    wrapper_result, *wrapper = _benchutils.measure(merge_pairwise, type_dictionaries, repeat, _datatypes.merge_type_dictionaries, trace_memory=True)
+    in_place_result, *in_place = _benchutils.measure(merge_in_place, type_dictionaries, repeat, trace_memory=True)
+    if not expected_result == wrapper_result == in_place_result:
+        raise AssertionError("The merged type dictionaries differ")
+
+    for label, (seconds, retained, peak) in (
+        ("Pairwise, recursive:             ", recursive),
+        ("Pairwise, merge_type_dictionaries:", wrapper),
+        ("In place, accumulator:           ", in_place),
+    ):
+        print(f"{label} {seconds:.3f} s, {retained / 2**20:6.2f} MiB retained, {peak / 2**20:6.2f} MiB peak")
+
+
+if __name__ == "__main__":
+    main(*_benchutils.get_arguments(DEFAULT_REPEAT))
@@ -0,0 +1,48 @@
+"""
+Compares the time taken and the peak memory allocated when storing a structure as JSON
+by dumping a sorted copy of it (previous implementation) and by writing it with the streaming writer (structurefile.store_structure_dict).
+
+The structure gets scaled up by deep copies of its services and entities under numbered names (see benchutils.scale_structure).
+
+Usage: python benchmarks/bench_store_structure_json.py [STRUCTURE_FILE] [SCALE]
+"""
+
+import json as _json
+import os as _os
+import tempfile as _tempfile
+
+import benchutils as _benchutils
+from pss_api_parser.backend import structurefile as _structurefile
+from pss_api_parser.backend import utils as _utils
+
+
+DEFAULT_SCALE = 100
+
+
+def store_sorted_copy(file_path: str, structure_dict: dict, compressed: bool) -> None:
+    # The implementation replaced by the streaming writer
+    indent, separators = (None, (",", ":")) if compressed else (2, (",", ": "))
+    with open(file_path, "w") as fp:
+        _json.dump(_utils.get_ordered_dict(structure_dict), fp, indent=indent, separators=separators)
+
+
+def main(file_path: str, scale: int) -> None:
+    structure_dict = _benchutils.scale_structure(_structurefile.read_structure_dict(file_path), scale)
+    print(f"Structure from {file_path} scaled up {scale}x")
+    with _tempfile.TemporaryDirectory() as temp_dir:
+        expected_file_path = _os.path.join(temp_dir, "expected.json")
+        actual_file_path = _os.path.join(temp_dir, "actual.json")
+        for compressed in (True, False):
+            sorted_copy = _benchutils.measure(store_sorted_copy, expected_file_path, structure_dict, compressed, trace_memory=True)
+            streaming = _benchutils.measure(_structurefile.store_structure_dict, actual_file_path, structure_dict, compressed, trace_memory=True)
+            with open(expected_file_path, "rb") as expected_fp, open(actual_file_path, "rb") as actual_fp:
+                if expected_fp.read() != actual_fp.read():
+                    raise AssertionError("The JSON files differ")
+
+            print(f"{'Compressed' if compressed else 'Indented'}, {_os.path.getsize(actual_file_path)} bytes:")
+            for label, measurement in (("  Sorted copy:", sorted_copy), ("  Streaming:  ", streaming)):
+                print(f"{label} {measurement.seconds:.3f} s, {measurement.peak / 2**20:7.2f} MiB peak")
+
+
+if __name__ == "__main__":
+    main(*_benchutils.get_arguments(_benchutils.EXAMPLE_STRUCTURE_FILE_PATH, DEFAULT_SCALE))
@@ -0,0 +1,45 @@
+"""
+Benchmark for loading and storing structure files as JSON and in the binary structure format.
+
+The structure gets scaled up by deep copies of its services and entities under numbered names (see benchutils.scale_structure).
+
+Usage: python benchmarks/bench_structure_file.py [STRUCTURE_FILE] [SCALE]
+"""
+
+import os as _os
+import tempfile as _tempfile
+
+import benchutils as _benchutils
+from pss_api_parser.backend import structurefile as _structurefile
+
+
+DEFAULT_SCALE = 100
+REPEAT = 3
+
+
+def main(file_path: str, scale: int) -> None:
+    structure_dict = _benchutils.scale_structure(_structurefile.read_structure_dict(file_path), scale)
+    with _tempfile.TemporaryDirectory() as temp_dir:
+        json_file_path = _os.path.join(temp_dir, "structure.json")
+        binary_file_path = _os.path.join(temp_dir, f"structure{_structurefile.BINARY_STRUCTURE_FILE_SUFFIX}")
+
+        store_json = _benchutils.measure(_structurefile.store_structure_dict, json_file_path, structure_dict, repeat=REPEAT).seconds
+        store_binary = _benchutils.measure(
+            lambda: _structurefile.store_structure_dict(binary_file_path, structure_dict, binary=True), repeat=REPEAT
+        ).seconds
+        load_json = _benchutils.measure(_structurefile.read_structure_dict, json_file_path, repeat=REPEAT).seconds
+        load_binary = _benchutils.measure(_structurefile.read_structure_dict, binary_file_path, repeat=REPEAT).seconds
+
+        if _structurefile.read_structure_dict(binary_file_path) != _structurefile.read_structure_dict(json_file_path):
+            raise AssertionError("The binary structure file differs from the JSON file")
+
+        print(f"Structure from {file_path} scaled up {scale}x")
+        print(f"JSON:    {_os.path.getsize(json_file_path):>10} bytes, store {store_json:.3f} s, load {load_json:.3f} s")
+        print(
+            f"Binary:  {_os.path.getsize(binary_file_path):>10} bytes, store {store_binary:.3f} s ({store_json / store_binary:.1f}x),"
+            f" load {load_binary:.3f} s ({load_json / load_binary:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(*_benchutils.get_arguments(_benchutils.EXAMPLE_STRUCTURE_FILE_PATH, DEFAULT_SCALE))
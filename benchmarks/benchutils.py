@@ -0,0 +1,65 @@
+"""
+Helpers shared by the benchmarks: their command line arguments, scaling up structures and measuring functions.
+"""
+
+import copy as _copy
+import gc as _gc
+import sys as _sys
+import tracemalloc as _tracemalloc
+from time import perf_counter as _perf_counter
+from typing import Any as _Any
+from typing import Callable as _Callable
+from typing import List as _List
+from typing import NamedTuple as _NamedTuple
+
+
+EXAMPLE_FLOWS_FILE_PATH = "examples/pss_api_steam_anonymized.flows"
+EXAMPLE_STRUCTURE_FILE_PATH = "examples/pss_api_complete_structure.json"
+
+
+class Measurement(_NamedTuple):
+    result: _Any
+    seconds: float  # The best time of all calls
+    retained: int  # The bytes still allocated after the last call, if memory has been traced
+    peak: int  # The peak of the bytes allocated during the last call, if memory has been traced
+
+
+def get_arguments(*defaults: _Any) -> _List[_Any]:
+    """
+    Returns the command line arguments, converted to the types of their defaults, or the defaults of the missing ones.
+    """
+    return [type(default)(_sys.argv[i]) if len(_sys.argv) > i else default for i, default in enumerate(defaults, 1)]
+
+
+def measure(function: _Callable[..., _Any], *args: _Any, repeat: int = 1, trace_memory: bool = False) -> Measurement:
+    """
+    Calls the function with the arguments repeat times and returns the result of the last call and the best time.
+    If trace_memory is True, the memory allocated gets traced during each call, which slows them down.
+    """
+    result = None
+    seconds = float("inf")
+    retained = peak = 0
+    for _ in range(repeat):
+        result = None  # The result of the previous call doesn't count as retained
+        _gc.collect()
+        if trace_memory:
+            _tracemalloc.start()
+        start = _perf_counter()
+        result = function(*args)
+        seconds = min(seconds, _perf_counter() - start)
+        if trace_memory:
+            retained, peak = _tracemalloc.get_traced_memory()
+            _tracemalloc.stop()
+    return Measurement(result, seconds, retained, peak)
+
+
+def scale_structure(structure_dict: dict, scale: int) -> dict:
+    """
+    Returns the structure with its services and entities copied under numbered names. The copies are deep copies, so no dicts are shared between them.
+    """
+    return {
+        "endpoints": {f"{service}{i}": _copy.deepcopy(endpoints) for i in range(scale) for service, endpoints in structure_dict["endpoints"].items()},
+        "entities": {
+            f"{entity_name}{i}": _copy.deepcopy(properties) for i in range(scale) for entity_name, properties in structure_dict["entities"].items()
+        },
+    }
@@ -0,0 +1,81 @@
+"""
+A mitmproxy addon that parses the PSS API structure from live traffic.
+
+Run it with mitmdump: mitmdump -s path/to/pss_api_parser/addon.py --set pss_structure_file=pss_api_structure.json
+"""
+
+import logging as _logging
+import time as _time
+from typing import Sequence as _Sequence
+
+from mitmproxy import ctx as _ctx
+from mitmproxy.http import HTTPFlow as _HTTPFlow
+
+# mitmproxy loads scripts by their file path, so this module can't use relative imports.
+from pss_api_parser.backend import endpointfilter as _endpointfilter
+from pss_api_parser.backend import parse as _parse
+from pss_api_parser.backend import responsecache as _responsecache
+
+
+class PssApiStructureAddon:
+    """
+    Merges each PSS API response passing through mitmproxy into an in-memory structure of the endpoints and entities.
+    The structure gets stored in the same format as 'pssapiparser parse flows' produces, at most every pss_flush_interval seconds and on shutdown.
+    """
+
+    def __init__(self) -> None:
+        self.accumulated_structure: _parse.AccumulatedApiStructure = _parse.create_accumulated_structure()
+        self.endpoint_filter: _endpointfilter.EndpointFilter = _endpointfilter.get_default_endpoint_filter()
+        self.response_cache: _responsecache.ResponseCache = _responsecache.ResponseCache()
+        self.__last_flush: float = _time.monotonic()
+        self.__pending_flow_count: int = 0
+
+    def load(self, loader) -> None:
+        loader.add_option("pss_structure_file", str, "pss_api_structure.json", "Path of the JSON file to store the parsed PSS API structure at.")
+        loader.add_option(
+            "pss_flush_interval", int, 60, "Minimum number of seconds between storing the parsed PSS API structure. 0 stores it after each flow."
+        )
+        loader.add_option("pss_uncompressed", bool, False, "Preserve whitespace in the stored PSS API structure.")
+        loader.add_option("pss_include", _Sequence[str], [], "Only parse PSS API endpoints matching these patterns (e.g. 'ItemService/*').")
+        loader.add_option("pss_exclude", _Sequence[str], [], "Skip PSS API endpoints matching these patterns.")
+
+    def configure(self, updated: set) -> None:
+        if "pss_include" in updated or "pss_exclude" in updated:
+            self.endpoint_filter = _endpointfilter.create_endpoint_filter(_ctx.options.pss_include, _ctx.options.pss_exclude)
+
+    def response(self, flow: _HTTPFlow) -> None:
+        try:
+            accumulated = _parse.accumulate_flow(
+                self.accumulated_structure, flow, endpoint_filter=self.endpoint_filter, response_cache=self.response_cache
+            )
+        except Exception as ex:
+            _logging.warning(f"Could not parse PSS API flow {flow.request.path}: {ex}")
+            return
+
+        if accumulated:
+            self.__pending_flow_count += 1
+            if _time.monotonic() - self.__last_flush >= _ctx.options.pss_flush_interval:
+                self.flush()
+
+    def done(self) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Stores the parsed structure, if flows have been parsed since it has been stored the last time.
+        """
+        self.__last_flush = _time.monotonic()
+        if not self.__pending_flow_count:
+            return
+
+        file_path = _ctx.options.pss_structure_file
+        api_structure = _parse.get_api_structure_from_accumulated_structure(self.accumulated_structure)
+        _parse.store_structure_json(file_path, api_structure, compressed=not _ctx.options.pss_uncompressed)
+        self.__pending_flow_count = 0
+        _logging.info(
+            f"Stored the PSS API structure parsed from {self.accumulated_structure['flow_count']} flows"
+            f" ({self.response_cache.hits} duplicates) at: {file_path}"
+        )
+
+
+addons = [PssApiStructureAddon()]
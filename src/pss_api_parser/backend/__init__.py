@@ -1,13 +1,44 @@
-from . import anonymize, enums, flowdetails, generate, merge, objectstructure, parse, utils
+from . import (
+    anonymize,
+    checkpoint,
+    datatypes,
+    endpointfilter,
+    enums,
+    flowdetails,
+    flowsindex,
+    flowsreader,
+    generate,
+    history,
+    merge,
+    objectstructure,
+    overrides,
+    parse,
+    propertytable,
+    structurediff,
+    structurefile,
+    utils,
+    xmlinference,
+)
 
 
 __all__ = [
     anonymize.__name__,
+    checkpoint.__name__,
+    datatypes.__name__,
+    endpointfilter.__name__,
     enums.__name__,
     flowdetails.__name__,
+    flowsindex.__name__,
+    flowsreader.__name__,
     generate.__name__,
+    history.__name__,
     merge.__name__,
     objectstructure.__name__,
+    overrides.__name__,
     parse.__name__,
+    propertytable.__name__,
+    structurediff.__name__,
+    structurefile.__name__,
     utils.__name__,
+    xmlinference.__name__,
 ]
@@ -1,12 +1,31 @@
+import binascii as _binascii
 import json as _json
+import os as _os
 import re as _re
+import zlib as _zlib
+from collections import deque as _deque
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
+from contextlib import contextmanager as _contextmanager
+from functools import lru_cache as _lru_cache
+from functools import partial as _partial
+from io import BytesIO as _BytesIO
+from itertools import groupby as _groupby
 from pathlib import Path
+from typing import BinaryIO as _BinaryIO
+from typing import Callable as _Callable
+from typing import Iterable as _Iterable
 from typing import List as _List
+from typing import Optional as _Optional
+from typing import Tuple as _Tuple
 
 from mitmproxy.http import HTTPFlow as _HTTPFlow
-from mitmproxy.io import FlowReader as _FlowReader
 from mitmproxy.io import FlowWriter as _FlowWriter
 
+from . import endpointfilter as _endpointfilter
+from . import flowsindex as _flowsindex
+from . import flowsreader as _flowsreader
+from . import parse as _parse
+from . import responsecache as _responsecache
 from . import utils as _utils
 
 
@@ -44,24 +63,118 @@ __QUERY_PARAM_NAMES = [
     "steamid",
     "ticket",
 ]
+__PROPERTY_NAME_FIRST_LETTERS = "".join(sorted({name[0] for name in __ENTITY_PROPERTY_NAMES}))
+# The lookahead for the first letters of the property names lets the scan skip most spaces quickly
 __RX_PROPERTIES: _re.Pattern = _re.compile(
-    "( (" + "|".join(__ENTITY_PROPERTY_NAMES) + ')="(.*?)")',
+    (f" (?=[{__PROPERTY_NAME_FIRST_LETTERS}])(" + "|".join(__ENTITY_PROPERTY_NAMES) + ')="([^"\n]*)"').encode("utf-8"),
     _re.IGNORECASE | _re.MULTILINE,
 )
+__ANONYMIZED_DATETIME = "2016-01-06T00:00:00"
+__CACHE_MAX_VALUE_LENGTH = 32
+__CACHE_SIZE = 4096
+__FLOW_CHUNK_BYTES = 16 * 1024 * 1024
+__FLOW_CHUNK_SIZE = 64
+# Compressed responses get decoded in chunks of this many base64 characters (a multiple of 4) and inflated into chunks of at most this many bytes
+__BASE64_CHUNK_SIZE = 64 * 1024
+__INFLATED_CHUNK_SIZE = 256 * 1024
+__GZIP_MAGIC = b"\x1f\x8b"
+# Like base64.b64decode, which parse uses, whitespace (e.g. line breaks) in base64-encoded content gets ignored
+__RX_BASE64_CONTENT: _re.Pattern = _re.compile(rb"[A-Za-z0-9+/=\s]+")
+__RX_BASE64_WHITESPACE: _re.Pattern = _re.compile(rb"\s+")
+__MAX_LENGTH_BASE64_HEADER = 64
+
+
+ProgressCallback = _Callable[[int, int], None]
+FilesProgressCallback = _Callable[[int, int, int], None]
 
 
 # ---------- Functions ----------
 
 
-def anonymize_file(file_path: Path, output_folder: Path) -> Path:
-    output_file_name = f"{file_path.stem}_anonymized{file_path.suffix}"
-    output_file_path = output_folder / output_file_name
-    anonymized_flows = anynomize_flows(file_path)
+def anonymize_file(
+    file_path: Path, output_folder: Path, endpoints: _Optional[_List[str]] = None, progress: _Optional[ProgressCallback] = None
+) -> Path:
+    """
+    Anonymizes the flows file flow by flow into '<name>_anonymized<suffix>' in the output folder, so only one flow is held in memory at a time.
+    If a progress callback is given, it gets called after each flow with the number of flows written and the position in the flows file read up to.
+    """
+    output_file_path = get_anonymized_file_path(file_path, output_folder)
+    end_offset = [0]
+    anonymized_flows = iter_anonymized_flows(file_path, endpoints=endpoints, end_offset=end_offset)
+    if progress:
+        anonymized_flows = __report_progress(anonymized_flows, end_offset, progress)
     store_flows(output_file_path, anonymized_flows)
     return output_file_path
 
 
-def anonymize_flow(flow: _HTTPFlow) -> _HTTPFlow:
+def anonymize_and_parse_file(
+    file_path: Path,
+    output_folder: Path,
+    endpoints: _Optional[_List[str]] = None,
+    include_patterns: _Optional[_List[str]] = None,
+    exclude_patterns: _Optional[_List[str]] = None,
+    stable_row_count: _Optional[int] = None,
+    progress: _Optional[ProgressCallback] = None,
+) -> _Tuple[Path, _parse.ApiStructure]:
+    """
+    Anonymizes the flows file like anonymize_file and parses the anonymized flows on the way, so each flow gets read and decoded only once.
+    Returns the path of the anonymized flows file and the parsed services and endpoints, which are the same as when parsing the anonymized flows file (see parse.parse_flows_file).
+    Include and exclude patterns and stable_row_count only apply to the parsing, all flows (of the selected endpoints) get anonymized.
+    """
+    output_file_path = get_anonymized_file_path(file_path, output_folder)
+    endpoint_filter = _endpointfilter.create_endpoint_filter(include_patterns, exclude_patterns)
+    accumulated_structure = _parse.create_accumulated_structure()
+    response_cache = _responsecache.ResponseCache()
+    end_offset = [0]
+    record_offsets = _flowsindex.get_record_offsets(file_path, endpoints) if endpoints else None
+    flows = _flowsreader.read_flows(file_path, end_offset=end_offset, record_offsets=record_offsets)
+    anonymized_flows = __anonymize_and_accumulate_flows(flows, accumulated_structure, endpoint_filter, response_cache, stable_row_count)
+    if progress:
+        anonymized_flows = __report_progress(anonymized_flows, end_offset, progress)
+    store_flows(output_file_path, anonymized_flows)
+    return output_file_path, _parse.get_api_structure_from_accumulated_structure(accumulated_structure)
+
+
+def anonymize_files(
+    file_paths: _List[Path],
+    output_folder: Path,
+    endpoints: _Optional[_List[str]] = None,
+    jobs: int = 1,
+    progress: _Optional[FilesProgressCallback] = None,
+) -> _List[Path]:
+    """
+    Anonymizes the flows files into '<name>_anonymized<suffix>' in the output folder (see anonymize_file) and returns the paths of the anonymized files.
+
+    With more than one job, chunks of flows of all files get anonymized by a pool of worker processes, while the anonymized flows get written file by file in their original order.
+    Only a few chunks per job are held in memory at a time.
+    If a progress callback is given, it gets called with the index of the file, the number of flows written and the position in the flows file read up to,
+    after each flow or, with more than one job, after each chunk of flows.
+    """
+    if jobs <= 1:
+        return [
+            anonymize_file(file_path, output_folder, endpoints=endpoints, progress=_partial(progress, file_index) if progress else None)
+            for file_index, file_path in enumerate(file_paths)
+        ]
+
+    result = [get_anonymized_file_path(file_path, output_folder) for file_path in file_paths]
+    with _ProcessPoolExecutor(max_workers=jobs) as executor:
+        anonymized_chunks = __anonymize_flow_chunks_in_parallel(executor, file_paths, endpoints, jobs)
+        for file_index, file_chunks in _groupby(anonymized_chunks, key=lambda chunk: chunk[0]):
+            flow_count = 0
+            with __open_replacement_file(result[file_index]) as fp:
+                for _, data, chunk_flow_count, end_offset in file_chunks:
+                    fp.write(data)
+                    flow_count += chunk_flow_count
+                    if progress:
+                        progress(file_index, flow_count, end_offset)
+    return result
+
+
+def anonymize_flow(flow: _HTTPFlow, inflated_response_chunks: _Optional[_List[bytes]] = None) -> _HTTPFlow:
+    """
+    Anonymizes the query parameters, the request content and the response of the flow in place.
+    If inflated_response_chunks is given, the scrubbed chunks of a base64-encoded, compressed response get appended to it, as they get inflated anyway.
+    """
     flow.server_conn.sockname = (None, None)
 
     for query_param_name, query_param_value in flow.request.query.items():
@@ -112,37 +225,287 @@ def anonymize_flow(flow: _HTTPFlow) -> _HTTPFlow:
 
         flow.request.content = request_content.encode("utf-8")
 
-    response_content = ""
     if flow.response and flow.response.content:
-        response_content = flow.response.content.decode("utf-8")
-        matches = __RX_PROPERTIES.finditer(response_content)
-        for match in matches:
-            matched_string, property_name, property_value = match.groups()
-            try:
-                int(property_value)
-                property_value = "0" * len(property_value)
-            except ValueError:
-                try:
-                    _utils.parse_pss_datetime(property_value)
-                    property_value = "2016-01-06T00:00:00"
-                except ValueError:
-                    property_value = "x" * len(property_value)
-            response_content = response_content.replace(matched_string, f' {property_name}="{property_value}"')
-
-        flow.response.content = response_content.encode("utf-8")
+        response_content, replacement_count = __anonymize_response_content(flow.response.content, inflated_chunks=inflated_response_chunks)
+        if replacement_count:
+            flow.response.content = response_content
 
     return flow
 
 
-def anynomize_flows(file_path: str) -> _List[_HTTPFlow]:
-    with open(file_path, "rb") as fp:
-        flow_reader: _FlowReader = _FlowReader(fp)
-        flows = [anonymize_flow(flow) for flow in flow_reader.stream()]
-    return flows
+def anonymize_response_content(content: bytes) -> bytes:
+    """
+    Replaces the values of confidential properties (XML attributes) in a response: integers by zeros, dates by a fixed date and other values by 'x's of the same length.
+    Base64-encoded, gzip- or zlib-compressed responses get inflated, scrubbed and compressed again chunk by chunk and keep their encoding.
+    """
+    return __anonymize_response_content(content)[0]
+
 
+def anynomize_flows(file_path: str, endpoints: _Optional[_List[str]] = None) -> _List[_HTTPFlow]:
+    return list(iter_anonymized_flows(file_path, endpoints=endpoints))
 
-def store_flows(file_path: str, flows: _List[_HTTPFlow]) -> None:
-    with open(file_path, "wb") as fp:
+
+def get_anonymized_file_path(file_path: Path, output_folder: Path) -> Path:
+    return output_folder / f"{file_path.stem}_anonymized{file_path.suffix}"
+
+
+def iter_anonymized_flows(file_path: str, endpoints: _Optional[_List[str]] = None, end_offset: _Optional[_List[int]] = None) -> _Iterable[_HTTPFlow]:
+    """
+    Reads and anonymizes the flows one by one.
+    If endpoints ('Service/Endpoint') are given, only their flows get read, looked up in the index of the flows file.
+    If end_offset is given, its first item gets updated with the end position of each flow read.
+    """
+    record_offsets = _flowsindex.get_record_offsets(file_path, endpoints) if endpoints else None
+    for flow in _flowsreader.read_flows(file_path, end_offset=end_offset, record_offsets=record_offsets):
+        yield anonymize_flow(flow)
+
+
+def store_flows(file_path: Path | str, flows: _Iterable[_HTTPFlow]) -> int:
+    """
+    Writes the flows one by one to a temporary file next to the flows file, which replaces the flows file once all flows have been written.
+    Returns the number of flows written.
+    """
+    result = 0
+    with __open_replacement_file(file_path) as fp:
         flow_writer: _FlowWriter = _FlowWriter(fp)
         for flow in flows:
             flow_writer.add(flow)
+            result += 1
+    return result
+
+
+# ---------- Private Functions ----------
+
+
+def __anonymize_flow_chunk(file_path: Path, record_offsets: _List[int]) -> _Tuple[bytes, int]:
+    # Runs in a worker process and returns the serialized anonymized flows, so they can be written as they are
+    fp = _BytesIO()
+    flow_writer: _FlowWriter = _FlowWriter(fp)
+    flow_count = 0
+    for flow in _flowsreader.read_flows(file_path, record_offsets=record_offsets):
+        flow_writer.add(anonymize_flow(flow))
+        flow_count += 1
+    return fp.getvalue(), flow_count
+
+
+def __anonymize_flow_chunks_in_parallel(
+    executor: _ProcessPoolExecutor, file_paths: _List[Path], endpoints: _Optional[_List[str]], jobs: int
+) -> _Iterable[_Tuple[int, bytes, int, int]]:
+    # Yields the file index, the serialized anonymized flows, their number and the end position of each chunk in the order of the chunks.
+    pending_chunks = _deque()
+    for file_index, file_path in enumerate(file_paths):
+        for record_offsets, end_offset in __get_flow_chunks(file_path, endpoints):
+            pending_chunks.append((file_index, executor.submit(__anonymize_flow_chunk, file_path, record_offsets), end_offset))
+            if len(pending_chunks) >= jobs * 2:
+                chunk_file_index, future, chunk_end_offset = pending_chunks.popleft()
+                yield (chunk_file_index, *future.result(), chunk_end_offset)
+    while pending_chunks:
+        chunk_file_index, future, chunk_end_offset = pending_chunks.popleft()
+        yield (chunk_file_index, *future.result(), chunk_end_offset)
+
+
+def __anonymize_and_accumulate_flows(
+    flows: _Iterable[_HTTPFlow],
+    accumulated_structure: _parse.AccumulatedApiStructure,
+    endpoint_filter: _endpointfilter.EndpointFilter,
+    response_cache: _responsecache.ResponseCache,
+    stable_row_count: _Optional[int],
+) -> _Iterable[_HTTPFlow]:
+    # Compressed responses get inflated once: the scrubbed inflated response is passed on to the parser with the anonymized flow.
+    for flow in flows:
+        if not endpoint_filter.matches(flow.request.path):
+            yield anonymize_flow(flow)
+            continue
+
+        inflated_response_chunks: _List[bytes] = []
+        anonymize_flow(flow, inflated_response_chunks=inflated_response_chunks)
+        flow_record = _flowsreader.get_flow_record(flow)
+        if inflated_response_chunks:
+            flow_record = flow_record._replace(inflated_response_content=b"".join(inflated_response_chunks))
+        _parse.accumulate_flow_record(
+            accumulated_structure, flow_record, endpoint_filter=endpoint_filter, response_cache=response_cache, stable_row_count=stable_row_count
+        )
+        yield flow
+
+
+def __anonymize_compressed_content(
+    content: bytes, wbits: int, inflated_chunks: _Optional[_List[bytes]] = None, inflated_length: _Optional[_List[int]] = None
+) -> _Tuple[bytes, int]:
+    # The inflated content is never held in memory as a whole, unless its scrubbed chunks get collected. If nothing gets replaced, the original content is kept.
+    # If inflated_length is given, its first item gets updated with the number of bytes inflated so far.
+    body = content.strip()
+    body_start = len(content) - len(content.lstrip())
+    decompressor = _zlib.decompressobj(wbits)
+    compressor = _zlib.compressobj(wbits=wbits)
+    encoded_chunks: _List[bytes] = []
+    unencoded = b""
+    replacement_count = 0
+    for inflated_chunk in __iter_xml_chunks(__iter_inflated_chunks(body, decompressor, inflated_length)):
+        scrubbed_chunk, chunk_replacement_count = __RX_PROPERTIES.subn(__anonymize_property, inflated_chunk)
+        replacement_count += chunk_replacement_count
+        if inflated_chunks is not None:
+            inflated_chunks.append(scrubbed_chunk)
+        unencoded += compressor.compress(scrubbed_chunk)
+        # Base64 encodes groups of 3 bytes, so the rest waits for the next chunk
+        encodable_length = len(unencoded) - len(unencoded) % 3
+        encoded_chunks.append(_binascii.b2a_base64(unencoded[:encodable_length], newline=False))
+        unencoded = unencoded[encodable_length:]
+
+    if not replacement_count:
+        return content, 0
+    encoded_chunks.append(_binascii.b2a_base64(unencoded + compressor.flush(), newline=False))
+    encoded_body = __wrap_base64_lines(b"".join(encoded_chunks), body)
+    return content[:body_start] + encoded_body + content[body_start + len(body) :], replacement_count
+
+
+def __anonymize_property(match: _re.Match) -> bytes:
+    property_name, property_value = match.groups()
+    if len(property_value) <= __CACHE_MAX_VALUE_LENGTH:
+        property_value = __anonymize_property_value_cached(property_value)
+    else:
+        property_value = __anonymize_property_value(property_value)
+    return b" " + property_name + b'="' + property_value + b'"'
+
+
+def __anonymize_response_content(content: bytes, inflated_chunks: _Optional[_List[bytes]] = None) -> _Tuple[bytes, int]:
+    # Returns the scrubbed content and the number of replacements.
+    # Base64 content that only starts like compressed data, so that nothing can be inflated from it, gets scanned as it is.
+    # Compressed content that can't be inflated completely raises an error instead of being passed on unscrubbed.
+    wbits = __get_compression_wbits(content)
+    if wbits is None:
+        return __RX_PROPERTIES.subn(__anonymize_property, content)
+    inflated_length = [0]
+    try:
+        return __anonymize_compressed_content(content, wbits, inflated_chunks=inflated_chunks, inflated_length=inflated_length)
+    except (_binascii.Error, _zlib.error) as ex:
+        if not inflated_length[0]:
+            return __RX_PROPERTIES.subn(__anonymize_property, content)
+        raise ValueError(f"The response looks like base64-encoded compressed data, but could not be inflated to scrub it: {ex}") from ex
+
+
+def __anonymize_property_value(value: bytes) -> bytes:
+    # The value gets masked character by character, so it's decoded first
+    value = value.decode("utf-8", "surrogateescape")
+    try:
+        int(value)
+        return b"0" * len(value)
+    except ValueError:
+        pass
+    try:
+        _utils.parse_pss_datetime(value)
+        return __ANONYMIZED_DATETIME.encode("utf-8")
+    except ValueError:
+        return b"x" * len(value)
+
+
+@_lru_cache(maxsize=__CACHE_SIZE)
+def __anonymize_property_value_cached(value: bytes) -> bytes:
+    return __anonymize_property_value(value)
+
+
+def __get_flow_chunks(file_path: Path, endpoints: _Optional[_List[str]]) -> _Iterable[_Tuple[_List[int], int]]:
+    # Yields the record offsets and the end position of each chunk of flows. There's at least one (empty) chunk per file, so that each file gets written.
+    selected_offsets = set(_flowsindex.get_record_offsets(file_path, endpoints)) if endpoints else None
+    record_offsets: _List[int] = []
+    chunk_bytes = 0
+    chunk_count = 0
+    end_offset = 0
+    for summary in _flowsreader.read_flow_record_summaries(file_path):
+        end_offset = summary.offset + summary.length
+        if selected_offsets is not None and summary.offset not in selected_offsets:
+            continue
+        record_offsets.append(summary.offset)
+        chunk_bytes += summary.length
+        if len(record_offsets) >= __FLOW_CHUNK_SIZE or chunk_bytes >= __FLOW_CHUNK_BYTES:
+            yield record_offsets, end_offset
+            record_offsets = []
+            chunk_bytes = 0
+            chunk_count += 1
+    if record_offsets or not chunk_count:
+        yield record_offsets, end_offset
+
+
+def __get_compression_wbits(content: bytes) -> _Optional[int]:
+    # Checks the header of the base64-decoded content for gzip or zlib data, like zlib does for MAX_WBITS | 32 (see parse)
+    if not __RX_BASE64_CONTENT.fullmatch(content):
+        return None
+    try:
+        header = _binascii.a2b_base64(__RX_BASE64_WHITESPACE.sub(b"", content[:__MAX_LENGTH_BASE64_HEADER])[:4])
+    except _binascii.Error:
+        return None
+    if header.startswith(__GZIP_MAGIC):
+        return _zlib.MAX_WBITS | 16
+    if len(header) >= 2 and header[0] & 0x0F == _zlib.DEFLATED and int.from_bytes(header[:2], "big") % 31 == 0:
+        return _zlib.MAX_WBITS
+    return None
+
+
+def __iter_inflated_chunks(body: bytes, decompressor, inflated_length: _Optional[_List[int]] = None) -> _Iterable[bytes]:
+    # Data after the end of the compressed stream gets ignored like by zlib.decompress (see parse)
+    # If inflated_length is given, its first item gets updated with the number of bytes inflated so far.
+    undecoded = b""
+    for start in range(0, len(body), __BASE64_CHUNK_SIZE):
+        undecoded += __RX_BASE64_WHITESPACE.sub(b"", body[start : start + __BASE64_CHUNK_SIZE])
+        # Base64 decodes groups of 4 characters, so the rest waits for the next chunk
+        decodable_length = len(undecoded) - len(undecoded) % 4
+        compressed_chunk = _binascii.a2b_base64(undecoded[:decodable_length])
+        undecoded = undecoded[decodable_length:]
+        while compressed_chunk and not decompressor.eof:
+            inflated_chunk = decompressor.decompress(compressed_chunk, __INFLATED_CHUNK_SIZE)
+            if inflated_length is not None:
+                inflated_length[0] += len(inflated_chunk)
+            yield inflated_chunk
+            compressed_chunk = decompressor.unconsumed_tail
+    if undecoded:
+        _binascii.a2b_base64(undecoded)
+    inflated_chunk = decompressor.flush()
+    if inflated_length is not None:
+        inflated_length[0] += len(inflated_chunk)
+    yield inflated_chunk
+    if not decompressor.eof:
+        raise _zlib.error("incomplete or truncated compressed data")
+
+
+def __iter_xml_chunks(chunks: _Iterable[bytes]) -> _Iterable[bytes]:
+    # Splits the content before the last '<' of each chunk. Attribute values can't contain '<', so no property gets split.
+    rest = b""
+    for chunk in chunks:
+        rest += chunk
+        split_position = rest.rfind(b"<")
+        if split_position > 0:
+            yield rest[:split_position]
+            rest = rest[split_position:]
+    yield rest
+
+
+def __wrap_base64_lines(encoded_content: bytes, original_content: bytes) -> bytes:
+    # Wraps the lines like the original content, if it has been wrapped (e.g. after 76 characters like MIME)
+    first_line_end = original_content.find(b"\n")
+    if first_line_end < 0:
+        return encoded_content
+    line_separator = b"\r\n" if original_content[first_line_end - 1 : first_line_end] == b"\r" else b"\n"
+    line_length = first_line_end + 1 - len(line_separator)
+    if line_length <= 0:
+        return encoded_content
+    return line_separator.join(encoded_content[start : start + line_length] for start in range(0, len(encoded_content), line_length))
+
+
+@_contextmanager
+def __open_replacement_file(file_path: Path | str) -> _Iterable[_BinaryIO]:
+    # Opens a temporary file next to the file, which replaces the file once it has been written completely.
+    file_path = Path(file_path)
+    temp_file_path = file_path.with_name(f"{file_path.name}.tmp")
+    try:
+        with open(temp_file_path, "wb") as fp:
+            yield fp
+        _os.replace(temp_file_path, file_path)
+    except BaseException:
+        temp_file_path.unlink(missing_ok=True)
+        raise
+
+
+def __report_progress(flows: _Iterable[_HTTPFlow], end_offset: _List[int], progress: ProgressCallback) -> _Iterable[_HTTPFlow]:
+    # Reports a flow once it has been passed on to be written
+    for flow_count, flow in enumerate(flows, 1):
+        yield flow
+        progress(flow_count, end_offset[0])
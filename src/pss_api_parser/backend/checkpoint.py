@@ -0,0 +1,81 @@
+import hashlib as _hashlib
+import json as _json
+import os as _os
+from pathlib import Path
+from typing import Optional as _Optional
+
+from . import utils as _utils
+
+
+# ----- Constants -----
+
+CHECKPOINT_FILE_SUFFIX = ".checkpoint.json"
+CHECKPOINT_VERSION = 2
+
+__HASH_BLOCK_SIZE = 64 * 1024
+
+
+# ----- Public Functions -----
+
+
+def get_checkpoint_file_path(flows_file_path: Path | str) -> Path:
+    flows_file_path = Path(flows_file_path)
+    return flows_file_path.with_name(f"{flows_file_path.name}{CHECKPOINT_FILE_SUFFIX}")
+
+
+def hash_file_blocks(file_path: Path | str, length: int) -> str:
+    """
+    Hashes the first and the last block of the first length bytes of the file, so checking a checkpoint takes the same time however large the file is.
+    """
+    result = _hashlib.sha256(length.to_bytes(8, "big"))
+    with open(file_path, "rb") as fp:
+        result.update(fp.read(min(length, __HASH_BLOCK_SIZE)))
+        tail_start = max(length - __HASH_BLOCK_SIZE, 0)
+        fp.seek(tail_start)
+        result.update(fp.read(length - tail_start))
+    return result.hexdigest()
+
+
+def read_checkpoint(flows_file_path: Path | str, settings: _Optional[dict] = None) -> _Optional[dict]:
+    """
+    Returns the checkpoint stored for the specified flows file, if it is still valid.
+    A checkpoint is valid, if the flows file still starts with the bytes that have been parsed before, checked by the first and the last block of these bytes (see hash_file_blocks).
+    If settings are given, the checkpoint must have been stored with the same settings.
+    """
+    checkpoint_file_path = get_checkpoint_file_path(flows_file_path)
+    if not checkpoint_file_path.is_file():
+        return None
+
+    try:
+        checkpoint = _utils.read_json(checkpoint_file_path)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(checkpoint, dict) or checkpoint.get("version") != CHECKPOINT_VERSION:
+        return None
+    if settings is not None and checkpoint.get("settings") != settings:
+        return None
+
+    offset = checkpoint.get("offset")
+    if not isinstance(offset, int) or not 0 <= offset <= _os.path.getsize(flows_file_path):
+        return None
+    if checkpoint.get("blocks_sha256") != hash_file_blocks(flows_file_path, offset):
+        return None
+    return checkpoint
+
+
+def store_checkpoint(flows_file_path: Path | str, offset: int, structure: dict, flow_count: int, settings: _Optional[dict] = None) -> Path:
+    checkpoint = {
+        "version": CHECKPOINT_VERSION,
+        "settings": settings or {},
+        "offset": offset,
+        "blocks_sha256": hash_file_blocks(flows_file_path, offset),
+        "flow_count": flow_count,
+        "structure": structure,
+    }
+    checkpoint_file_path = get_checkpoint_file_path(flows_file_path)
+    temp_file_path = checkpoint_file_path.with_name(f"{checkpoint_file_path.name}.tmp")
+    with open(temp_file_path, "w") as fp:
+        _json.dump(checkpoint, fp, separators=(",", ":"))
+    _os.replace(temp_file_path, checkpoint_file_path)
+    return checkpoint_file_path
@@ -0,0 +1,206 @@
+import re as _re
+import sys as _sys
+from calendar import monthrange as _monthrange
+from datetime import datetime as _datetime
+from functools import lru_cache as _lru_cache
+from typing import Any as _Any
+from typing import Dict as _Dict
+from typing import Optional as _Optional
+from typing import Tuple as _Tuple
+from typing import Union as _Union
+
+from . import utils as _utils
+
+
+# ----- Constants -----
+
+__CACHE_MAX_VALUE_LENGTH = 32
+__CACHE_SIZE = 65536
+
+__MAX_INT_DIGITS = 300  # Longer integers may not be convertible to float, leave them to the slow path
+
+__PSS_BOOL_VALUES = ("true", "false", "True", "False")
+
+# ASCII characters that can occur in values that are not of type 'str': numbers (incl. 'inf', 'infinity' and 'nan'), bools and datetimes
+__NON_STR_CHARACTERS = "0-9+\\-._:AaEeFfIiLlNnRrSsTtUuYyZz" + "".join(_re.escape(chr(i)) for i in range(128) if chr(i).isspace())
+
+__RX_DATETIME: _re.Pattern = _re.compile(r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.\d{1,6}Z?)?", _re.ASCII)
+__RX_FLOAT: _re.Pattern = _re.compile(r"[+-]?(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?|[+-]?\d+[eE][+-]?\d+", _re.ASCII)
+__RX_INT: _re.Pattern = _re.compile(rf"[+-]?\d{{1,{__MAX_INT_DIGITS}}}", _re.ASCII)
+__RX_STR_CHARACTER: _re.Pattern = _re.compile(f"[^{__NON_STR_CHARACTERS}]")
+
+TYPE_ORDER_LOOKUP: _Dict[str, int] = {
+    "str": 5,
+    "float": 4,
+    "int": 3,
+    "bool": 2,
+    "datetime": 1,
+    None: 0,
+}
+
+
+# ----- Public Functions -----
+
+
+def determine_data_type(value: _Any) -> _Optional[str]:
+    """
+    Returns the name of the data type of the given value: 'bool', 'datetime', 'float', 'int' or 'str'. Returns None for empty values.
+
+    Strings are classified by precompiled recognizers for the common shapes and only fall back to trial conversions for unusual values.
+    Results for short strings are cached.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        if len(value) <= __CACHE_MAX_VALUE_LENGTH:
+            return __determine_str_data_type_cached(value)
+        return __determine_str_data_type(value)
+    elif isinstance(value, bool):
+        return "bool"
+    elif isinstance(value, float):
+        return "float"
+    elif isinstance(value, int):
+        return "int"
+    elif isinstance(value, _datetime):
+        return "datetime"
+
+
+class TypeDictionaryAccumulator:
+    """
+    Widens the types in a type dictionary in place with the types of other type dictionaries, without recursion.
+
+    A name keeps the type ranked highest in TYPE_ORDER_LOOKUP (unknown types rank highest, the first one seen wins), nested dicts win over types
+    and values that are neither a str nor a dict get dropped. If second_overrides_first is True, the types of added dictionaries replace the current ones.
+    Nested dicts of the added dictionaries are shared with the result until they need to be widened, then they get copied, so added dictionaries never get modified.
+    """
+
+    __slots__ = ("__owned_dicts", "result", "second_overrides_first")
+
+    def __init__(self, d: _Optional[dict] = None, second_overrides_first: bool = False) -> None:
+        self.result: dict = {}
+        self.second_overrides_first: bool = second_overrides_first
+        self.__owned_dicts: _Dict[int, dict] = {id(self.result): self.result}  # The dicts in result that can be modified, by their ids
+        if d:
+            self.add(d)
+
+    def __getstate__(self) -> tuple:
+        return self.result, self.second_overrides_first, list(self.__owned_dicts.values())
+
+    def __setstate__(self, state: tuple) -> None:
+        self.result, self.second_overrides_first, owned_dicts = state
+        self.__owned_dicts = {id(owned_dict): owned_dict for owned_dict in owned_dicts}
+
+    def add(self, d: dict) -> None:
+        stack = [(self.result, d)]
+        while stack:
+            target, source = stack.pop()
+            for name, type2 in source.items():
+                type1 = target.get(name)
+                if type1 is None:
+                    if type2 is not None or name not in target:
+                        target[name] = _sys.intern(type2) if type(type2) is str else type2
+                elif type2 is not None and (type1 is not type2 or type(type1) is not str):  # The same interned type needs no widening
+                    nested_dicts = self.__widen_type(target, name, type1, type2)
+                    if nested_dicts:
+                        stack.append(nested_dicts)
+
+    def __get_owned_dict(self, parent: dict, name: str, d: dict) -> dict:
+        if id(d) in self.__owned_dicts:
+            return d
+        result = dict(d)
+        self.__owned_dicts[id(result)] = result
+        parent[name] = result
+        return result
+
+    def __widen_type(self, target: dict, name: str, type1: _Union[str, dict], type2: _Union[str, dict]) -> _Optional[_Tuple[dict, dict]]:
+        # Returns the nested dicts to widen next, if both types are nested dicts
+        if isinstance(type1, dict):
+            if isinstance(type2, dict) and type2 and type2 is not type1:
+                return self.__get_owned_dict(target, name, type1), type2
+        elif isinstance(type2, dict):
+            target[name] = type2
+        elif not isinstance(type1, str) or not isinstance(type2, str):
+            del target[name]
+        elif type1 is not type2 and (self.second_overrides_first or TYPE_ORDER_LOOKUP.get(type2, 100) > TYPE_ORDER_LOOKUP.get(type1, 100)):
+            target[name] = _sys.intern(type2)
+        return None
+
+
+def merge_type_dictionaries(d1: dict, d2: dict, second_overrides_first: bool = False) -> dict:
+    accumulator = TypeDictionaryAccumulator(d1, second_overrides_first=second_overrides_first)
+    if d2:
+        accumulator.add(d2)
+    return accumulator.result
+
+
+# ----- Private Functions -----
+
+
+def __determine_str_data_type(value: str) -> _Optional[str]:
+    if not value:
+        return None
+
+    if value.isascii():
+        if __RX_STR_CHARACTER.search(value):
+            return "str"
+        if __RX_INT.fullmatch(value):
+            return "int"
+        if __RX_FLOAT.fullmatch(value):
+            return "float"
+        if value.lower() in __PSS_BOOL_VALUES:
+            return "bool"
+        match = __RX_DATETIME.fullmatch(value)
+        if match:
+            return "datetime" if __is_valid_datetime(*map(int, match.groups())) else "str"
+
+    return __determine_str_data_type_slow(value)
+
+
+@_lru_cache(maxsize=__CACHE_SIZE)
+def __determine_str_data_type_cached(value: str) -> _Optional[str]:
+    return __determine_str_data_type(value)
+
+
+def __determine_numeric_data_type(value: str) -> _Optional[str]:
+    # Returns None, if the value can neither be converted to an int nor to a float
+    try:
+        float_value = float(value)
+    except ValueError:
+        float_value = None
+
+    try:
+        int_value = int(value)
+    except ValueError:
+        return None if float_value is None else "float"
+
+    if float_value is None:
+        return "int"
+    try:
+        return "int" if float(int_value) == float_value else "float"
+    except OverflowError:  # int is too large to be converted to float, could be a bit-mask
+        return "str"
+
+
+def __determine_str_data_type_slow(value: str) -> str:
+    # Only called for non-empty values
+    numeric_data_type = __determine_numeric_data_type(value)
+    if numeric_data_type:
+        return numeric_data_type
+
+    if value.lower() in __PSS_BOOL_VALUES:
+        return "bool"
+
+    try:
+        _utils.parse_pss_datetime(value)
+        return "datetime"
+    except ValueError:
+        return "str"
+
+
+def __is_valid_datetime(year: int, month: int, day: int, hour: int, minute: int, second: int) -> bool:
+    if year < 1 or month < 1 or month > 12 or day < 1:
+        return False
+    if day > _monthrange(year, month)[1]:
+        return False
+    return hour < 24 and minute < 60 and second < 60
@@ -0,0 +1,86 @@
+import fnmatch as _fnmatch
+import json as _json
+import re as _re
+from functools import lru_cache as _lru_cache
+from importlib import resources as _resources
+from typing import Iterable as _Iterable
+from typing import Optional as _Optional
+from typing import Tuple as _Tuple
+
+
+# ----- Constants -----
+
+BLACKLISTED_ENDPOINTS_FILE_NAME = "blacklisted_endpoints.json"
+BLACKLISTED_SERVICES_FILE_NAME = "blacklisted_services.json"
+
+__PACKAGE_NAME = __package__.rpartition(".")[0]
+
+
+# ----- Public Functions -----
+
+
+class EndpointFilter:
+    """
+    Decides by the request path of a flow, whether it should be parsed. All rules get compiled into a single regular expression for included and one for excluded endpoints.
+
+    Services are excluded by name, endpoints by the start of their name. Include and exclude patterns are shell-style wildcards matched against 'Service/Endpoint'.
+    A pattern without '/' matches the endpoint name in any service.
+    """
+
+    __slots__ = ("__rx_excluded", "__rx_included")
+
+    def __init__(
+        self,
+        excluded_services: _Iterable[str] = (),
+        excluded_endpoint_prefixes: _Iterable[str] = (),
+        include_patterns: _Iterable[str] = (),
+        exclude_patterns: _Iterable[str] = (),
+    ) -> None:
+        excluded = [f"{_re.escape(service)}/[^/]*" for service in excluded_services]
+        excluded.extend(f"[^/]*/{_re.escape(endpoint_prefix)}[^/]*" for endpoint_prefix in excluded_endpoint_prefixes)
+        excluded.extend(EndpointFilter.translate_pattern(pattern) for pattern in exclude_patterns)
+        included = [EndpointFilter.translate_pattern(pattern) for pattern in include_patterns]
+
+        self.__rx_excluded: _Optional[_re.Pattern] = _re.compile("|".join(f"(?:{rx})" for rx in excluded)) if excluded else None
+        self.__rx_included: _Optional[_re.Pattern] = _re.compile("|".join(f"(?:{rx})" for rx in included)) if included else None
+
+    def matches(self, path: str) -> bool:
+        """
+        Returns True, if the flow with the given request path (e.g. '/ItemService/ListItemDesigns2?languageKey=en') should be parsed.
+        """
+        endpoint_path = path.split("?", 1)[0].removeprefix("/")
+        if self.__rx_included and not self.__rx_included.fullmatch(endpoint_path):
+            return False
+        return not (self.__rx_excluded and self.__rx_excluded.fullmatch(endpoint_path))
+
+    @staticmethod
+    def translate_pattern(pattern: str) -> str:
+        if "/" not in pattern:
+            pattern = f"*/{pattern}"
+        return _fnmatch.translate(pattern)
+
+
+def create_endpoint_filter(include_patterns: _Optional[_Iterable[str]] = None, exclude_patterns: _Optional[_Iterable[str]] = None) -> EndpointFilter:
+    """
+    Returns a filter excluding the blacklisted services and endpoints shipped with this package and the endpoints matching the given patterns.
+    If include patterns are given, only matching endpoints pass the filter.
+    """
+    return EndpointFilter(
+        excluded_services=read_package_json_list(BLACKLISTED_SERVICES_FILE_NAME),
+        excluded_endpoint_prefixes=read_package_json_list(BLACKLISTED_ENDPOINTS_FILE_NAME),
+        include_patterns=include_patterns or (),
+        exclude_patterns=exclude_patterns or (),
+    )
+
+
+@_lru_cache(maxsize=None)
+def get_default_endpoint_filter() -> EndpointFilter:
+    """
+    Returns a filter excluding the blacklisted services and endpoints shipped with this package.
+    """
+    return create_endpoint_filter()
+
+
+@_lru_cache(maxsize=None)
+def read_package_json_list(file_name: str) -> _Tuple[str, ...]:
+    return tuple(_json.loads(_resources.files(__PACKAGE_NAME).joinpath(file_name).read_text()))
@@ -1,4 +1,6 @@
 from typing import Dict as _Dict
+from typing import NamedTuple as _NamedTuple
+from typing import Optional as _Optional
 from typing import Union as _Union
 
 from mitmproxy.http import HTTPFlow as _HTTPFlow
@@ -9,7 +11,37 @@ from . import utils as _utils
 ResponseStructure = _Dict[str, _Union[str, "ResponseStructure"]]
 
 
+class PssFlowRecord(_NamedTuple):
+    """
+    The parts of a recorded flow that are required to parse it. Message bodies are stored as recorded (still content-encoded).
+    If a base64-encoded, compressed response has already been inflated (e.g. to anonymize it), the inflated response can be passed along, so it doesn't get inflated again.
+    """
+
+    method: str
+    path: str
+    request_content: _Optional[bytes]
+    request_content_encoding: _Optional[str]
+    response_content: _Optional[bytes]
+    response_content_encoding: _Optional[str]
+    response_content_type: str
+    original_flow: _Optional[_HTTPFlow] = None
+    inflated_response_content: _Optional[bytes] = None
+
+
 class PssFlowDetails:
+    __slots__ = (
+        "__content_parameters",
+        "__content_structure",
+        "__content_type",
+        "__endpoint",
+        "__method",
+        "__query_parameters",
+        "__response_gzipped",
+        "__response_structure",
+        "__service",
+        "__original_flow",
+    )
+
     def __init__(self, details: dict) -> None:
         self.__content_parameters: _utils.NestedDict = details.get("content_parameters", {})
         self.__content_structure: _utils.NestedDict = details.get("content_structure", {})
@@ -0,0 +1,131 @@
+import os as _os
+import sqlite3 as _sqlite3
+from contextlib import closing as _closing
+from pathlib import Path
+from typing import Iterable as _Iterable
+from typing import List as _List
+from typing import Optional as _Optional
+from typing import Tuple as _Tuple
+
+from . import flowsreader as _flowsreader
+
+
+# ----- Constants and type definitions -----
+
+EndpointSummary = _Tuple[str, str, int, int]  # service, endpoint, record count, total response size
+
+INDEX_FILE_SUFFIX = ".index.sqlite"
+INDEX_VERSION = 1
+
+__CREATE_TABLES = """
+CREATE TABLE info (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE records (
+    offset INTEGER PRIMARY KEY,
+    length INTEGER NOT NULL,
+    service TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    method TEXT NOT NULL,
+    response_size INTEGER
+);
+CREATE INDEX records_endpoint ON records (service, endpoint);
+"""
+__INSERT_BATCH_SIZE = 10000
+
+
+# ----- Public Functions -----
+
+
+def create_index(flows_file_path: Path | str) -> Path:
+    """
+    Walks the flows file once and stores the offset, length, service, endpoint, method and response size of each record in an SQLite file next to it.
+    Returns the path of the index file.
+    """
+    index_file_path = get_index_file_path(flows_file_path)
+    temp_file_path = index_file_path.with_name(f"{index_file_path.name}.tmp")
+    if temp_file_path.exists():
+        temp_file_path.unlink()
+
+    file_stat = _os.stat(flows_file_path)
+    with _closing(_sqlite3.connect(temp_file_path)) as connection:
+        connection.executescript(__CREATE_TABLES)
+        connection.executemany(
+            "INSERT INTO info (key, value) VALUES (?, ?)",
+            (("version", INDEX_VERSION), ("file_size", file_stat.st_size), ("file_mtime_ns", file_stat.st_mtime_ns)),
+        )
+        batch = []
+        for summary in _flowsreader.read_flow_record_summaries(flows_file_path):
+            service, _, endpoint = summary.path.split("?", 1)[0].removeprefix("/").partition("/")
+            batch.append((summary.offset, summary.length, service, endpoint, summary.method, summary.response_size))
+            if len(batch) >= __INSERT_BATCH_SIZE:
+                __insert_records(connection, batch)
+                batch = []
+        __insert_records(connection, batch)
+        connection.commit()
+    _os.replace(temp_file_path, index_file_path)
+    return index_file_path
+
+
+def get_endpoint_summaries(flows_file_path: Path | str) -> _List[EndpointSummary]:
+    """
+    Returns the number of records and the total response size per endpoint in the flows file, updating its index first, if necessary.
+    """
+    with _closing(__connect(update_index(flows_file_path))) as connection:
+        return connection.execute(
+            "SELECT service, endpoint, COUNT(*), COALESCE(SUM(response_size), 0) FROM records GROUP BY service, endpoint ORDER BY service, endpoint"
+        ).fetchall()
+
+
+def get_index_file_path(flows_file_path: Path | str) -> Path:
+    flows_file_path = Path(flows_file_path)
+    return flows_file_path.with_name(f"{flows_file_path.name}{INDEX_FILE_SUFFIX}")
+
+
+def get_record_offsets(flows_file_path: Path | str, endpoints: _Iterable[str]) -> _List[int]:
+    """
+    Returns the offsets of the records of the specified endpoints ('Service/Endpoint') in the flows file in ascending order, updating its index first, if necessary.
+    """
+    keys = [endpoint.partition("/")[::2] for endpoint in endpoints]
+    with _closing(__connect(update_index(flows_file_path))) as connection:
+        connection.execute("CREATE TEMP TABLE selected_endpoints (service TEXT NOT NULL, endpoint TEXT NOT NULL)")
+        connection.executemany("INSERT INTO selected_endpoints (service, endpoint) VALUES (?, ?)", keys)
+        rows = connection.execute(
+            "SELECT offset FROM records JOIN selected_endpoints USING (service, endpoint) ORDER BY offset",
+        ).fetchall()
+    return [offset for (offset,) in rows]
+
+
+def is_index_valid(flows_file_path: Path | str) -> bool:
+    """
+    Returns True, if an index exists for the flows file and the file hasn't been changed since the index has been created.
+    """
+    index_file_path = get_index_file_path(flows_file_path)
+    if not index_file_path.is_file():
+        return False
+
+    file_stat = _os.stat(flows_file_path)
+    try:
+        with _closing(__connect(index_file_path)) as connection:
+            info = dict(connection.execute("SELECT key, value FROM info").fetchall())
+    except _sqlite3.DatabaseError:
+        return False
+    return info == {"version": INDEX_VERSION, "file_size": file_stat.st_size, "file_mtime_ns": file_stat.st_mtime_ns}
+
+
+def update_index(flows_file_path: Path | str) -> Path:
+    """
+    Creates the index of the flows file, unless there's a valid one already. Returns the path of the index file.
+    """
+    if is_index_valid(flows_file_path):
+        return get_index_file_path(flows_file_path)
+    return create_index(flows_file_path)
+
+
+# ----- Private Functions -----
+
+
+def __connect(index_file_path: Path) -> _sqlite3.Connection:
+    return _sqlite3.connect(f"{index_file_path.resolve().as_uri()}?mode=ro", uri=True)
+
+
+def __insert_records(connection: _sqlite3.Connection, records: _List[_Tuple[int, int, str, str, str, _Optional[int]]]) -> None:
+    connection.executemany("INSERT INTO records (offset, length, service, endpoint, method, response_size) VALUES (?, ?, ?, ?, ?, ?)", records)
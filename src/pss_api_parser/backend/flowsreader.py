@@ -0,0 +1,305 @@
+import mmap as _mmap
+import os as _os
+from typing import BinaryIO as _BinaryIO
+from typing import Dict as _Dict
+from typing import Iterable as _Iterable
+from typing import List as _List
+from typing import NamedTuple as _NamedTuple
+from typing import Optional as _Optional
+from typing import Tuple as _Tuple
+
+from mitmproxy import exceptions as _mitmproxy_exceptions
+from mitmproxy import version as _mitmproxy_version
+from mitmproxy.flow import Flow as _Flow
+from mitmproxy.http import HTTPFlow as _HTTPFlow
+from mitmproxy.io import FlowReader as _FlowReader
+from mitmproxy.io import compat as _compat
+from mitmproxy.io import tnetstring as _tnetstring
+
+from .endpointfilter import EndpointFilter as _EndpointFilter
+from .flowdetails import PssFlowRecord as _PssFlowRecord
+
+
+# ----- Constants and type definitions -----
+
+
+class FlowRecordSummary(_NamedTuple):
+    """
+    The position of a record in a flows file and what it contains.
+    """
+
+    offset: int
+    length: int
+    method: str
+    path: str
+    response_size: _Optional[int]
+
+
+FLOW_FORMAT_VERSION = _mitmproxy_version.FLOW_FORMAT_VERSION
+
+__MAX_LENGTH_PREFIX_DIGITS = 12
+
+__TYPE_BYTES = ord(b",")
+__TYPE_DICT = ord(b"}")
+__TYPE_INT = ord(b"#")
+__TYPE_NULL = ord(b"~")
+__TYPE_STR = ord(b";")
+
+
+# ----- Public Functions -----
+
+
+def get_flow_record(flow: _HTTPFlow, keep_original_flow: bool = False) -> _PssFlowRecord:
+    return _PssFlowRecord(
+        method=flow.request.method,
+        path=flow.request.path,
+        request_content=flow.request.raw_content,
+        request_content_encoding=flow.request.headers.get("content-encoding"),
+        response_content=flow.response.raw_content if flow.response else None,
+        response_content_encoding=flow.response.headers.get("content-encoding") if flow.response else None,
+        response_content_type=flow.response.headers.get("content-type", "") if flow.response else "",
+        original_flow=flow if keep_original_flow else None,
+    )
+
+
+def read_flows(
+    file_path: str,
+    start_offset: int = 0,
+    end_offset: _Optional[_List[int]] = None,
+    record_offsets: _Optional[_Iterable[int]] = None,
+    allow_incomplete_end: bool = False,
+) -> _Iterable[_Flow]:
+    """
+    Yields the flows stored in a mitmproxy flows file, read by mitmproxy's FlowReader.
+    If end_offset is given, its first item gets updated with the end position of each record read.
+    If record offsets are given, only the records starting at these offsets get read (see flowsindex).
+    If allow_incomplete_end is True, reading stops before an incomplete record at the end of the file, which may still be being written (e.g. by mitmdump).
+    Otherwise an incomplete record raises a FlowReadException.
+    """
+    if not _os.path.isfile(file_path):
+        raise FileNotFoundError(f"The specified file could not be found at: {file_path}")
+
+    with open(file_path, "rb") as fp:
+        if record_offsets is None:
+            yield from __read_flows_from_offset(fp, file_path, start_offset, end_offset, allow_incomplete_end)
+        else:
+            yield from __read_flows_at_offsets(fp, record_offsets, end_offset)
+
+
+def read_flow_record_summaries(file_path: str) -> _Iterable[FlowRecordSummary]:
+    """
+    Yields the position, method, path and response size of each record in a mitmproxy flows file. No contents get copied.
+    """
+    for data, offset, start, end in __iter_records(file_path):
+        fields = __get_dict_elements(data, start, end)
+        if __is_current_http_record(data, fields):
+            request = __get_dict_elements(data, *fields[b"request"][:2])
+            method = __read_scalar(data, *request[b"method"]).decode("utf-8", "surrogateescape").upper()
+            path = __read_scalar(data, *request[b"path"]).decode("utf-8", "surrogateescape")
+            response_size = None
+            response_start, response_end, response_type = fields[b"response"]
+            if response_type == __TYPE_DICT:
+                content_start, content_end, content_type = __get_dict_elements(data, response_start, response_end)[b"content"]
+                if content_type == __TYPE_BYTES:
+                    response_size = content_end - content_start
+        else:
+            flow_record = get_flow_record(__get_flow_from_record(data, start, end))
+            method = flow_record.method
+            path = flow_record.path
+            response_size = len(flow_record.response_content) if flow_record.response_content is not None else None
+        yield FlowRecordSummary(offset=offset, length=end + 1 - offset, method=method, path=path, response_size=response_size)
+
+
+def read_flow_records(
+    file_path: str,
+    start_offset: int = 0,
+    end_offset: _Optional[_List[int]] = None,
+    endpoint_filter: _Optional[_EndpointFilter] = None,
+    record_offsets: _Optional[_Iterable[int]] = None,
+    allow_incomplete_end: bool = False,
+) -> _Iterable[_PssFlowRecord]:
+    """
+    Yields the flow records stored in a mitmproxy flows file without creating mitmproxy flow objects.
+
+    The memory-mapped file gets walked record by record and only the fields required for a flow record get copied out of it.
+    Records in other flow format versions than the one of the installed mitmproxy are loaded and migrated by mitmproxy.
+    If end_offset is given, its first item gets updated with the end position of each record read.
+    If an endpoint filter is given, flows not passing it are skipped before their contents get copied.
+    If record offsets are given, only the records starting at these offsets get read (see flowsindex).
+    If allow_incomplete_end is True, walking stops before an incomplete record at the end of the file, which may still be being written (e.g. by mitmdump).
+    Raises a ValueError, if the file is not a valid flows file or ends with an incomplete record otherwise.
+    """
+    records = __iter_records(file_path, start_offset=start_offset, record_offsets=record_offsets, allow_incomplete_end=allow_incomplete_end)
+    for data, _, start, end in records:
+        flow_record = __get_flow_record_from_record(data, start, end, endpoint_filter)
+        if end_offset is not None:
+            end_offset[0] = end + 1
+        if flow_record:
+            yield flow_record
+
+
+# ----- Private Functions -----
+
+
+def __get_flow_from_record(data: _mmap.mmap, start: int, end: int) -> _HTTPFlow:
+    # Lets mitmproxy load and migrate the record
+    return _Flow.from_state(_compat.migrate_flow(_tnetstring.parse(__TYPE_DICT, data[start:end])))
+
+
+def __get_flow_record_from_record(data: _mmap.mmap, start: int, end: int, endpoint_filter: _Optional[_EndpointFilter]) -> _Optional[_PssFlowRecord]:
+    fields = __get_dict_elements(data, start, end)
+    if not __is_current_http_record(data, fields):
+        flow = __get_flow_from_record(data, start, end)
+        if endpoint_filter and not endpoint_filter.matches(flow.request.path):
+            return None
+        return get_flow_record(flow)
+
+    request = __get_dict_elements(data, *fields[b"request"][:2])
+    path = __read_scalar(data, *request[b"path"]).decode("utf-8", "surrogateescape")
+    if endpoint_filter and not endpoint_filter.matches(path):
+        return None
+
+    response_start, response_end, response_type = fields[b"response"]
+    response = __get_dict_elements(data, response_start, response_end) if response_type == __TYPE_DICT else None
+    response_headers = __get_headers(data, *response[b"headers"][:2]) if response else {}
+    request_headers = __get_headers(data, *request[b"headers"][:2])
+    return _PssFlowRecord(
+        method=__read_scalar(data, *request[b"method"]).decode("utf-8", "surrogateescape").upper(),
+        path=path,
+        request_content=__read_scalar(data, *request[b"content"]),
+        request_content_encoding=request_headers.get("content-encoding"),
+        response_content=__read_scalar(data, *response[b"content"]) if response else None,
+        response_content_encoding=response_headers.get("content-encoding"),
+        response_content_type=response_headers.get("content-type", ""),
+    )
+
+
+def __get_dict_elements(data: _mmap.mmap, start: int, end: int) -> _Dict[bytes, _Tuple[int, int, int]]:
+    # Returns the positions and types of the values by their keys, without reading the values
+    result = {}
+    position = start
+    while position < end:
+        key_start, key_end, _ = __read_element(data, position)
+        value = __read_element(data, key_end + 1)
+        result[data[key_start:key_end]] = value
+        position = value[1] + 1
+    return result
+
+
+def __get_headers(data: _mmap.mmap, start: int, end: int) -> _Dict[str, str]:
+    # Header names are case-insensitive and the values of repeated headers get folded, like mitmproxy does
+    values: _Dict[str, _List[str]] = {}
+    for field_start, field_end, _ in __get_list_elements(data, start, end):
+        (name, value) = (
+            __read_scalar(data, *element).decode("utf-8", "surrogateescape") for element in __get_list_elements(data, field_start, field_end)
+        )
+        values.setdefault(name.lower(), []).append(value)
+    return {name: ", ".join(header_values) for name, header_values in values.items()}
+
+
+def __get_list_elements(data: _mmap.mmap, start: int, end: int) -> _Iterable[_Tuple[int, int, int]]:
+    position = start
+    while position < end:
+        element = __read_element(data, position)
+        yield element
+        position = element[1] + 1
+
+
+def __is_current_http_record(data: _mmap.mmap, fields: _Dict[bytes, _Tuple[int, int, int]]) -> bool:
+    version = __read_scalar(data, *fields[b"version"]) if b"version" in fields else None
+    return version == FLOW_FORMAT_VERSION and __read_scalar(data, *fields[b"type"]) == "http"
+
+
+def __is_cut_off(head: bytes, position: int, size: int) -> bool:
+    # Returns True, if the element starting with these bytes at the position exceeds the size of the data: its length prefix or data are cut off
+    length_prefix, colon, _ = head.partition(b":")
+    if not colon:
+        return len(head) <= __MAX_LENGTH_PREFIX_DIGITS and head.isdigit()
+    return length_prefix.isdigit() and position + len(length_prefix) + 1 + int(length_prefix) >= size
+
+
+def __is_incomplete_record(file_path: str, offset: int) -> bool:
+    with open(file_path, "rb") as fp:
+        fp.seek(offset)
+        return __is_cut_off(fp.read(__MAX_LENGTH_PREFIX_DIGITS + 1), offset, _os.fstat(fp.fileno()).st_size)
+
+
+def __iter_records(
+    file_path: str, start_offset: int = 0, record_offsets: _Optional[_Iterable[int]] = None, allow_incomplete_end: bool = False
+) -> _Iterable[_Tuple[_mmap.mmap, int, int, int]]:
+    # Yields the mapped file, the offset of each record and the start and end position of its data
+    if not _os.path.isfile(file_path):
+        raise FileNotFoundError(f"The specified file could not be found at: {file_path}")
+    if _os.path.getsize(file_path) <= start_offset:
+        return
+
+    with open(file_path, "rb") as fp, _mmap.mmap(fp.fileno(), 0, access=_mmap.ACCESS_READ) as data:
+        if record_offsets is None:
+            record_offsets = __iter_record_offsets(data, start_offset, allow_incomplete_end)
+        for offset in record_offsets:
+            start, end, data_type = __read_element(data, offset)
+            if data_type != __TYPE_DICT:
+                raise ValueError(f"not a flow record at byte {offset}")
+            yield data, offset, start, end
+
+
+def __iter_record_offsets(data: _mmap.mmap, start_offset: int, allow_incomplete_end: bool) -> _Iterable[int]:
+    # Stops before an incomplete record at the end of the data, if allowed
+    offset = start_offset
+    while offset < len(data):
+        if __is_cut_off(data[offset : offset + __MAX_LENGTH_PREFIX_DIGITS + 1], offset, len(data)):
+            if allow_incomplete_end:
+                return
+            raise ValueError(f"incomplete flow record at the end of the file at byte {offset}")
+        yield offset
+        offset = __read_element(data, offset)[1] + 1
+
+
+def __read_element(data: _mmap.mmap, position: int) -> _Tuple[int, int, int]:
+    # Returns the start and end position of the element's data and its type
+    colon = data.find(b":", position, position + __MAX_LENGTH_PREFIX_DIGITS + 1)
+    if colon <= position or not data[position:colon].isdigit():
+        raise ValueError(f"not a tnetstring: missing or invalid length prefix at byte {position}")
+    start = colon + 1
+    end = start + int(data[position:colon])
+    if end >= len(data):
+        raise ValueError(f"not a tnetstring: invalid length prefix at byte {position}")
+    return start, end, data[end]
+
+
+def __read_flows_at_offsets(fp: _BinaryIO, record_offsets: _Iterable[int], end_offset: _Optional[_List[int]]) -> _Iterable[_Flow]:
+    for offset in record_offsets:
+        fp.seek(offset)
+        for flow in _FlowReader(fp).stream():
+            if end_offset is not None:
+                end_offset[0] = fp.tell()
+            yield flow
+            break
+
+
+def __read_flows_from_offset(
+    fp: _BinaryIO, file_path: str, start_offset: int, end_offset: _Optional[_List[int]], allow_incomplete_end: bool
+) -> _Iterable[_Flow]:
+    fp.seek(start_offset)
+    position = start_offset
+    try:
+        for flow in _FlowReader(fp).stream():
+            position = fp.tell()
+            if end_offset is not None:
+                end_offset[0] = position
+            yield flow
+    except _mitmproxy_exceptions.FlowReadException:
+        if not allow_incomplete_end or not __is_incomplete_record(file_path, position):
+            raise
+
+
+def __read_scalar(data: _mmap.mmap, start: int, end: int, data_type: int) -> _Optional[bytes | str | int]:
+    if data_type == __TYPE_BYTES:
+        return data[start:end]
+    if data_type == __TYPE_STR:
+        return data[start:end].decode("utf-8")
+    if data_type == __TYPE_INT:
+        return int(data[start:end])
+    if data_type == __TYPE_NULL:
+        return None
+    raise ValueError(f"unexpected tnetstring type at byte {start}: {chr(data_type)}")
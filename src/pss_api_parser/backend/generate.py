@@ -9,6 +9,7 @@ from jinja2 import PackageLoader as _PackageLoader
 
 from . import enums as _enums
 from . import parse as _parse
+from . import structurefile as _structurefile
 from . import utils as _utils
 
 
@@ -661,9 +662,8 @@ def __generate_utils_submodule(target_path: Path, env: _Environment, force_overw
 
 
 def read_data(file_path: Path | str) -> dict:
-    with open(file_path) as f:
-        result = _json.load(f)
-    return result
+    # Detects binary structure files (see structurefile) by their magic bytes
+    return _structurefile.read_structure_dict(file_path)
 
 
 def __extract_parameters(query_parameters: dict) -> List[Dict[str, str]]:
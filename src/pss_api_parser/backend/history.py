@@ -0,0 +1,290 @@
+import hashlib as _hashlib
+import json as _json
+import sqlite3 as _sqlite3
+from datetime import datetime as _datetime
+from datetime import timezone as _timezone
+from pathlib import Path
+from typing import Any as _Any
+from typing import Dict as _Dict
+from typing import List as _List
+from typing import NamedTuple as _NamedTuple
+from typing import Optional as _Optional
+from typing import Sequence as _Sequence
+from typing import Tuple as _Tuple
+
+from . import structurediff as _structurediff
+from . import structurefile as _structurefile
+from . import utils as _utils
+
+
+# ----- Constants and type definitions -----
+
+HISTORY_VERSION = 2
+
+KIND_ENDPOINT = "endpoint"
+KIND_ENTITY = "entity"
+
+
+class IngestSummary(_NamedTuple):
+    snapshot_id: int
+    added: int
+    changed: int
+    removed: int
+    unchanged: int
+
+
+class PropertyVersion(_NamedTuple):
+    first_snapshot: str
+    last_snapshot: _Optional[str]  # None, if the property still has this type in the latest snapshot
+    type: _Any  # None, if the endpoint or entity exists but doesn't have the property
+
+
+class SchemaVersion(_NamedTuple):
+    first_snapshot: str
+    last_snapshot: _Optional[str]  # None, if the schema is still the same in the latest snapshot
+    hash: str
+    schema: _utils.NestedDict
+
+
+class Snapshot(_NamedTuple):
+    id: int
+    name: str
+    source_path: _Optional[str]
+    ingested_at: str
+
+
+# ----- Public Functions -----
+
+
+class StructureHistory:
+    """
+    A local SQLite database of the structures of the API over time, one snapshot per ingested structure.
+
+    The schemas of the endpoints ('Service/Endpoint') and entities are stored once per content hash (see structurediff.get_fingerprint),
+    along with the ranges of consecutive snapshots they've been found in. Snapshots are ordered by the time they've been ingested,
+    so they need to be ingested from oldest to newest. Ingesting a snapshot only writes the schemas that changed since the latest snapshot,
+    but all of its endpoints and entities get hashed to find them, so it takes time proportional to the size of the structure.
+    A structure file with the same contents as the one of the latest snapshot is recognized by the hash of the file and doesn't get loaded at all.
+    """
+
+    __slots__ = ("__connection",)
+
+    __SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        source_path TEXT,
+        ingested_at TEXT NOT NULL,
+        file_hash TEXT
+    );
+    CREATE TABLE IF NOT EXISTS schemas (
+        id INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        name TEXT NOT NULL,
+        hash TEXT NOT NULL,
+        schema TEXT NOT NULL,
+        UNIQUE (kind, name, hash)
+    );
+    CREATE TABLE IF NOT EXISTS schema_versions (
+        id INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        name TEXT NOT NULL,
+        schema_id INTEGER NOT NULL REFERENCES schemas (id),
+        first_snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+        last_snapshot_id INTEGER REFERENCES snapshots (id)
+    );
+    CREATE INDEX IF NOT EXISTS schema_versions_by_name ON schema_versions (kind, name, first_snapshot_id);
+    CREATE INDEX IF NOT EXISTS schema_versions_by_last_snapshot ON schema_versions (last_snapshot_id);
+    """
+    __MIGRATIONS_SQL = {
+        1: "ALTER TABLE snapshots ADD COLUMN file_hash TEXT;",
+    }
+
+    def __init__(self, database_file_path: Path | str) -> None:
+        self.__connection = _sqlite3.connect(database_file_path)
+        user_version = self.__connection.execute("PRAGMA user_version").fetchone()[0]
+        if user_version == 0:
+            with self.__connection:
+                self.__connection.executescript(StructureHistory.__SCHEMA_SQL)
+                self.__connection.execute(f"PRAGMA user_version = {HISTORY_VERSION}")
+        elif user_version in StructureHistory.__MIGRATIONS_SQL:
+            with self.__connection:
+                for version in range(user_version, HISTORY_VERSION):
+                    self.__connection.executescript(StructureHistory.__MIGRATIONS_SQL[version])
+                self.__connection.execute(f"PRAGMA user_version = {HISTORY_VERSION}")
+        elif user_version != HISTORY_VERSION:
+            self.__connection.close()
+            raise ValueError(f"The history database has been created by an incompatible version: {database_file_path}")
+
+    def __enter__(self) -> "StructureHistory":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def get_property_history(self, kind: str, name: str, path: _Sequence[str]) -> _List[PropertyVersion]:
+        """
+        Returns the types a property of an endpoint or entity had over time, e.g. the path ['ShipStatus'] of the entity 'Ship'
+        or ['response_structure', 'ShipService', 'Ships'] of the endpoint 'ShipService/ListShips'.
+        Consecutive snapshots with the same type are combined.
+        """
+        result = []
+        previous_last_snapshot_id = None
+        for first_snapshot_id, last_snapshot_id, first_snapshot, last_snapshot, _, schema in self.__get_schema_versions(kind, name):
+            property_type = schema
+            for key in path:
+                property_type = property_type.get(key) if isinstance(property_type, dict) else None
+            if (
+                result
+                and result[-1].type == property_type
+                and previous_last_snapshot_id is not None
+                and first_snapshot_id == previous_last_snapshot_id + 1
+            ):
+                result[-1] = result[-1]._replace(last_snapshot=last_snapshot)
+            else:
+                result.append(PropertyVersion(first_snapshot, last_snapshot, property_type))
+            previous_last_snapshot_id = last_snapshot_id
+        return result
+
+    def get_schema_versions(self, kind: str, name: str) -> _List[SchemaVersion]:
+        """
+        Returns the schemas of an endpoint or entity and the ranges of snapshots they've been found in, from oldest to newest.
+        """
+        return [SchemaVersion(*row[2:]) for row in self.__get_schema_versions(kind, name)]
+
+    def get_snapshots(self, kind: _Optional[str] = None, name: _Optional[str] = None) -> _List[Snapshot]:
+        """
+        Returns the snapshots from oldest to newest. If kind and name are given, only the snapshots containing that endpoint or entity get returned.
+        """
+        if name is None:
+            rows = self.__connection.execute("SELECT id, name, source_path, ingested_at FROM snapshots ORDER BY id")
+        else:
+            rows = self.__connection.execute(
+                """
+                SELECT snapshots.id, snapshots.name, snapshots.source_path, snapshots.ingested_at
+                FROM schema_versions
+                JOIN snapshots ON snapshots.id >= schema_versions.first_snapshot_id
+                    AND (schema_versions.last_snapshot_id IS NULL OR snapshots.id <= schema_versions.last_snapshot_id)
+                WHERE schema_versions.kind = ? AND schema_versions.name = ?
+                ORDER BY snapshots.id
+                """,
+                (kind, name),
+            )
+        return [Snapshot(*row) for row in rows]
+
+    def ingest(self, structure_dict: _utils.NestedDict, snapshot_name: str, source_path: _Optional[str] = None) -> IngestSummary:
+        """
+        Adds the structure (as stored in a structure file) as the newest snapshot. Raises a ValueError, if a snapshot with that name already exists.
+        """
+        return self.__ingest(structure_dict, snapshot_name, source_path, None)
+
+    def ingest_file(self, file_path: Path | str, snapshot_name: _Optional[str] = None) -> IngestSummary:
+        """
+        Adds the structure file (JSON or binary) as the newest snapshot, by default named like the file without its suffix.
+        If the file has the same contents as the file of the latest snapshot, it doesn't get loaded and all endpoints and entities are unchanged.
+        """
+        snapshot_name = snapshot_name or Path(file_path).stem
+        with open(file_path, "rb") as fp:
+            data = fp.read()
+        file_hash = _hashlib.blake2b(data, digest_size=16).hexdigest()
+        if file_hash == self.__get_latest_file_hash():
+            with self.__connection:
+                snapshot_id = self.__insert_snapshot(snapshot_name, str(file_path), file_hash)
+                unchanged = self.__connection.execute("SELECT COUNT(*) FROM schema_versions WHERE last_snapshot_id IS NULL").fetchone()[0]
+            return IngestSummary(snapshot_id, added=0, changed=0, removed=0, unchanged=unchanged)
+        structure_dict = _structurefile.load_structure_dict(data, source=f"The binary structure file {file_path}")
+        return self.__ingest(structure_dict, snapshot_name, str(file_path), file_hash)
+
+    def __get_current_versions(self) -> _Dict[_Tuple[str, str], _Tuple[int, str]]:
+        # Returns the ids and hashes of the schema versions found in the latest snapshot
+        rows = self.__connection.execute(
+            """
+            SELECT schema_versions.kind, schema_versions.name, schema_versions.id, schemas.hash
+            FROM schema_versions JOIN schemas ON schemas.id = schema_versions.schema_id
+            WHERE schema_versions.last_snapshot_id IS NULL
+            """
+        )
+        return {(kind, name): (version_id, schema_hash) for kind, name, version_id, schema_hash in rows}
+
+    def __get_latest_file_hash(self) -> _Optional[str]:
+        row = self.__connection.execute("SELECT file_hash FROM snapshots ORDER BY id DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def __get_schema_id(self, key: _Tuple[str, str], schema_hash: str, schema: _utils.NestedDict) -> int:
+        row = self.__connection.execute("SELECT id FROM schemas WHERE kind = ? AND name = ? AND hash = ?", (*key, schema_hash)).fetchone()
+        if row:
+            return row[0]
+        schema_json = _json.dumps(schema, sort_keys=True, separators=(",", ":"))
+        return self.__connection.execute(
+            "INSERT INTO schemas (kind, name, hash, schema) VALUES (?, ?, ?, ?)", (*key, schema_hash, schema_json)
+        ).lastrowid
+
+    def __get_schema_versions(self, kind: str, name: str) -> _List[tuple]:
+        rows = self.__connection.execute(
+            """
+            SELECT schema_versions.first_snapshot_id, schema_versions.last_snapshot_id, first_snapshots.name, last_snapshots.name, schemas.hash, schemas.schema
+            FROM schema_versions
+            JOIN schemas ON schemas.id = schema_versions.schema_id
+            JOIN snapshots AS first_snapshots ON first_snapshots.id = schema_versions.first_snapshot_id
+            LEFT JOIN snapshots AS last_snapshots ON last_snapshots.id = schema_versions.last_snapshot_id
+            WHERE schema_versions.kind = ? AND schema_versions.name = ?
+            ORDER BY schema_versions.first_snapshot_id
+            """,
+            (kind, name),
+        )
+        return [(*row[:5], _json.loads(row[5])) for row in rows]
+
+    def __ingest(
+        self, structure_dict: _utils.NestedDict, snapshot_name: str, source_path: _Optional[str], file_hash: _Optional[str]
+    ) -> IngestSummary:
+        elements = {(KIND_ENDPOINT, name): value for name, value in _structurediff.get_endpoints(structure_dict).items()}
+        elements.update(((KIND_ENTITY, name), value) for name, value in (structure_dict.get("entities") or {}).items())
+        hashes = {key: _structurediff.get_fingerprint(value) for key, value in elements.items()}
+
+        with self.__connection:
+            previous_snapshot_id = self.__connection.execute("SELECT MAX(id) FROM snapshots").fetchone()[0]
+            snapshot_id = self.__insert_snapshot(snapshot_name, source_path, file_hash)
+
+            current_versions = self.__get_current_versions()
+            counts = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+            closed_version_ids = [version_id for key, (version_id, _) in current_versions.items() if key not in hashes]
+            counts["removed"] = len(closed_version_ids)
+            for key, schema_hash in hashes.items():
+                current_version = current_versions.get(key)
+                if current_version is None:
+                    counts["added"] += 1
+                elif current_version[1] == schema_hash:
+                    counts["unchanged"] += 1
+                    continue
+                else:
+                    counts["changed"] += 1
+                    closed_version_ids.append(current_version[0])
+                schema_id = self.__get_schema_id(key, schema_hash, elements[key])
+                self.__connection.execute(
+                    "INSERT INTO schema_versions (kind, name, schema_id, first_snapshot_id) VALUES (?, ?, ?, ?)", (*key, schema_id, snapshot_id)
+                )
+            self.__connection.executemany(
+                "UPDATE schema_versions SET last_snapshot_id = ? WHERE id = ?",
+                ((previous_snapshot_id, version_id) for version_id in closed_version_ids),
+            )
+        return IngestSummary(snapshot_id, **counts)
+
+    def __insert_snapshot(self, snapshot_name: str, source_path: _Optional[str], file_hash: _Optional[str]) -> int:
+        ingested_at = _datetime.now(_timezone.utc).isoformat(timespec="seconds")
+        try:
+            return self.__connection.execute(
+                "INSERT INTO snapshots (name, source_path, ingested_at, file_hash) VALUES (?, ?, ?, ?)",
+                (snapshot_name, source_path, ingested_at, file_hash),
+            ).lastrowid
+        except _sqlite3.IntegrityError:
+            raise ValueError(f"A snapshot with the name '{snapshot_name}' has already been ingested.") from None
+
+
+def get_kind(name: str) -> str:
+    """
+    Returns the kind of an endpoint ('Service/Endpoint') or entity name.
+    """
+    return KIND_ENDPOINT if "/" in name else KIND_ENTITY
@@ -1,9 +1,17 @@
-import json as _json
+import glob as _glob
+import os as _os
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
+from pathlib import Path
 from typing import Dict as _Dict
+from typing import Iterable as _Iterable
 from typing import List as _List
+from typing import Tuple as _Tuple
 from typing import Union as _Union
 
+from . import overrides as _overrides
 from . import parse as _parse
+from . import structurefile as _structurefile
+from .datatypes import TypeDictionaryAccumulator as _TypeDictionaryAccumulator
 from .flowdetails import PssFlowDetails as _PssFlowDetails
 from .objectstructure import PssObjectStructure as _PssObjectStructure
 
@@ -11,14 +19,40 @@ from .objectstructure import PssObjectStructure as _PssObjectStructure
 ApiStructure = _Dict[str, _Dict[str, _Union[_List[_PssFlowDetails], _List[_PssObjectStructure]]]]
 ApiOrganizedFlowsDict = _Dict[str, "ApiOrganizedFlowsDict"]
 NestedDict = _Dict[str, _Union[str, "NestedDict"]]
+StructureAccumulator = _Dict[str, _Dict[_Union[str, _Tuple[str, str]], _Union[NestedDict, _TypeDictionaryAccumulator]]]
 
+# Fields of a flow dict merged like parse.merge_flows does
+__FLOW_TYPE_DICTIONARY_FIELDS = ("content_parameters", "content_structure", "query_parameters", "response_structure")
+__FLOW_FIRST_VALUE_FIELDS = ("content_type", "endpoint", "method", "service")  # Only kept if present, PssFlowDetails fills in the defaults
+
+__CHUNKS_PER_JOB = 4
+__GLOB_CHARACTERS = "*?["
+__STRUCTURE_FILE_PATTERNS = ("*.json", f"*{_structurefile.BINARY_STRUCTURE_FILE_SUFFIX}")
 
-def apply_overrides(structure: ApiStructure, overrides: ApiStructure) -> ApiStructure:
-    result = {
-        "endpoints": override_organized_flows(structure.get("endpoints"), overrides.get("endpoints")),
-        "entities": override_object_structures(structure.get("entities"), overrides.get("entities")),
-    }
-    return result
+
+# ----- Public Functions -----
+
+
+def accumulate_structure_dict(accumulator: StructureAccumulator, structure_dict: ApiOrganizedFlowsDict) -> None:
+    """
+    Merges a structure as read from a structure JSON file into the accumulator. Structures need to be accumulated in the order of their files.
+    The types of the endpoints and entities get widened in place, the structure doesn't get modified.
+    """
+    for service, endpoints in structure_dict.get("endpoints", {}).items():
+        for endpoint, flow_dict in endpoints.items():
+            __accumulate_flow_dict(accumulator, (service, endpoint), flow_dict)
+    for entity_name, properties in structure_dict.get("entities", {}).items():
+        __accumulate_entity_properties(accumulator, entity_name, properties)
+
+
+def apply_overrides(structure: ApiStructure, overrides: _Union[ApiStructure, _overrides.CompiledOverrides]) -> ApiStructure:
+    """
+    Applies the overrides to the structure. When applying the same overrides to several structures, compile them once with overrides.load_overrides
+    or overrides.compile_api_structure_overrides and pass the compiled overrides.
+    """
+    if not isinstance(overrides, _overrides.CompiledOverrides):
+        overrides = _overrides.compile_api_structure_overrides(overrides)
+    return overrides.apply(structure)
 
 
 def override_organized_flows(flows: ApiStructure, overrides: ApiStructure) -> ApiStructure:
@@ -147,6 +181,69 @@ def merge_object_structures(
     return result
 
 
+def create_structure_accumulator() -> StructureAccumulator:
+    return {"endpoints": {}, "entities": {}}
+
+
+def get_structure_file_paths(paths: _Iterable[Path | str]) -> _List[str]:
+    """
+    Expands directories to the structure JSON and binary structure files in them and glob patterns (e.g. 'structures/**/*.json') to the files matching them, each sorted by name.
+    Raises a FileNotFoundError, if a path doesn't exist or a pattern doesn't match any file.
+    """
+    result = []
+    for path in paths:
+        path = str(path)
+        if _os.path.isdir(path):
+            file_paths = sorted(
+                file_path for pattern in __STRUCTURE_FILE_PATTERNS for file_path in _glob.glob(_os.path.join(_glob.escape(path), pattern))
+            )
+        elif any(character in path for character in __GLOB_CHARACTERS):
+            file_paths = sorted(file_path for file_path in _glob.glob(path, recursive=True) if _os.path.isfile(file_path))
+        elif _os.path.isfile(path):
+            file_paths = [path]
+        else:
+            raise FileNotFoundError(f"The specified file could not be found at: {path}")
+
+        if not file_paths:
+            raise FileNotFoundError(f"No structure files found at: {path}")
+        result.extend(file_paths)
+    return result
+
+
+def get_api_structure_from_accumulator(accumulator: StructureAccumulator) -> ApiStructure:
+    result = {
+        "endpoints": _parse.organize_flows(_PssFlowDetails(__get_flow_dict(flow_dict)) for flow_dict in accumulator["endpoints"].values()),
+        "entities": [_PssObjectStructure(entity_name, properties.result) for entity_name, properties in accumulator["entities"].items()],
+    }
+    return result
+
+
+def get_structure_dict_from_accumulator(accumulator: StructureAccumulator) -> ApiOrganizedFlowsDict:
+    """
+    Converts the accumulator to a structure as read from a structure JSON file, which can be accumulated again with accumulate_structure_dict.
+    """
+    endpoints = {}
+    for (service, endpoint), flow_dict in accumulator["endpoints"].items():
+        endpoints.setdefault(service, {})[endpoint] = __get_flow_dict(flow_dict)
+    result = {
+        "endpoints": endpoints,
+        "entities": {entity_name: properties.result for entity_name, properties in accumulator["entities"].items()},
+    }
+    return result
+
+
+def merge_structure_files(file_paths: _List[str], jobs: int = 1) -> ApiStructure:
+    """
+    Reads the structure JSON files one by one and merges them into a single structure. The result is the same as merging the structures pairwise in the order of the files.
+    If jobs is greater than 1, consecutive chunks of the files get read and merged in that many worker processes and their results get merged in order.
+    """
+    if jobs > 1 and len(file_paths) > 1:
+        accumulator = __accumulate_structure_files_in_parallel(file_paths, jobs)
+    else:
+        accumulator = __accumulate_structure_files(file_paths)
+    return get_api_structure_from_accumulator(accumulator)
+
+
 def merge_structure_jsons(file_path_1: str, file_path_2: str) -> ApiStructure:
     structure_1 = read_structure_json(file_path_1)
     structure_2 = read_structure_json(file_path_2)
@@ -166,10 +263,73 @@ def merge_api_structures(structure_1: ApiStructure, structure_2: ApiStructure, o
 
 
 def read_structure_json(file_path: str) -> ApiStructure:
-    with open(file_path, "r") as fp:
-        flows = _json.load(fp)
+    """
+    Reads a structure JSON file or a binary structure file (see structurefile).
+    """
+    flows = _structurefile.read_structure_dict(file_path)
     result = {
         "endpoints": convert_structure_dict_to_organized_flows(flows),
         "entities": convert_entities_dict_to_object_structures(flows.get("entities")),
     }
     return result
+
+
+# ----- Private Functions -----
+
+
+def __accumulate_entity_properties(accumulator: StructureAccumulator, entity_name: str, properties: NestedDict) -> None:
+    accumulated_properties = accumulator["entities"].get(entity_name)
+    if accumulated_properties is None:
+        accumulator["entities"][entity_name] = _TypeDictionaryAccumulator(properties)
+    else:
+        accumulated_properties.add(properties)
+
+
+def __accumulate_flow_dict(accumulator: StructureAccumulator, endpoint_key: _Tuple[str, str], flow_dict: NestedDict) -> None:
+    # Merges the flow like parse.merge_flows does: the first non-empty value of the first value fields wins and the type dictionaries get widened.
+    accumulated_flow_dict = accumulator["endpoints"].get(endpoint_key)
+    if accumulated_flow_dict is None:
+        accumulated_flow_dict = {name: _TypeDictionaryAccumulator(flow_dict.get(name)) for name in __FLOW_TYPE_DICTIONARY_FIELDS}
+        accumulated_flow_dict.update((name, flow_dict[name]) for name in __FLOW_FIRST_VALUE_FIELDS if name in flow_dict)
+        accumulated_flow_dict["response_gzipped"] = flow_dict.get("response_gzipped") or False
+        accumulator["endpoints"][endpoint_key] = accumulated_flow_dict
+        return
+
+    for name in __FLOW_TYPE_DICTIONARY_FIELDS:
+        type_dictionary = flow_dict.get(name)
+        if type_dictionary:
+            accumulated_flow_dict[name].add(type_dictionary)
+    for name in __FLOW_FIRST_VALUE_FIELDS:
+        # An input lacking the field must not replace an empty value, e.g. a content type of "" with None.
+        if not accumulated_flow_dict.get(name) and name in flow_dict:
+            accumulated_flow_dict[name] = flow_dict[name]
+    accumulated_flow_dict["response_gzipped"] = accumulated_flow_dict["response_gzipped"] or flow_dict.get("response_gzipped") or False
+
+
+def __accumulate_structure_files(file_paths: _List[str]) -> StructureAccumulator:
+    result = create_structure_accumulator()
+    for file_path in file_paths:
+        accumulate_structure_dict(result, _structurefile.read_structure_dict(file_path))
+    return result
+
+
+def __accumulate_structure_files_in_parallel(file_paths: _List[str], jobs: int) -> StructureAccumulator:
+    # The workers return plain structure dicts instead of accumulators, which are smaller to send back, and the parent merges them in the order of the files.
+    chunk_count = min(len(file_paths), jobs * __CHUNKS_PER_JOB)
+    chunks = [file_paths[i * len(file_paths) // chunk_count : (i + 1) * len(file_paths) // chunk_count] for i in range(chunk_count)]
+    result = create_structure_accumulator()
+    with _ProcessPoolExecutor(max_workers=jobs) as executor:
+        for structure_dict in executor.map(__merge_structure_files_to_dict, chunks):
+            accumulate_structure_dict(result, structure_dict)
+    return result
+
+
+def __get_flow_dict(accumulated_flow_dict: _Dict[str, _Union[str, _TypeDictionaryAccumulator]]) -> NestedDict:
+    result = dict(accumulated_flow_dict)
+    for name in __FLOW_TYPE_DICTIONARY_FIELDS:
+        result[name] = accumulated_flow_dict[name].result
+    return result
+
+
+def __merge_structure_files_to_dict(file_paths: _List[str]) -> ApiOrganizedFlowsDict:
+    return get_structure_dict_from_accumulator(__accumulate_structure_files(file_paths))
@@ -2,9 +2,11 @@ from typing import Dict as _Dict
 
 
 class PssObjectStructure:
+    __slots__ = ("object_type_name", "properties")
+
     def __init__(self, object_type_name: str, properties: _Dict[str, str]) -> None:
         self.object_type_name: str = object_type_name
-        self.properties = {key: properties[key] for key in sorted(properties.keys())}
+        self.properties: _Dict[str, str] = properties  # Gets sorted when stored
 
     def __repr__(self) -> str:
         return f'<PssObjectStructure "{self.object_type_name}">'
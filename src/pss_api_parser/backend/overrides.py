@@ -0,0 +1,177 @@
+import hashlib as _hashlib
+import os as _os
+from pathlib import Path
+from typing import Dict as _Dict
+from typing import List as _List
+from typing import Optional as _Optional
+from typing import Tuple as _Tuple
+from typing import Union as _Union
+
+from . import parse as _parse
+from . import structurefile as _structurefile
+from . import utils as _utils
+from .flowdetails import PssFlowDetails as _PssFlowDetails
+from .objectstructure import PssObjectStructure as _PssObjectStructure
+
+
+# ----- Constants -----
+
+ApiStructure = _Dict[str, _Dict[str, _Union[_List[_PssFlowDetails], _List[_PssObjectStructure]]]]
+
+OVERRIDES_CACHE_FILE_SUFFIX = ".cache"
+OVERRIDES_CACHE_VERSION = 2
+
+
+# ----- Public Functions -----
+
+
+class CompiledOverrides:
+    """
+    Overrides for API structures, indexed by (service, endpoint) and entity name, so they can be applied to many structures without being read and indexed again.
+    The content hash is the SHA-256 hash of the overrides file the overrides have been loaded from, if any.
+    """
+
+    __slots__ = ("content_hash", "endpoints", "entities")
+
+    def __init__(
+        self,
+        endpoints: _Dict[_Tuple[str, str], _PssFlowDetails],
+        entities: _Dict[str, _PssObjectStructure],
+        content_hash: _Optional[str] = None,
+    ) -> None:
+        self.content_hash: _Optional[str] = content_hash
+        self.endpoints: _Dict[_Tuple[str, str], _PssFlowDetails] = endpoints
+        self.entities: _Dict[str, _PssObjectStructure] = entities
+
+    def __repr__(self) -> str:
+        return f"<CompiledOverrides {len(self.endpoints)} endpoints, {len(self.entities)} entities>"
+
+    def apply(self, structure: ApiStructure) -> ApiStructure:
+        """
+        Returns a copy of the structure with the overrides applied, the same as merge.apply_overrides returns. The structure doesn't get modified.
+        The types of overridden endpoints and entities get replaced by the types of the overrides, missing ones get added.
+        """
+        endpoints = dict(structure.get("endpoints") or {})
+        overridden_services = set()
+        for (service, endpoint), override in self.endpoints.items():
+            if service not in overridden_services:
+                endpoints[service] = dict(endpoints.get(service) or {})
+                overridden_services.add(service)
+            flow_details = endpoints[service].get(endpoint)
+            if flow_details:
+                endpoints[service][endpoint] = [_parse.merge_flows(flow_details[0], override, second_overrides_first=True)]
+            else:
+                endpoints[service][endpoint] = [override]
+
+        entities = {object_structure.object_type_name: object_structure for object_structure in structure.get("entities") or []}
+        for entity_name, override in self.entities.items():
+            object_structure = entities.get(entity_name)
+            if object_structure:
+                properties = _parse.merge_type_dictionaries(object_structure.properties, override.properties, second_overrides_first=True)
+                entities[entity_name] = _PssObjectStructure(entity_name, properties)
+            else:
+                entities[entity_name] = override
+
+        result = {
+            "endpoints": endpoints,
+            "entities": [entities[entity_name] for entity_name in sorted(entities.keys())],
+        }
+        return result
+
+
+def compile_api_structure_overrides(overrides: ApiStructure) -> CompiledOverrides:
+    """
+    Compiles overrides read with merge.read_structure_json. Only the first flow details of each endpoint are used.
+    """
+    endpoints = {
+        (service, endpoint): flow_details[0]
+        for service, service_endpoints in (overrides.get("endpoints") or {}).items()
+        for endpoint, flow_details in service_endpoints.items()
+    }
+    entities = {object_structure.object_type_name: object_structure for object_structure in overrides.get("entities") or []}
+    return CompiledOverrides(endpoints, entities)
+
+
+def compile_overrides(overrides_dict: _utils.NestedDict, content_hash: _Optional[str] = None) -> CompiledOverrides:
+    """
+    Compiles overrides as stored in a structure file.
+    """
+    endpoints = {
+        (service, endpoint): _PssFlowDetails(flow_dict)
+        for service, service_endpoints in (overrides_dict.get("endpoints") or {}).items()
+        for endpoint, flow_dict in service_endpoints.items()
+    }
+    entities = {
+        entity_name: _PssObjectStructure(entity_name, properties) for entity_name, properties in (overrides_dict.get("entities") or {}).items()
+    }
+    return CompiledOverrides(endpoints, entities, content_hash=content_hash)
+
+
+def get_overrides_cache_file_path(overrides_file_path: Path | str) -> Path:
+    overrides_file_path = Path(overrides_file_path)
+    return overrides_file_path.with_name(f"{overrides_file_path.name}{OVERRIDES_CACHE_FILE_SUFFIX}")
+
+
+def load_overrides(overrides_file_path: Path | str, use_cache: bool = False) -> CompiledOverrides:
+    """
+    Reads and compiles an overrides structure file.
+
+    If use_cache is True, the overrides get read from a binary cache file next to the overrides file instead (see get_overrides_cache_file_path),
+    if it has been stored for the current contents of the overrides file. The overrides file only gets read and hashed to check that, if its size
+    or modification time changed. Otherwise the cache file gets (re)written, unless the directory isn't writable.
+    """
+    if not use_cache:
+        data = __read_overrides_file(overrides_file_path)
+        overrides_dict = _structurefile.load_structure_dict(data, source=f"The overrides file {overrides_file_path}")
+        return compile_overrides(overrides_dict, content_hash=_hashlib.sha256(data).hexdigest())
+
+    cache_file_path = get_overrides_cache_file_path(overrides_file_path)
+    file_stat = _os.stat(overrides_file_path)
+    cache_dict, is_up_to_date = __read_overrides_cache(cache_file_path, file_stat)
+    if is_up_to_date:
+        return compile_overrides(cache_dict, content_hash=cache_dict["content_hash"])
+
+    data = __read_overrides_file(overrides_file_path)
+    content_hash = _hashlib.sha256(data).hexdigest()
+    if cache_dict is None or cache_dict.get("content_hash") != content_hash:
+        overrides_dict = _structurefile.load_structure_dict(data, source=f"The overrides file {overrides_file_path}")
+        cache_dict = {
+            "version": OVERRIDES_CACHE_VERSION,
+            "content_hash": content_hash,
+            "endpoints": overrides_dict.get("endpoints") or {},
+            "entities": overrides_dict.get("entities") or {},
+        }
+    cache_dict["size"] = file_stat.st_size
+    cache_dict["mtime_ns"] = file_stat.st_mtime_ns
+    try:
+        _structurefile.store_structure_dict(cache_file_path, cache_dict, binary=True)
+    except OSError:
+        pass
+    return compile_overrides(cache_dict, content_hash=content_hash)
+
+
+# ----- Private Functions -----
+
+
+def __read_overrides_cache(cache_file_path: Path, file_stat: _os.stat_result) -> _Tuple[_Optional[_utils.NestedDict], bool]:
+    # Returns the cache, if any, and whether it has been stored for the current size and modification time of the overrides file.
+    # Like git does, a cache written within the same timestamp as the overrides file doesn't count as up to date, since the file may have changed since.
+    try:
+        cache_stat = _os.stat(cache_file_path)
+        cache_dict = _structurefile.read_structure_dict(cache_file_path)
+    except (EOFError, OSError, TypeError, ValueError):
+        return None, False
+
+    if not isinstance(cache_dict, dict) or cache_dict.get("version") != OVERRIDES_CACHE_VERSION or not cache_dict.get("content_hash"):
+        return None, False
+    is_up_to_date = (
+        cache_dict.get("size") == file_stat.st_size
+        and cache_dict.get("mtime_ns") == file_stat.st_mtime_ns
+        and file_stat.st_mtime_ns < cache_stat.st_mtime_ns
+    )
+    return cache_dict, is_up_to_date
+
+
+def __read_overrides_file(overrides_file_path: Path | str) -> bytes:
+    with open(overrides_file_path, "rb") as fp:
+        return fp.read()
@@ -1,49 +1,162 @@
 import base64 as _base64
 import json as _json
-import os as _os
 import re as _re
 import zlib as _zlib
-from datetime import datetime as _datetime
-from typing import Any as _Any
+from collections import deque as _deque
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
 from typing import Dict as _Dict
+from typing import Iterable as _Iterable
 from typing import List as _List
+from typing import Optional as _Optional
 from typing import Set as _Set
+from typing import Tuple as _Tuple
 from typing import Union as _Union
 from xml.etree import ElementTree as _ElementTree
 
 from contexttimer import Timer as _Timer
 from mitmproxy.http import HTTPFlow as _HTTPFlow
-from mitmproxy.io import FlowReader as _FlowReader
-
+from mitmproxy.net import encoding as _encoding
+from mitmproxy.net.http.headers import parse_content_type as _parse_content_type
+
+from . import checkpoint as _checkpoint
+from . import datatypes as _datatypes
+from . import endpointfilter as _endpointfilter
+from . import flowsindex as _flowsindex
+from . import flowsreader as _flowsreader
+from . import responsecache as _responsecache
+from . import structurefile as _structurefile
 from . import utils as _utils
+from . import xmlinference as _xmlinference
 from .flowdetails import PssFlowDetails as _PssFlowDetails
+from .flowdetails import PssFlowRecord as _PssFlowRecord
 from .objectstructure import PssObjectStructure as _PssObjectStructure
+from .propertytable import PropertyTable as _PropertyTable
 
 
 # ----- Constants and type definitions -----
 
 ApiStructure = _Dict[str, _Dict[str, _Union[_List[_PssFlowDetails], _List[_PssObjectStructure]]]]
 ApiStructureDict = _Dict[str, "ApiStructureDict"]
+AccumulatedApiStructure = _Dict[str, _Union[int, _Dict[_Union[str, _Tuple[str, str]], _Union[_PssFlowDetails, _PropertyTable]]]]
+
+__FLOW_RECORD_BATCH_BYTES = 16 * 1024 * 1024
+__FLOW_RECORD_BATCH_SIZE = 64
 
-__PSS_BOOL_VALUES = ("true", "false", "True", "False")
+__RX_CSS_CHARSET: _re.Pattern = _re.compile(rb"""@charset "([^"]+)";""", _re.IGNORECASE)
+__RX_HTML_META_CHARSET: _re.Pattern = _re.compile(rb"""<meta[^>]+charset=['"]?([^'">]+)""", _re.IGNORECASE)
 
 __RX_PARAMETER_CHECK: _re.Pattern = _re.compile(
     r"\d.*",
 )
 
-TYPE_ORDER_LOOKUP: _Dict[str, int] = {
-    "str": 5,
-    "float": 4,
-    "int": 3,
-    "bool": 2,
-    "datetime": 1,
-    None: 0,
-}
+__WORKER_RESPONSE_CACHE = _responsecache.ResponseCache()
+
+TYPE_ORDER_LOOKUP: _Dict[str, int] = _datatypes.TYPE_ORDER_LOOKUP
 
 
 # ----- Public Functions -----
 
 
+def accumulate_flow(
+    accumulated_structure: AccumulatedApiStructure,
+    flow: _HTTPFlow,
+    endpoint_filter: _Optional[_endpointfilter.EndpointFilter] = None,
+    response_cache: _Optional[_responsecache.ResponseCache] = None,
+    stable_row_count: _Optional[int] = None,
+) -> bool:
+    """
+    Parses the mitmproxy flow and merges it into the accumulated structure, unless it doesn't pass the endpoint filter (by default: blacklisted services and endpoints).
+    Returns True, if the flow has been merged.
+    """
+    return accumulate_flow_record(
+        accumulated_structure,
+        _flowsreader.get_flow_record(flow),
+        endpoint_filter=endpoint_filter,
+        response_cache=response_cache,
+        stable_row_count=stable_row_count,
+    )
+
+
+def accumulate_flow_record(
+    accumulated_structure: AccumulatedApiStructure,
+    flow_record: _PssFlowRecord,
+    endpoint_filter: _Optional[_endpointfilter.EndpointFilter] = None,
+    response_cache: _Optional[_responsecache.ResponseCache] = None,
+    stable_row_count: _Optional[int] = None,
+) -> bool:
+    """
+    Parses the flow record and merges it into the accumulated structure like accumulate_flow does.
+    """
+    if endpoint_filter is None:
+        endpoint_filter = _endpointfilter.get_default_endpoint_filter()
+    if not endpoint_filter.matches(flow_record.path):
+        return False
+
+    flow_records = (flow_record,)
+    for flow_details in __get_flow_details_from_flow_records(flow_records, stable_row_count=stable_row_count, response_cache=response_cache):
+        accumulate_flow_details(accumulated_structure, flow_details)
+    return True
+
+
+def accumulate_flow_details(accumulated_structure: AccumulatedApiStructure, flow_details: _PssFlowDetails) -> None:
+    """
+    Merges the flow details and the entity types found in its response into the accumulated structure.
+    The property types of the entities are accumulated in property tables, which get converted to object structures by get_api_structure_from_accumulated_structure.
+    """
+    object_structures = __get_object_structures_from_response_structure(flow_details.response_structure)
+    for object_name, object_structure in object_structures.items():
+        property_table = accumulated_structure["entities"].get(object_name)
+        if property_table is None:
+            accumulated_structure["entities"][object_name] = _PropertyTable(object_structure.properties)
+        else:
+            property_table.add(object_structure.properties)
+
+    endpoint_key = (flow_details.service, flow_details.endpoint)
+    accumulated_flow_details = accumulated_structure["endpoints"].get(endpoint_key)
+    if accumulated_flow_details:
+        accumulated_structure["endpoints"][endpoint_key] = merge_flows(accumulated_flow_details, flow_details)
+    else:
+        accumulated_structure["endpoints"][endpoint_key] = flow_details
+    accumulated_structure["flow_count"] += 1
+
+
+def create_accumulated_structure() -> AccumulatedApiStructure:
+    return {"endpoints": {}, "entities": {}, "flow_count": 0, "duplicate_count": 0, "duplicate_seconds_saved": 0.0}
+
+
+def get_api_structure_from_accumulated_structure(accumulated_structure: AccumulatedApiStructure) -> ApiStructure:
+    result = {
+        "endpoints": organize_flows(accumulated_structure["endpoints"].values()),
+        "entities": [
+            _PssObjectStructure(object_name, property_table.to_dict())
+            for object_name, property_table in sorted(accumulated_structure["entities"].items())
+        ],
+    }
+    return result
+
+
+def merge_accumulated_structures(target: AccumulatedApiStructure, source: AccumulatedApiStructure) -> None:
+    """
+    Merges the source into the target structure. The source is expected to contain flows recorded after those in the target.
+    """
+    for object_name, property_table in source["entities"].items():
+        target_property_table = target["entities"].get(object_name)
+        if target_property_table is None:
+            target["entities"][object_name] = property_table
+        else:
+            target_property_table.widen(property_table)
+
+    for endpoint_key, flow_details in source["endpoints"].items():
+        accumulated_flow_details = target["endpoints"].get(endpoint_key)
+        if accumulated_flow_details:
+            target["endpoints"][endpoint_key] = merge_flows(accumulated_flow_details, flow_details)
+        else:
+            target["endpoints"][endpoint_key] = flow_details
+    target["flow_count"] += source["flow_count"]
+    target["duplicate_count"] += source["duplicate_count"]
+    target["duplicate_seconds_saved"] += source["duplicate_seconds_saved"]
+
+
 def merge_object_structures(structure1: _PssObjectStructure, structure2: _PssObjectStructure) -> _PssObjectStructure:
     if not structure1:
         return structure2
@@ -55,7 +168,7 @@ def merge_object_structures(structure1: _PssObjectStructure, structure2: _PssObj
     return _PssObjectStructure(structure1.object_type_name, properties)
 
 
-def organize_flows(extracted_flow_details: _List[_PssFlowDetails]) -> ApiStructure:
+def organize_flows(extracted_flow_details: _Iterable[_PssFlowDetails]) -> ApiStructure:
     sorted_flows = sorted(extracted_flow_details, key=lambda x: f"{x.service}{x.endpoint}")
     result: ApiStructure = {}
     for flow_details in sorted_flows:
@@ -63,39 +176,86 @@ def organize_flows(extracted_flow_details: _List[_PssFlowDetails]) -> ApiStructu
     return result
 
 
-def parse_flows_file(file_path: str, verbose: bool = False) -> ApiStructure:
+def parse_flows_file(
+    file_path: str,
+    verbose: bool = False,
+    jobs: int = 1,
+    keep_original_flows: bool = False,
+    resume: bool = False,
+    stable_row_count: _Optional[int] = None,
+    include_patterns: _Optional[_List[str]] = None,
+    exclude_patterns: _Optional[_List[str]] = None,
+    use_flow_reader: bool = False,
+    endpoints: _Optional[_List[str]] = None,
+) -> ApiStructure:
     """
     Returns a dictionary with the parsed services and endpoints.
+
+    The flows are read one by one and merged into the accumulated structure right away, so memory usage depends on the number of distinct endpoints and entity types instead of the number of recorded flows.
+    If jobs is greater than 1, batches of flows get parsed in that many worker processes.
+    Flows with the same endpoint, request content and response content as an earlier flow reuse its parsed contents instead of decoding them again.
+    If keep_original_flows is True, each parsed endpoint keeps a reference to the first mitmproxy flow recorded for it (for debugging only, requires jobs to be 1).
+    If resume is True, a checkpoint file is maintained next to the flows file and only flows appended since the last run get parsed.
+    An incomplete record at the end of the file, which may still be being written, only gets skipped when resuming. Otherwise it raises an error.
+    Flows of blacklisted services and endpoints are skipped before their contents get decoded. If include patterns are given, only flows of matching endpoints get parsed.
+    Flows of endpoints matching any of the exclude patterns get skipped. Patterns are shell-style wildcards matched against 'Service/Endpoint' (see endpointfilter.EndpointFilter).
+    The flows file is read without creating mitmproxy flow objects, unless keep_original_flows or use_flow_reader is True.
+    If endpoints ('Service/Endpoint') are given, only their flows get read, looked up in the index of the flows file (see flowsindex). Can't be combined with resume.
+    If stable_row_count is given, the types of repeated XML elements in a response stop being inferred once they haven't changed for that many elements in a row (see xmlinference.infer_xml_structure).
     """
+    if keep_original_flows and jobs > 1:
+        raise ValueError("Original flows can only be kept when parsing in a single process.")
+    if endpoints and resume:
+        raise ValueError("Parsing selected endpoints can't be resumed.")
+
     print(f"Reading file: {file_path}")
 
     with _Timer() as timer:
-        flows = sorted(__read_flows_from_file(file_path), key=lambda x: str(x))
-        total_flow_count = len(flows)
+        endpoint_filter = _endpointfilter.create_endpoint_filter(include_patterns, exclude_patterns)
+        checkpoint_settings = {
+            "include_patterns": include_patterns or [],
+            "exclude_patterns": exclude_patterns or [],
+            "stable_row_count": stable_row_count,
+        }
+        checkpoint = __read_resume_checkpoint(file_path, checkpoint_settings, verbose) if resume else None
+        start_offset = checkpoint["offset"] if checkpoint else 0
+
+        record_offsets = None
+        if endpoints:
+            record_offsets = _flowsindex.get_record_offsets(file_path, endpoints)
+            if verbose:
+                print(f"Found {len(record_offsets)} flows of the selected endpoints in the index in: {timer.elapsed}")
+
+        end_offset = [start_offset]
+        flow_records = __read_flow_records_from_file(
+            file_path,
+            keep_original_flows=keep_original_flows,
+            start_offset=start_offset,
+            end_offset=end_offset,
+            endpoint_filter=endpoint_filter,
+            use_flow_reader=use_flow_reader,
+            record_offsets=record_offsets,
+            allow_incomplete_end=resume,
+        )
+        accumulated_structure = __parse_flow_records_with_jobs(flow_records, jobs, stable_row_count=stable_row_count)
         if verbose:
-            print(f"Extracted {total_flow_count} flow details in: {timer.elapsed}")
+            print(f"Extracted and merged {accumulated_structure['flow_count']} flow details in: {timer.elapsed}")
+            __print_duplicate_statistics(accumulated_structure)
 
-        object_structures = __get_object_structures_from_flows(flows)
-        for object_structure in object_structures.values():
-            if "none" in object_structure.properties.values():
-                _ = 0  # For debug breakpoint
-        object_count = len(object_structures)
+        if checkpoint:
+            checkpoint_structure = __convert_dict_to_accumulated_structure(checkpoint["structure"], checkpoint["flow_count"])
+            merge_accumulated_structures(checkpoint_structure, accumulated_structure)
+            accumulated_structure = checkpoint_structure
         if verbose:
-            print(f"Extracted {object_count} entity types in: {timer.elapsed}")
+            print(f"Extracted {len(accumulated_structure['entities'])} entity types in: {timer.elapsed}")
 
-        all_organized_flows = organize_flows(flows)
-        singularized_flows = singularize_flows(all_organized_flows)
+        result = get_api_structure_from_accumulated_structure(accumulated_structure)
         if verbose:
-            print(f"Merged flows and extracted {len(singularized_flows)} different PSS API endpoints in: {timer.elapsed}")
+            endpoint_count = sum(len(endpoints) for endpoints in result["endpoints"].values())
+            print(f"Ordered {endpoint_count} different PSS API endpoints according to services and endpoints in: {timer.elapsed}")
 
-        organized_flows = organize_flows(singularized_flows)
-        if verbose:
-            print(f"Ordered flows according to services and endpoints in: {timer.elapsed}")
-
-        result = {
-            "endpoints": organized_flows,
-            "entities": sorted(list(object_structures.values()), key=lambda x: x.object_type_name),
-        }
+        if resume:
+            __store_resume_checkpoint(file_path, end_offset[0], result, accumulated_structure["flow_count"], checkpoint_settings, verbose)
 
         return result
 
@@ -132,105 +292,85 @@ def singularize_flows(organized_flows: ApiStructure, second_overrides_first: boo
     return result
 
 
-def store_structure_json(file_path: str, flow_details: ApiStructure, compressed: bool = True) -> None:
-    flow_details_dicts = __convert_api_structured_flows_to_dict(flow_details)
-    if compressed:
-        indent = None
-        separators = (",", ":")
-    else:
-        indent = 2
-        separators = (",", ": ")
-    with open(file_path, "w") as fp:
-        _json.dump(flow_details_dicts, fp, indent=indent, separators=separators)
+def store_structure_json(file_path: str, flow_details: ApiStructure, compressed: bool = True, binary: bool = False) -> None:
+    """
+    Stores the structure as JSON or, if binary is True, in a binary structure file (see structurefile).
+    """
+    flow_details_dicts = __convert_api_structured_flows_to_dict(flow_details, ordered=False)
+    _structurefile.store_structure_dict(file_path, flow_details_dicts, compressed=compressed, binary=binary)
 
 
 # ----- Private Functions -----
 
 
-def __convert_api_structured_flows_to_dict(flows: ApiStructure) -> ApiStructureDict:
+def __convert_api_structured_flows_to_dict(flows: ApiStructure, ordered: bool = True) -> ApiStructureDict:
     result = {}
     for service, endpoints in flows.get("endpoints", {}).items():
         for endpoint, flow_details in endpoints.items():
             result.setdefault("endpoints", {}).setdefault(service, {})[endpoint] = dict(flow_details[0])
     result["entities"] = {object_structure.object_type_name: object_structure.properties for object_structure in flows.get("entities", [])}
-    result = _utils.get_ordered_dict(result)
+    if ordered:
+        result = _utils.get_ordered_dict(result)
     return result
 
 
-def __convert_flow_to_dict(flow: _HTTPFlow) -> _utils.NestedDict:
-    result = {}
-    result["method"] = flow.request.method  # GET/POST
-    if "?" in flow.request.path:
-        path, query_string = flow.request.path.split("?")
-    else:
-        path, query_string = (flow.request.path, None)
-
-    result["service"], result["endpoint"] = path.split("/")[1:]
+def __convert_dict_to_accumulated_structure(structure_dict: ApiStructureDict, flow_count: int) -> AccumulatedApiStructure:
+    result = create_accumulated_structure()
+    for service, endpoints in structure_dict.get("endpoints", {}).items():
+        for endpoint, flow_dict in endpoints.items():
+            result["endpoints"][(service, endpoint)] = _PssFlowDetails(flow_dict)
+    for object_type_name, properties in structure_dict.get("entities", {}).items():
+        result["entities"][object_type_name] = _PropertyTable(properties)
+    result["flow_count"] = flow_count
+    return result
 
-    result["query_parameters"] = {}
-    if query_string:
-        for param in query_string.split("&"):
-            split_param = param.split("=")
-            if split_param[0]:
-                if len(split_param) == 1:
-                    # Check for missing '=' and attempt to split param name and value
-                    param_value = __RX_PARAMETER_CHECK.search(split_param[0])
-                    value_span = param_value.span()
-                    param_name = split_param[0][: value_span[0]]
-                    split_param = [
-                        param_name,
-                        split_param[0][value_span[0] : value_span[1]],
-                    ]
 
-                if len(split_param) > 1:
-                    result["query_parameters"][split_param[0]] = __determine_data_type(split_param[1], split_param[0])
-                else:
-                    result["query_parameters"][split_param[0]] = None
+def __convert_flow_record_to_dict(flow_record: _PssFlowRecord, stable_row_count: _Optional[int] = None) -> _utils.NestedDict:
+    result = {}
+    result["method"] = flow_record.method  # GET/POST
+    path, query_string = __split_path(flow_record.path)
+    result["service"], result["endpoint"] = path.split("/")[1:]
+    result["query_parameters"] = __get_query_parameters(query_string)
 
     result["content"] = (
-        flow.request.content.decode("utf-8")
-        if flow.request and flow.request.headers.get("content-encoding") is None and flow.request.content
-        else None
+        flow_record.request_content.decode("utf-8") if flow_record.request_content_encoding is None and flow_record.request_content else None
     )
     result["content_structure"] = {}
     result["content_type"] = ""
-
     if result["method"] == "POST" and result["content"]:
-        try:
-            result["content_structure"] = __convert_xml_to_dict(_ElementTree.fromstring(result["content"]))
-            result["content_type"] = "xml"
-        except BaseException:
-            pass
-        if not result.get("content_type"):
-            try:
-                result["content_structure"] = __convert_json_to_dict(_json.loads(result["content"]))
-                result["content_type"] = "json"
-            except _json.JSONDecodeError:
-                pass
+        result["content_structure"], result["content_type"] = __get_content_structure(result["content"], stable_row_count=stable_row_count)
 
     result["content_parameters"] = {}
     if result["content_structure"]:
         if result["content_type"] == "json":
             result["content_parameters"] = __get_parameters_from_content_json(result["content_structure"])
-    result["response"] = flow.response.text if flow.response and flow.response.text else None
+    response_content = __get_response_content(flow_record)
+    result["response"] = __get_response_text(flow_record, response_content) or None
     result["response_structure"] = {}
     result["response_gzipped"] = False
     if result["response"]:
-        converted = False
-        try:
-            result["response_structure"] = __convert_xml_to_dict(_ElementTree.fromstring(result["response"]))
-            converted = True
-        except _ElementTree.ParseError:
-            pass
-
-        if not converted:
-            base64_decoded_content = _base64.b64decode(flow.response.content)
-            unzipped_content = _zlib.decompress(base64_decoded_content, _zlib.MAX_WBITS | 32)
-            decoded_content = unzipped_content.decode("utf-8")
-            result["response_structure"] = __convert_xml_to_dict(_ElementTree.fromstring(decoded_content))
-            result["response_gzipped"] = True
-
-    result["original_flow"] = flow
+        result["response_structure"], result["response_gzipped"] = __get_response_structure(
+            flow_record, result["response"], response_content, stable_row_count=stable_row_count
+        )
+
+    if flow_record.original_flow:
+        result["original_flow"] = flow_record.original_flow
+    return result
+
+
+def __convert_flow_record_to_dict_cached(
+    flow_record: _PssFlowRecord, response_cache: _responsecache.ResponseCache, stable_row_count: _Optional[int] = None
+) -> _utils.NestedDict:
+    cache_key = _responsecache.get_cache_key(flow_record)
+    result = response_cache.get(cache_key)
+    if result is None:
+        with _Timer() as timer:
+            result = __convert_flow_record_to_dict(flow_record, stable_row_count=stable_row_count)
+        response_cache.add(cache_key, result, timer.elapsed)
+    else:
+        result["query_parameters"] = __get_query_parameters(__split_path(flow_record.path)[1])
+        if flow_record.original_flow:
+            result["original_flow"] = flow_record.original_flow
     return result
 
 
@@ -243,82 +383,10 @@ def __convert_json_to_dict(loaded_json: _utils.NestedDict) -> _utils.NestedDict:
         if isinstance(value, dict):
             result[key] = __convert_json_to_dict(value)
         else:
-            result[key] = __determine_data_type(value)
+            result[key] = _datatypes.determine_data_type(value)
     return result
 
 
-def __convert_xml_to_dict(root: _ElementTree.Element) -> _utils.NestedDict:
-    if root is None:
-        return {}
-
-    result = {}
-    if root.attrib:
-        result["properties"] = {key: __determine_data_type(value, key) for key, value in root.attrib.items()}
-    for child in root:
-        child_dict = __convert_xml_to_dict(child)
-        if child.tag in result:
-            result[child.tag]["properties"] = merge_type_dictionaries(result[child.tag]["properties"], child_dict[child.tag]["properties"])
-        else:
-            result[child.tag] = child_dict[child.tag]
-    return {root.tag: result}
-
-
-def __determine_data_type(value: _Any, property_name: str = None) -> str:
-    if value is None:
-        return None
-
-    if isinstance(value, str):
-        int_value = None
-        float_value = None
-
-        try:
-            float_value = float(value)
-        except ValueError:
-            pass
-
-        try:
-            int_value = int(value)
-        except ValueError:
-            pass
-
-        if int_value is not None and float_value is not None:
-            try:
-                float_int_value = float(int_value)
-            except OverflowError:  # int is too large to be converted to float, could be a bit-mask
-                return "str"
-
-            if float_int_value == float_value:
-                return "int"
-            else:
-                return "float"
-        elif int_value is not None:
-            return "int"
-        elif float_value is not None:
-            return "float"
-
-        if value.lower() in __PSS_BOOL_VALUES:
-            return "bool"
-
-        try:
-            _utils.parse_pss_datetime(value)
-            return "datetime"
-        except ValueError:
-            pass
-
-        if value:
-            return "str"
-        else:
-            return None
-    elif isinstance(value, bool):
-        return "bool"
-    elif isinstance(value, float):
-        return "float"
-    elif isinstance(value, int):
-        return "int"
-    elif isinstance(value, _datetime):
-        return "datetime"
-
-
 def __get_object_structures_from_response_structure(
     response_structure: _utils.NestedDict,
 ) -> _Dict[str, _List[_PssObjectStructure]]:
@@ -337,18 +405,6 @@ def __get_object_structures_from_response_structure(
     return result
 
 
-def __get_object_structures_from_flows(
-    flows: _List[_PssFlowDetails],
-) -> _Dict[str, _PssObjectStructure]:
-    result: _Dict[str, _PssObjectStructure] = {}
-    for flow in flows:
-        current_object_structures = __get_object_structures_from_response_structure(flow.response_structure)
-        for object_name, object_structure in current_object_structures.items():
-            result[object_name] = merge_object_structures(object_structure, result.get(object_name))
-
-    return result
-
-
 def __get_parameters_from_content_json(content: _utils.NestedDict) -> _Dict[str, str]:
     result = {}
     for key, value in content.items():
@@ -359,23 +415,128 @@ def __get_parameters_from_content_json(content: _utils.NestedDict) -> _Dict[str,
     return result
 
 
+def __get_query_parameters(query_string: _Optional[str]) -> _Dict[str, str]:
+    result = {}
+    if query_string:
+        for param in query_string.split("&"):
+            split_param = param.split("=")
+            if split_param[0]:
+                if len(split_param) == 1:
+                    # Check for missing '=' and attempt to split param name and value
+                    param_value = __RX_PARAMETER_CHECK.search(split_param[0])
+                    value_span = param_value.span()
+                    param_name = split_param[0][: value_span[0]]
+                    split_param = [
+                        param_name,
+                        split_param[0][value_span[0] : value_span[1]],
+                    ]
+
+                if len(split_param) > 1:
+                    result[split_param[0]] = _datatypes.determine_data_type(split_param[1])
+                else:
+                    result[split_param[0]] = None
+    return result
+
+
+def __get_content_structure(content: str, stable_row_count: _Optional[int] = None) -> _Tuple[_utils.NestedDict, str]:
+    # Returns the structure and the type of a request content, which is either XML or JSON
+    try:
+        return _xmlinference.infer_xml_structure(content, stable_row_count=stable_row_count), "xml"
+    except BaseException:
+        pass
+    try:
+        return __convert_json_to_dict(_json.loads(content)), "json"
+    except _json.JSONDecodeError:
+        return {}, ""
+
+
+def __get_inflated_response_text(flow_record: _PssFlowRecord, response_content: bytes) -> str:
+    if flow_record.inflated_response_content is not None:
+        return flow_record.inflated_response_content.decode("utf-8")
+    base64_decoded_content = _base64.b64decode(response_content)
+    unzipped_content = _zlib.decompress(base64_decoded_content, _zlib.MAX_WBITS | 32)
+    return unzipped_content.decode("utf-8")
+
+
+def __get_response_content(flow_record: _PssFlowRecord) -> _Optional[bytes]:
+    if flow_record.response_content is None:
+        return None
+    if not flow_record.response_content_encoding:
+        return flow_record.response_content
+    result = _encoding.decode(flow_record.response_content, flow_record.response_content_encoding)
+    # A client may illegally specify a byte -> str encoding here (e.g. utf8)
+    if isinstance(result, str):
+        raise ValueError(f"Invalid Content-Encoding: {flow_record.response_content_encoding}")
+    return result
+
+
+def __get_response_structure(
+    flow_record: _PssFlowRecord, response_text: str, response_content: bytes, stable_row_count: _Optional[int] = None
+) -> _Tuple[_utils.NestedDict, bool]:
+    # Returns the structure of the response and whether it has been base64-encoded and compressed
+    try:
+        return _xmlinference.infer_xml_structure(response_text, stable_row_count=stable_row_count), False
+    except _ElementTree.ParseError:
+        pass
+    decoded_content = __get_inflated_response_text(flow_record, response_content)
+    return _xmlinference.infer_xml_structure(decoded_content, stable_row_count=stable_row_count), True
+
+
+def __get_response_text(flow_record: _PssFlowRecord, response_content: _Optional[bytes]) -> _Optional[str]:
+    if response_content is None:
+        return None
+    text_encoding = __guess_text_encoding(flow_record.response_content_type, response_content)
+    return _encoding.decode(response_content, text_encoding)
+
+
+def __guess_text_encoding(content_type: str, content: bytes) -> str:
+    # Determines the charset the same way as mitmproxy's Message.text does
+    parsed_content_type = _parse_content_type(content_type)
+    result = parsed_content_type[2].get("charset") if parsed_content_type else None
+    if not result and "json" in content_type:
+        result = "utf8"
+    if not result and "html" in content_type:
+        meta_charset = __RX_HTML_META_CHARSET.search(content)
+        if meta_charset:
+            result = meta_charset.group(1).decode("ascii", "ignore")
+    if not result and "text/css" in content_type:
+        css_charset = __RX_CSS_CHARSET.match(content)
+        if css_charset:
+            result = css_charset.group(1).decode("ascii", "ignore")
+    if not result:
+        result = "latin-1"
+    # Use GB 18030 as the superset of GB2312 and GBK to fix common encoding problems on Chinese websites.
+    if result.lower() in ("gb2312", "gbk"):
+        result = "gb18030"
+    return result
+
+
+def __merge_shared_type_dictionaries(d1: dict, d2: dict, second_overrides_first: bool = False) -> dict:
+    # Flow details don't get modified after creation, so a dictionary can be shared between them instead of being copied
+    if not d2 or d1 is d2:
+        return d1
+    if not d1:
+        return d2
+    return merge_type_dictionaries(d1, d2, second_overrides_first=second_overrides_first)
+
+
 def merge_flows(flow1: _PssFlowDetails, flow2: _PssFlowDetails, second_overrides_first: bool = False) -> _PssFlowDetails:
-    query_parameters = merge_type_dictionaries(
+    query_parameters = __merge_shared_type_dictionaries(
         flow1.query_parameters,
         flow2.query_parameters,
         second_overrides_first=second_overrides_first,
     )
-    content_structure = merge_type_dictionaries(
+    content_structure = __merge_shared_type_dictionaries(
         flow1.content_structure,
         flow2.content_structure,
         second_overrides_first=second_overrides_first,
     )
-    content_parameters = merge_type_dictionaries(
+    content_parameters = __merge_shared_type_dictionaries(
         flow1.content_parameters,
         flow2.content_parameters,
         second_overrides_first=second_overrides_first,
     )
-    response_structure = merge_type_dictionaries(
+    response_structure = __merge_shared_type_dictionaries(
         flow1.response_structure,
         flow2.response_structure,
         second_overrides_first=second_overrides_first,
@@ -397,55 +558,145 @@ def merge_flows(flow1: _PssFlowDetails, flow2: _PssFlowDetails, second_overrides
 
 
 def merge_type_dictionaries(d1: dict, d2: dict, second_overrides_first: bool = False) -> dict:
-    if d1 and not d2:
-        return dict(d1)
-    if not d1 and d2:
-        return dict(d2)
-
-    result = {}
-    result_names = set(d1.keys()).union(set(d2.keys()))
-    for name in result_names:
-        type1 = d1.get(name)
-        type2 = d2.get(name)
-        if type1 is None:
-            result[name] = type2
-        elif type2 is None:
-            result[name] = type1
-        elif isinstance(type1, dict) and isinstance(type2, dict):
-            result[name] = merge_type_dictionaries(type1, type2)
-        elif isinstance(type1, dict):
-            result[name] = type1
-        elif isinstance(type2, dict):
-            result[name] = type2
-        elif not isinstance(type1, str) or not isinstance(type2, str):
-            pass
-        elif second_overrides_first:
-            result[name] = type2
+    return _datatypes.merge_type_dictionaries(d1, d2, second_overrides_first=second_overrides_first)
+
+
+def __batch_flow_records(flow_records: _Iterable[_PssFlowRecord]) -> _Iterable[_List[_PssFlowRecord]]:
+    batch: _List[_PssFlowRecord] = []
+    batch_bytes = 0
+    for flow_record in flow_records:
+        batch.append(flow_record)
+        batch_bytes += len(flow_record.response_content or b"")
+        if len(batch) >= __FLOW_RECORD_BATCH_SIZE or batch_bytes >= __FLOW_RECORD_BATCH_BYTES:
+            yield batch
+            batch = []
+            batch_bytes = 0
+    if batch:
+        yield batch
+
+
+def __get_flow_details_from_flow_records(
+    flow_records: _Iterable[_PssFlowRecord], stable_row_count: _Optional[int] = None, response_cache: _Optional[_responsecache.ResponseCache] = None
+) -> _Iterable[_PssFlowDetails]:
+    for flow_record in flow_records:
+        if response_cache is None:
+            flow_dict = __convert_flow_record_to_dict(flow_record, stable_row_count=stable_row_count)
         else:
-            type1_value = TYPE_ORDER_LOOKUP.get(type1, 100)
-            type2_value = TYPE_ORDER_LOOKUP.get(type2, 100)
-            if type1_value >= type2_value:
-                result[name] = type1
-            else:
-                result[name] = type2
+            flow_dict = __convert_flow_record_to_dict_cached(flow_record, response_cache, stable_row_count=stable_row_count)
+        yield _PssFlowDetails(flow_dict)
+
+
+def __parse_flow_records(
+    flow_records: _Iterable[_PssFlowRecord], stable_row_count: _Optional[int] = None, response_cache: _Optional[_responsecache.ResponseCache] = None
+) -> AccumulatedApiStructure:
+    if response_cache is None:
+        response_cache = _responsecache.ResponseCache()
+    hits = response_cache.hits
+    seconds_saved = response_cache.seconds_saved
+
+    result = create_accumulated_structure()
+    for flow_details in __get_flow_details_from_flow_records(flow_records, stable_row_count=stable_row_count, response_cache=response_cache):
+        accumulate_flow_details(result, flow_details)
+    result["duplicate_count"] = response_cache.hits - hits
+    result["duplicate_seconds_saved"] = response_cache.seconds_saved - seconds_saved
     return result
 
 
-def __read_flows_from_file(file_path: str) -> _List[_PssFlowDetails]:
-    if not _os.path.isfile(file_path):
-        raise FileNotFoundError(f"The specified file could not be found at: {file_path}")
+def __parse_flow_records_with_jobs(
+    flow_records: _Iterable[_PssFlowRecord], jobs: int, stable_row_count: _Optional[int] = None
+) -> AccumulatedApiStructure:
+    if jobs > 1:
+        return __parse_flow_records_in_parallel(flow_records, jobs, stable_row_count=stable_row_count)
+    return __parse_flow_records(flow_records, stable_row_count=stable_row_count)
+
+
+def __parse_flow_records_in_worker(flow_records: _Iterable[_PssFlowRecord], stable_row_count: _Optional[int] = None) -> AccumulatedApiStructure:
+    # Each worker process reuses its response cache for all the batches it parses
+    return __parse_flow_records(flow_records, stable_row_count=stable_row_count, response_cache=__WORKER_RESPONSE_CACHE)
+
+
+def __parse_flow_records_in_parallel(
+    flow_records: _Iterable[_PssFlowRecord], jobs: int, stable_row_count: _Optional[int] = None
+) -> AccumulatedApiStructure:
+    # Partial results are merged in the order of the batches, so the result is the same as when parsing serially.
+    result = create_accumulated_structure()
+    with _ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending_results = _deque()
+        for batch in __batch_flow_records(flow_records):
+            pending_results.append(executor.submit(__parse_flow_records_in_worker, batch, stable_row_count))
+            if len(pending_results) >= jobs * 2:
+                merge_accumulated_structures(result, pending_results.popleft().result())
+        while pending_results:
+            merge_accumulated_structures(result, pending_results.popleft().result())
+    return result
+
 
-    flow_details: _List[_PssFlowDetails] = []
+def __print_duplicate_statistics(accumulated_structure: AccumulatedApiStructure) -> None:
+    flow_count = accumulated_structure["flow_count"]
+    duplicate_rate = accumulated_structure["duplicate_count"] / flow_count if flow_count else 0.0
+    print(
+        f"Reused the parsed contents of {accumulated_structure['duplicate_count']} duplicate flows ({duplicate_rate:.1%}),"
+        f" saving approx. {accumulated_structure['duplicate_seconds_saved']:.3f} seconds"
+    )
 
-    with open(file_path, "rb") as fp:
-        flow_reader: _FlowReader = _FlowReader(fp)
-        flow_details = [_PssFlowDetails(__convert_flow_to_dict(recorded_flow)) for recorded_flow in flow_reader.stream()]
 
-    blacklisted_services = _utils.read_json("src/pss_api_parser/blacklisted_services.json")
-    blacklisted_endpoints = _utils.read_json("src/pss_api_parser/blacklisted_endpoints.json")
-    result = [
-        flow
-        for flow in flow_details
-        if flow.service not in blacklisted_services and not any(flow.endpoint.startswith(endpoint) for endpoint in blacklisted_endpoints)
-    ]
-    return result
+def __read_resume_checkpoint(file_path: str, checkpoint_settings: dict, verbose: bool) -> _Optional[dict]:
+    checkpoint = _checkpoint.read_checkpoint(file_path, settings=checkpoint_settings)
+    if verbose:
+        if checkpoint:
+            print(f"Resuming from checkpoint at byte {checkpoint['offset']} ({checkpoint['flow_count']} flows parsed before)")
+        else:
+            print("No valid checkpoint found, parsing the whole file")
+    return checkpoint
+
+
+def __read_flow_records_from_file(
+    file_path: str,
+    keep_original_flows: bool = False,
+    start_offset: int = 0,
+    end_offset: _Optional[_List[int]] = None,
+    endpoint_filter: _Optional[_endpointfilter.EndpointFilter] = None,
+    use_flow_reader: bool = False,
+    record_offsets: _Optional[_List[int]] = None,
+    allow_incomplete_end: bool = False,
+) -> _Iterable[_PssFlowRecord]:
+    # If end_offset is given, its first item gets updated with the end position of each flow read.
+    # Flows not matching the endpoint filter (by default: blacklisted services and endpoints) are skipped.
+    # If record_offsets are given, only the records at these offsets get read.
+    # If allow_incomplete_end is True, an incomplete record at the end of the file gets skipped instead of raising an error.
+    # Unless the original flows are required, the file is read without creating mitmproxy flow objects.
+    if endpoint_filter is None:
+        endpoint_filter = _endpointfilter.get_default_endpoint_filter()
+    if not keep_original_flows and not use_flow_reader:
+        yield from _flowsreader.read_flow_records(
+            file_path,
+            start_offset=start_offset,
+            end_offset=end_offset,
+            endpoint_filter=endpoint_filter,
+            record_offsets=record_offsets,
+            allow_incomplete_end=allow_incomplete_end,
+        )
+        return
+
+    recorded_flows = _flowsreader.read_flows(
+        file_path, start_offset=start_offset, end_offset=end_offset, record_offsets=record_offsets, allow_incomplete_end=allow_incomplete_end
+    )
+    for recorded_flow in recorded_flows:
+        if endpoint_filter.matches(recorded_flow.request.path):
+            yield _flowsreader.get_flow_record(recorded_flow, keep_original_flow=keep_original_flows)
+
+
+def __store_resume_checkpoint(file_path: str, offset: int, result: ApiStructure, flow_count: int, checkpoint_settings: dict, verbose: bool) -> None:
+    checkpoint_file_path = _checkpoint.store_checkpoint(
+        file_path, offset, __convert_api_structured_flows_to_dict(result), flow_count, settings=checkpoint_settings
+    )
+    if verbose:
+        print(f"Stored checkpoint at byte {offset} in: {checkpoint_file_path}")
+
+
+def __split_path(path: str) -> _Tuple[str, _Optional[str]]:
+    if "?" in path:
+        path, query_string = path.split("?")
+    else:
+        query_string = None
+    return path, query_string
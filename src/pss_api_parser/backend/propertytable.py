@@ -0,0 +1,119 @@
+from typing import Dict as _Dict
+from typing import Iterable as _Iterable
+from typing import Optional as _Optional
+from typing import Tuple as _Tuple
+
+from .datatypes import TYPE_ORDER_LOOKUP as _TYPE_ORDER_LOOKUP
+
+
+# ----- Constants -----
+
+OTHER_TYPE_CODE = (
+    max(_TYPE_ORDER_LOOKUP.values()) + 1
+)  # Types not in TYPE_ORDER_LOOKUP (e.g. the names of child elements) rank highest, like in merge_type_dictionaries
+
+NameTable = _Tuple[str, ...]
+
+
+# ----- Public Functions -----
+
+
+class PropertyTable:
+    """
+    The property types of an entity: a sorted table of the property names and an array of type codes, the ranks in TYPE_ORDER_LOOKUP.
+    Types not in TYPE_ORDER_LOOKUP get the code OTHER_TYPE_CODE and are kept in other_types.
+
+    Tables with the same property names share their name table, so widening a table with another one with the same properties is an elementwise maximum of their codes.
+    The maximum gets calculated for all codes at once: the codes of both tables are read as one big integer each and combined bytewise via a lookup table.
+    Adding properties a table already has doesn't allocate memory. Up to 4096 name tables are kept for sharing, then they get dropped and built again.
+    The types get widened like merge_type_dictionaries(properties, table) does: between two types not in TYPE_ORDER_LOOKUP, the type added last wins.
+    """
+
+    __slots__ = ("__indexes", "codes", "names", "other_types")
+
+    __CODE_BITS = 3  # All codes fit, so two codes combined fit into a byte
+    __MAX_CODES = bytes(max(i >> 3, i & 7) for i in range(256))  # The higher one of two codes by the codes combined
+    __MAX_NAME_TABLES = 4096
+    __NAME_TABLES: _Dict[NameTable, _Tuple[NameTable, _Dict[str, int]]] = {}  # Name tables and the indexes of their names, shared by all tables
+    __TYPE_NAMES: _Dict[int, _Optional[str]] = {code: type_name for type_name, code in _TYPE_ORDER_LOOKUP.items()}
+
+    def __init__(self, properties: _Optional[_Dict[str, _Optional[str]]] = None) -> None:
+        self.names: NameTable = ()
+        self.codes: bytearray = bytearray()
+        self.other_types: _Dict[str, str] = {}
+        self.__indexes: _Dict[str, int] = {}
+        if properties:
+            self.add(properties)
+
+    def __getstate__(self) -> tuple:
+        return self.names, self.codes, self.other_types
+
+    def __setstate__(self, state: tuple) -> None:
+        names, self.codes, self.other_types = state
+        self.names, self.__indexes = self.__get_name_table(names)
+
+    def add(self, properties: _Dict[str, _Optional[str]]) -> None:
+        """
+        Widens the types with the types of the properties (a dict of property names and type names).
+        Raises a TypeError, if a type is neither a str nor None.
+        """
+        if not properties.keys() <= self.__indexes.keys():
+            self.__add_names(properties)
+
+        codes = self.codes
+        indexes = self.__indexes
+        for name, type_name in properties.items():
+            code = _TYPE_ORDER_LOOKUP.get(type_name, OTHER_TYPE_CODE)
+            if code == OTHER_TYPE_CODE:
+                if not isinstance(type_name, str):
+                    raise TypeError(f"The type of the property '{name}' is neither a str nor None: {type_name!r}")
+                codes[indexes[name]] = code
+                self.other_types[name] = type_name
+            elif code > codes[indexes[name]]:
+                codes[indexes[name]] = code
+
+    def to_dict(self) -> _Dict[str, _Optional[str]]:
+        return {
+            name: self.other_types[name] if code == OTHER_TYPE_CODE else PropertyTable.__TYPE_NAMES[code]
+            for name, code in zip(self.names, self.codes)
+        }
+
+    def widen(self, other: "PropertyTable") -> None:
+        """
+        Widens the types with the types of the other table, which has been added after this one.
+        """
+        if not other.__indexes.keys() <= self.__indexes.keys():
+            self.__add_names(other.names)
+
+        codes = self.codes
+        if other.names is self.names or other.names == self.names:
+            if other.codes != codes:
+                combined_codes = (int.from_bytes(codes, "big") << PropertyTable.__CODE_BITS) | int.from_bytes(other.codes, "big")
+                codes[:] = combined_codes.to_bytes(len(codes), "big").translate(PropertyTable.__MAX_CODES)
+        else:
+            indexes = self.__indexes
+            for name, code in zip(other.names, other.codes):
+                if code > codes[indexes[name]]:
+                    codes[indexes[name]] = code
+        if other.other_types:
+            self.other_types.update(other.other_types)
+
+    def __add_names(self, names: _Iterable[str]) -> None:
+        self.__set_names(self.names + tuple(name for name in names if name not in self.__indexes))
+
+    def __get_name_table(self, names: NameTable) -> _Tuple[NameTable, _Dict[str, int]]:
+        result = PropertyTable.__NAME_TABLES.get(names)
+        if result is None:
+            if len(PropertyTable.__NAME_TABLES) >= PropertyTable.__MAX_NAME_TABLES:
+                PropertyTable.__NAME_TABLES.clear()
+            result = PropertyTable.__NAME_TABLES.setdefault(names, (names, {name: i for i, name in enumerate(names)}))
+        return result
+
+    def __set_names(self, names: NameTable) -> None:
+        names, indexes = self.__get_name_table(tuple(sorted(names)))
+        codes = bytearray(len(names))
+        for name, code in zip(self.names, self.codes):
+            codes[indexes[name]] = code
+        self.names = names
+        self.codes = codes
+        self.__indexes = indexes
@@ -0,0 +1,90 @@
+import hashlib as _hashlib
+from typing import Dict as _Dict
+from typing import Optional as _Optional
+from typing import Tuple as _Tuple
+
+from . import utils as _utils
+from .flowdetails import PssFlowRecord as _PssFlowRecord
+
+
+# ----- Constants and type definitions -----
+
+CacheKey = _Tuple[str, str, _Optional[str], _Optional[bytes], _Optional[str], str, _Optional[bytes]]
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+# ----- Public Functions -----
+
+
+def get_cache_key(flow_record: _PssFlowRecord) -> CacheKey:
+    """
+    Returns a key identifying the endpoint and the contents of the flow record: the request path without the query string and hashes of the raw request and response contents.
+    """
+    return (
+        flow_record.method,
+        flow_record.path.split("?", 1)[0],
+        flow_record.request_content_encoding,
+        __hash_content(flow_record.request_content),
+        flow_record.response_content_encoding,
+        flow_record.response_content_type,
+        __hash_content(flow_record.response_content),
+    )
+
+
+class ResponseCache:
+    """
+    Remembers converted flows by their endpoint and a hash of their contents, so identical responses only get decoded and parsed once.
+
+    The cached structures are shared by all flows with the same contents. Entity types get extracted from the response structure of the first flow only.
+    """
+
+    __slots__ = ("__entries", "__max_entries", "hits", "lookups", "seconds_saved")
+
+    # Keys of a converted flow that differ between flows with the same contents or that aren't required to create the flow details
+    __UNCACHED_KEYS = ("content", "original_flow", "query_parameters", "response")
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.__entries: _Dict[CacheKey, _Tuple[_utils.NestedDict, float]] = {}
+        self.__max_entries: int = max_entries
+        self.hits: int = 0
+        self.lookups: int = 0
+        self.seconds_saved: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def add(self, key: CacheKey, flow_dict: _utils.NestedDict, conversion_seconds: float) -> None:
+        """
+        Stores the converted flow, unless the cache is full. The time it took to convert the flow is counted as saved for each hit.
+        """
+        if len(self.__entries) < self.__max_entries:
+            cached_flow_dict = {name: value for name, value in flow_dict.items() if name not in self.__UNCACHED_KEYS}
+            self.__entries[key] = (cached_flow_dict, conversion_seconds)
+
+    def get(self, key: CacheKey) -> _Optional[_utils.NestedDict]:
+        """
+        Returns a copy of the converted flow stored for the key (without query parameters) or None.
+        """
+        self.lookups += 1
+        entry = self.__entries.get(key)
+        if entry is None:
+            return None
+
+        cached_flow_dict, conversion_seconds = entry
+        self.hits += 1
+        self.seconds_saved += conversion_seconds
+        return dict(cached_flow_dict)
+
+
+# ----- Private Functions -----
+
+
+def __hash_content(content: _Optional[bytes]) -> _Optional[bytes]:
+    if content is None:
+        return None
+    return _hashlib.blake2b(content, digest_size=16).digest()
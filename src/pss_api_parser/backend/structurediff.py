@@ -0,0 +1,147 @@
+import hashlib as _hashlib
+import json as _json
+from typing import Any as _Any
+from typing import Dict as _Dict
+from typing import List as _List
+from typing import Optional as _Optional
+
+from . import datatypes as _datatypes
+from . import utils as _utils
+
+
+# ----- Constants and type definitions -----
+
+ChangeSet = _Dict[str, _Any]
+Fingerprints = _Dict[str, _Dict[str, str]]
+PropertyChange = _Dict[str, _Any]
+
+CHANGE_ADDED = "added"
+CHANGE_CHANGED = "changed"
+CHANGE_NARROWED = "narrowed"
+CHANGE_REMOVED = "removed"
+CHANGE_WIDENED = "widened"
+
+__FINGERPRINT_DIGEST_SIZE = 16
+
+
+# ----- Public Functions -----
+
+
+def diff_structures(old_structure_dict: _utils.NestedDict, new_structure_dict: _utils.NestedDict, include_fingerprints: bool = False) -> ChangeSet:
+    """
+    Compares two structures as stored in structure files and returns the changes as a JSON serializable dict:
+    - 'services' and 'endpoints' ('Service/Endpoint'): the names of the added and removed ones and, for endpoints, the changes per changed endpoint
+    - 'entities': the names of the added and removed entities and the changes per changed entity
+    - 'fingerprints' (only if include_fingerprints is True): the fingerprints of the endpoints and entities of the new structure, so tools can tell which ones they've already processed
+
+    Each change lists the path of the property within the endpoint or entity, the kind of change and the old and new type.
+    Types replaced by a type ranking higher in datatypes.TYPE_ORDER_LOOKUP (e.g. 'int' by 'float') are 'widened', the opposite is 'narrowed'.
+    Endpoints and entities that are equal are not compared any further.
+    """
+    old_endpoints = get_endpoints(old_structure_dict)
+    new_endpoints = get_endpoints(new_structure_dict)
+    old_entities = old_structure_dict.get("entities") or {}
+    new_entities = new_structure_dict.get("entities") or {}
+    old_services = set(old_structure_dict.get("endpoints") or {})
+    new_services = set(new_structure_dict.get("endpoints") or {})
+
+    result = {
+        "services": {
+            CHANGE_ADDED: sorted(new_services - old_services),
+            CHANGE_REMOVED: sorted(old_services - new_services),
+        },
+        "endpoints": __diff_elements(old_endpoints, new_endpoints),
+        "entities": __diff_elements(old_entities, new_entities),
+    }
+    if include_fingerprints:
+        result["fingerprints"] = get_fingerprints(new_structure_dict)
+    return result
+
+
+def get_endpoints(structure_dict: _utils.NestedDict) -> _Dict[str, _utils.NestedDict]:
+    """
+    Returns the flow dicts of the endpoints in the structure by their names ('Service/Endpoint').
+    """
+    return {
+        f"{service}/{endpoint}": flow_dict
+        for service, endpoints in (structure_dict.get("endpoints") or {}).items()
+        for endpoint, flow_dict in endpoints.items()
+    }
+
+
+def get_fingerprint(value: _Any) -> str:
+    """
+    Returns a hash of the value, independent of the order of the keys of dicts.
+    """
+    data = _json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return _hashlib.blake2b(data, digest_size=__FINGERPRINT_DIGEST_SIZE).hexdigest()
+
+
+def get_fingerprints(structure_dict: _utils.NestedDict) -> Fingerprints:
+    """
+    Returns the fingerprints of the endpoints ('Service/Endpoint') and entities in the structure.
+    """
+    result = {
+        "endpoints": {name: get_fingerprint(flow_dict) for name, flow_dict in get_endpoints(structure_dict).items()},
+        "entities": {name: get_fingerprint(properties) for name, properties in (structure_dict.get("entities") or {}).items()},
+    }
+    return result
+
+
+def has_changes(change_set: ChangeSet) -> bool:
+    for name in ("services", "endpoints", "entities"):
+        if any(change_set[name].values()):
+            return True
+    return False
+
+
+# ----- Private Functions -----
+
+
+def __diff_elements(old_elements: _Dict[str, _Any], new_elements: _Dict[str, _Any]) -> ChangeSet:
+    changed = {}
+    for name in sorted(old_elements.keys() & new_elements.keys()):
+        if old_elements[name] == new_elements[name]:
+            continue
+        changes = []
+        __diff_values(old_elements[name], new_elements[name], [], changes)
+        if changes:
+            changed[name] = changes
+
+    result = {
+        CHANGE_ADDED: sorted(new_elements.keys() - old_elements.keys()),
+        CHANGE_REMOVED: sorted(old_elements.keys() - new_elements.keys()),
+        CHANGE_CHANGED: changed,
+    }
+    return result
+
+
+def __diff_values(old_value: _Any, new_value: _Any, path: _List[str], changes: _List[PropertyChange]) -> None:
+    if isinstance(old_value, dict) and isinstance(new_value, dict):
+        for key in sorted(old_value.keys() | new_value.keys()):
+            if key not in new_value:
+                changes.append(__get_property_change(path + [key], CHANGE_REMOVED, old_value[key], None))
+            elif key not in old_value:
+                changes.append(__get_property_change(path + [key], CHANGE_ADDED, None, new_value[key]))
+            else:
+                __diff_values(old_value[key], new_value[key], path + [key], changes)
+    elif old_value != new_value:
+        changes.append(__get_property_change(path, __get_type_change(old_value, new_value), old_value, new_value))
+
+
+def __get_property_change(path: _List[str], change: str, old_value: _Any, new_value: _Any) -> PropertyChange:
+    return {"path": path, "change": change, "old": old_value, "new": new_value}
+
+
+def __get_type_change(old_type: _Any, new_type: _Any) -> str:
+    old_rank = __get_type_rank(old_type)
+    new_rank = __get_type_rank(new_type)
+    if old_rank is None or new_rank is None:
+        return CHANGE_CHANGED
+    return CHANGE_WIDENED if new_rank > old_rank else CHANGE_NARROWED
+
+
+def __get_type_rank(data_type: _Any) -> _Optional[int]:
+    if data_type is None or (isinstance(data_type, str) and data_type in _datatypes.TYPE_ORDER_LOOKUP):
+        return _datatypes.TYPE_ORDER_LOOKUP[data_type]
+    return None
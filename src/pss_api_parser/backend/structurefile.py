@@ -0,0 +1,315 @@
+import json as _json
+import os as _os
+import struct as _struct
+import sys as _sys
+from array import array as _array
+from itertools import islice as _islice
+from json.encoder import encode_basestring_ascii as _encode_basestring_ascii
+from pathlib import Path
+from typing import Any as _Any
+from typing import Callable as _Callable
+from typing import Dict as _Dict
+from typing import List as _List
+from typing import Optional as _Optional
+from typing import Tuple as _Tuple
+
+from . import utils as _utils
+
+
+# ----- Constants -----
+
+BINARY_STRUCTURE_FILE_SUFFIX = ".pssapi"
+BINARY_STRUCTURE_MAGIC = b"\x89PSSAPI\n"
+BINARY_STRUCTURE_VERSION = 2
+
+__HEADER_LENGTH = len(BINARY_STRUCTURE_MAGIC) + 1  # Magic bytes, format version
+# Numbers of strings, bytes of string data, bytes of number data, containers, dict keys and container values
+__BINARY_TABLE_COUNTS: _struct.Struct = _struct.Struct("<6I")
+__BINARY_CONSTANTS = (None, False, True)
+__BINARY_DICT = ord("d")
+__BINARY_LIST = ord("l")
+__JSON_INDENT = "  "
+__WRITE_BUFFER_SIZE = 1 << 20
+
+
+# ----- Public Functions -----
+
+
+def convert_structure_file(source_file_path: Path | str, target_file_path: Path | str, compressed: bool = True) -> bool:
+    """
+    Converts a structure JSON file into a binary structure file and vice versa. Returns True, if the target file is a binary structure file.
+    """
+    binary = not is_binary_structure_file(source_file_path)
+    store_structure_dict(target_file_path, read_structure_dict(source_file_path), compressed=compressed, binary=binary)
+    return binary
+
+
+def is_binary_structure_file(file_path: Path | str) -> bool:
+    with open(file_path, "rb") as fp:
+        return fp.read(len(BINARY_STRUCTURE_MAGIC)) == BINARY_STRUCTURE_MAGIC
+
+
+def load_structure_dict(data: bytes, source: str = "The binary structure data") -> _utils.NestedDict:
+    """
+    Loads a structure from the contents of a structure JSON file or a binary structure file, detected by its magic bytes. See read_structure_dict.
+    """
+    if not data.startswith(BINARY_STRUCTURE_MAGIC):
+        return _json.loads(data)
+
+    if data[len(BINARY_STRUCTURE_MAGIC)] != BINARY_STRUCTURE_VERSION:
+        raise ValueError(f"{source} has been written by an incompatible version, convert it from its JSON file again")
+    try:
+        return __decode_binary_structure(memoryview(data)[__HEADER_LENGTH:])
+    except (IndexError, _struct.error, ValueError) as ex:
+        raise ValueError(f"{source} is invalid: {ex}") from ex
+
+
+def read_structure_dict(file_path: Path | str) -> _utils.NestedDict:
+    """
+    Reads a structure JSON file or a binary structure file, detected by its magic bytes.
+
+    Identical parts of a binary structure file (e.g. the same entity in several responses) are loaded as the same dict objects, so the result must not be modified in place.
+    Raises a ValueError, if the binary structure file has been written in another format version or is invalid.
+    """
+    with open(file_path, "rb") as fp:
+        data = fp.read()
+    return load_structure_dict(data, source=f"The binary structure file {file_path}")
+
+
+def store_structure_dict(file_path: Path | str, structure_dict: _utils.NestedDict, compressed: bool = True, binary: bool = False) -> None:
+    """
+    Stores the structure as JSON or in a binary structure file. The keys get sorted in both formats.
+
+    The JSON gets written straight from the structure without copying it. Lists get written sorted, like utils.get_ordered_dict sorts them, but the structure is left unchanged.
+    A binary structure file stores identical parts of the structure and repeated strings only once, so it loads a lot faster than JSON. Storing it takes about as long as storing JSON.
+    It consists of a string table and arrays of ids only, so it can be read safely with any version of Python.
+
+    The file gets written to a temporary file next to it first and is then replaced, so readers never see a partially written file.
+    """
+    file_path = Path(file_path)
+    temp_file_path = file_path.with_name(f"{file_path.name}.tmp")
+    try:
+        if binary:
+            shared_structure_dict = __get_shared_dict(structure_dict, {})
+            with open(temp_file_path, "wb") as fp:
+                fp.write(BINARY_STRUCTURE_MAGIC + bytes((BINARY_STRUCTURE_VERSION,)))
+                for chunk in __encode_binary_structure(shared_structure_dict):
+                    fp.write(chunk)
+        else:
+            with open(temp_file_path, "w", buffering=__WRITE_BUFFER_SIZE) as fp:
+                write_structure_json(fp.write, structure_dict, compressed=compressed)
+        _os.replace(temp_file_path, file_path)
+    except BaseException:
+        temp_file_path.unlink(missing_ok=True)
+        raise
+
+
+def write_structure_json(write: _Callable[[str], _Any], structure_dict: _utils.NestedDict, compressed: bool = True) -> None:
+    """
+    Writes the structure as JSON with sorted keys, the same JSON as json.dump(utils.get_ordered_dict(structure_dict)) writes, by passing it in chunks to write (e.g. the write method of a text file).
+    If compressed is False, the JSON gets indented by 2 spaces.
+    """
+    __write_json_value(write, structure_dict, None if compressed else "\n")
+
+
+# ----- Private Functions -----
+
+
+def __collect_binary_values(value: _Any, strings: _Dict[str, int], numbers: _Dict[tuple, int], containers: _Dict[int, _Tuple[int, _Any]]) -> None:
+    # Numbers the distinct strings and numbers and the containers (dicts and lists) by identity. Containers are numbered after their values.
+    if isinstance(value, str):
+        strings.setdefault(value, len(strings))
+    elif value is None or isinstance(value, bool):
+        pass
+    elif isinstance(value, (int, float)):
+        numbers.setdefault((type(value), value), len(numbers))
+    elif isinstance(value, (dict, list)):
+        if id(value) in containers:
+            return
+        if isinstance(value, dict):
+            for key in value.keys():
+                strings.setdefault(key, len(strings))
+        for item in value.values() if isinstance(value, dict) else value:
+            __collect_binary_values(item, strings, numbers, containers)
+        containers[id(value)] = (len(containers), value)
+    else:
+        raise TypeError(f"Values of type {type(value).__name__} can't be stored in a binary structure file")
+
+
+def __decode_binary_structure(data: memoryview) -> _utils.NestedDict:
+    string_count, string_data_length, number_data_length, container_count, key_count, value_count = __BINARY_TABLE_COUNTS.unpack_from(data)
+    position = __BINARY_TABLE_COUNTS.size
+    string_lengths, position = __read_uint32_array(data, position, string_count)
+    string_data = str(data[position : position + string_data_length], "utf-8", "surrogatepass")
+    position += string_data_length
+    numbers = _json.loads(bytes(data[position : position + number_data_length])) if number_data_length else []
+    position += number_data_length
+    container_kinds = bytes(data[position : position + container_count])
+    position += container_count
+    container_sizes, position = __read_uint32_array(data, position, container_count)
+    key_ids, position = __read_uint32_array(data, position, key_count)
+    value_ids, position = __read_uint32_array(data, position, value_count)
+    if position != len(data) or not isinstance(numbers, list) or not container_count:
+        raise ValueError("unexpected table sizes")
+    if sum(size for kind, size in zip(container_kinds, container_sizes) if kind == __BINARY_DICT) != key_count or sum(container_sizes) != value_count:
+        raise ValueError("unexpected number of container items")
+    if key_ids and not len(__BINARY_CONSTANTS) <= min(key_ids) <= max(key_ids) < len(__BINARY_CONSTANTS) + string_count:
+        raise ValueError("dict key is not a string")
+
+    objects: _List[_Any] = list(__BINARY_CONSTANTS)
+    string_end = 0
+    for string_length in string_lengths:
+        string_start, string_end = string_end, string_end + string_length
+        objects.append(_sys.intern(string_data[string_start:string_end]))
+    if string_end != len(string_data):
+        raise ValueError("unexpected length of string data")
+    objects.extend(numbers)
+
+    # The values of a container precede it, so they have been created when the lazily mapped ids of its items get looked up
+    keys = map(objects.__getitem__, key_ids)
+    values = map(objects.__getitem__, value_ids)
+    for kind, size in zip(container_kinds, container_sizes):
+        if kind == __BINARY_DICT:
+            objects.append(dict(zip(_islice(keys, size), _islice(values, size))))
+        elif kind == __BINARY_LIST:
+            objects.append(list(_islice(values, size)))
+        else:
+            raise ValueError(f"unknown container kind: {kind}")
+    return objects[-1]
+
+
+def __encode_binary_structure(structure_dict: _utils.NestedDict) -> _List[bytes]:
+    # Ids refer to None, False, True, the strings, the numbers and the containers in this order. The structure is the last container.
+    strings: _Dict[str, int] = {}
+    numbers: _Dict[tuple, int] = {}
+    containers: _Dict[int, _Tuple[int, _Any]] = {}
+    __collect_binary_values(structure_dict, strings, numbers, containers)
+    string_offset = len(__BINARY_CONSTANTS)
+    number_offset = string_offset + len(strings)
+    container_offset = number_offset + len(numbers)
+
+    def get_id(value: _Any) -> int:
+        if value is None or isinstance(value, bool):
+            return __BINARY_CONSTANTS.index(value)
+        if isinstance(value, str):
+            return string_offset + strings[value]
+        if isinstance(value, (int, float)):
+            return number_offset + numbers[(type(value), value)]
+        return container_offset + containers[id(value)][0]
+
+    container_kinds = bytearray()
+    container_sizes = _array("I")
+    key_ids = _array("I")
+    value_ids = _array("I")
+    for _, container in containers.values():
+        container_sizes.append(len(container))
+        if isinstance(container, dict):
+            container_kinds.append(__BINARY_DICT)
+            key_ids.extend(string_offset + strings[key] for key in container.keys())
+            value_ids.extend(map(get_id, container.values()))
+        else:
+            container_kinds.append(__BINARY_LIST)
+            value_ids.extend(map(get_id, container))
+
+    string_data = "".join(strings).encode("utf-8", "surrogatepass")
+    number_data = _json.dumps([number for _, number in numbers]).encode("utf-8") if numbers else b""
+    return [
+        __BINARY_TABLE_COUNTS.pack(len(strings), len(string_data), len(number_data), len(containers), len(key_ids), len(value_ids)),
+        __get_little_endian_bytes(_array("I", map(len, strings))),
+        string_data,
+        number_data,
+        bytes(container_kinds),
+        __get_little_endian_bytes(container_sizes),
+        __get_little_endian_bytes(key_ids),
+        __get_little_endian_bytes(value_ids),
+    ]
+
+
+def __get_little_endian_bytes(values: _array) -> bytes:
+    if _sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def __get_shared_dict(d: _utils.NestedDict, shared_dicts: _Dict[tuple, _utils.NestedDict]) -> _utils.NestedDict:
+    # Returns a copy of the dict with sorted keys and interned strings. Equal dicts are replaced by the same object, which the binary format stores only once.
+    result = {}
+    shared_dict_key = []
+    for key in sorted(d.keys()):
+        value = d[key]
+        if isinstance(value, str):
+            value = _sys.intern(value)
+            shared_dict_key.append((key, value))
+        else:
+            if isinstance(value, dict):
+                value = __get_shared_dict(value, shared_dicts)
+            # Dicts and lists are compared by identity, other values by type and value (True equals 1)
+            shared_dict_key.append((key, type(value), id(value) if isinstance(value, (dict, list)) else value))
+        result[_sys.intern(key)] = value
+    return shared_dicts.setdefault(tuple(shared_dict_key), result)
+
+
+def __read_uint32_array(data: memoryview, position: int, count: int) -> _Tuple[_array, int]:
+    end = position + 4 * count
+    if end > len(data):
+        raise ValueError("unexpected end of data")
+    result = _array("I")
+    result.frombytes(data[position:end])
+    if _sys.byteorder == "big":
+        result.byteswap()
+    return result, end
+
+
+def __write_json_dict(write: _Callable[[str], _Any], d: dict, newline: _Optional[str]) -> None:
+    if newline is None:
+        item_newline = None
+        item_separator = ","
+        key_separator = ":"
+        write("{")
+    else:
+        item_newline = newline + __JSON_INDENT
+        item_separator = "," + item_newline
+        key_separator = ": "
+        write("{" + item_newline)
+    first = True
+    for key in sorted(d.keys()):
+        if first:
+            first = False
+        else:
+            write(item_separator)
+        value = d[key]
+        if isinstance(value, str):
+            write(f"{_encode_basestring_ascii(key)}{key_separator}{_encode_basestring_ascii(value)}")
+        else:
+            write(_encode_basestring_ascii(key) + key_separator)
+            __write_json_value(write, value, item_newline)
+    write("}" if newline is None else newline + "}")
+
+
+def __write_json_list(write: _Callable[[str], _Any], values: list, newline: _Optional[str]) -> None:
+    item_newline = None if newline is None else newline + __JSON_INDENT
+    item_separator = "," if item_newline is None else "," + item_newline
+    write("[" if item_newline is None else "[" + item_newline)
+    for i, value in enumerate(sorted(values)):
+        if i:
+            write(item_separator)
+        __write_json_value(write, value, item_newline)
+    write("]" if newline is None else newline + "]")
+
+
+def __write_json_value(write: _Callable[[str], _Any], value: _Any, newline: _Optional[str]) -> None:
+    # newline is None for compressed JSON, otherwise a line break followed by the indentation of the current level
+    if isinstance(value, str):
+        write(_encode_basestring_ascii(value))
+    elif isinstance(value, dict):
+        if value:
+            __write_json_dict(write, value, newline)
+        else:
+            write("{}")
+    elif isinstance(value, list):
+        if value:
+            __write_json_list(write, value, newline)
+        else:
+            write("[]")
+    else:
+        write(_json.dumps(value))
@@ -0,0 +1,155 @@
+from typing import Dict as _Dict
+from typing import List as _List
+from typing import Optional as _Optional
+from xml.etree import ElementTree as _ElementTree
+
+from . import datatypes as _datatypes
+from . import utils as _utils
+
+
+# ----- Constants -----
+
+__FEED_CHUNK_SIZE = 64 * 1024
+
+# Inference modes of an element
+__MODE_FULL = 0  # Infer property types and the structure of all children
+__MODE_ROW = 1  # Repeated sibling: only its property types get merged into the first sibling's
+__MODE_SHAPE = 2  # Descendant of a repeated sibling: only the shape gets tracked, the result will be discarded
+
+__SHAPE_PROPERTIES = {}
+
+
+# ----- Public Functions -----
+
+
+def infer_xml_structure(xml: str | bytes, stable_row_count: _Optional[int] = None) -> _utils.NestedDict:
+    """
+    Streams the XML document and returns its structure: a dictionary per element tag containing the types of the element's attributes as 'properties' and the structure of its children.
+    Repeated siblings only contribute the types of their attributes to the first sibling's structure.
+
+    If stable_row_count is None, the result is exactly the same as converting the parsed element tree.
+    Unlike that conversion, repeated siblings without attributes are accepted: they don't add any properties.
+    Otherwise the types of a group of repeated siblings stop being widened once they haven't changed for that many siblings in a row, unless a sibling introduces new attributes or a value for an attribute without a type yet.
+    Raises an ElementTree.ParseError, if the document is malformed.
+    """
+    parser = _ElementTree.XMLPullParser(events=("start", "end"))
+    frames: _List[__Frame] = []
+    result = None
+    for i in range(0, len(xml), __FEED_CHUNK_SIZE):
+        parser.feed(xml[i : i + __FEED_CHUNK_SIZE])
+        result = __process_events(parser.read_events(), frames, stable_row_count) or result
+    parser.close()
+    result = __process_events(parser.read_events(), frames, stable_row_count) or result
+    if result is None:
+        raise _ElementTree.ParseError("no element found")
+    return result
+
+
+# ----- Private Functions -----
+
+
+class __Frame:
+    __slots__ = ("element", "mode", "result", "stable_rows")
+
+    def __init__(self, element: _ElementTree.Element, mode: int, result: _utils.NestedDict) -> None:
+        self.element: _ElementTree.Element = element
+        self.mode: int = mode
+        self.result: _utils.NestedDict = result
+        self.stable_rows: _Dict[str, int] = {}  # Number of repeated children per tag in a row that didn't change the types
+
+
+def __end_element(frame: __Frame, parent: __Frame, stable_row_count: _Optional[int]) -> None:
+    tag = frame.element.tag
+    if tag not in parent.result:
+        parent.result[tag] = frame.result
+        return
+
+    if frame.mode == __MODE_SHAPE:
+        return
+
+    changed = __merge_properties(parent.result[tag], frame.result.get("properties"))
+    if stable_row_count is not None:
+        parent.stable_rows[tag] = 0 if changed else parent.stable_rows.get(tag, 0) + 1
+
+
+def __get_mode(element: _ElementTree.Element, parent: __Frame, stable_row_count: _Optional[int]) -> int:
+    if parent.mode != __MODE_FULL:
+        return __MODE_SHAPE
+    if element.tag not in parent.result:
+        return __MODE_FULL
+    if stable_row_count is not None and parent.stable_rows.get(element.tag, 0) >= stable_row_count:
+        entry = parent.result[element.tag]
+        properties = entry.get("properties") if type(entry) is dict else None
+        if (
+            type(properties) is dict
+            and element.attrib
+            and all(__is_known_property(properties, name, value) for name, value in element.attrib.items())
+        ):
+            return __MODE_SHAPE  # The group is stable and the element doesn't introduce new attributes or values for properties without a type
+    return __MODE_ROW
+
+
+def __is_known_property(properties: dict, name: str, value: str) -> bool:
+    return name in properties and (properties[name] is not None or not value)
+
+
+def __merge_properties(entry: _utils.NestedDict, source: _Optional[dict]) -> bool:
+    # Widens the properties of the first sibling with the ones of a repeated sibling. Siblings without attributes have none. Returns True, if they have been changed.
+    target = entry.get("properties")
+    if source is None:
+        return False
+    if target is None:
+        entry["properties"] = source
+        return True
+    if type(target) is dict and type(source) is dict:
+        return __widen_properties(target, source)
+    entry["properties"] = _datatypes.merge_type_dictionaries(target, source)
+    return True
+
+
+def __process_events(events, frames: _List[__Frame], stable_row_count: _Optional[int]) -> _Optional[_utils.NestedDict]:
+    result = None
+    for event, element in events:
+        if event == "start":
+            parent = frames[-1] if frames else None
+            mode = __get_mode(element, parent, stable_row_count) if parent else __MODE_FULL
+            element_result = {}
+            if element.attrib:
+                if mode == __MODE_SHAPE:
+                    element_result["properties"] = __SHAPE_PROPERTIES
+                else:
+                    element_result["properties"] = {key: _datatypes.determine_data_type(value) for key, value in element.attrib.items()}
+            frames.append(__Frame(element, mode, element_result))
+        else:
+            frame = frames.pop()
+            if frames:
+                parent = frames[-1]
+                __end_element(frame, parent, stable_row_count)
+                del parent.element[:]  # Drop the parsed element from the tree
+            else:
+                result = {element.tag: frame.result}
+    return result
+
+
+def __widen_properties(target: dict, source: dict) -> bool:
+    # Widens the types in target in place, like merge_type_dictionaries(target, source) would. Returns True, if target has been changed.
+    changed = False
+    for name, type2 in source.items():
+        type1 = target.get(name)
+        if type1 is None:
+            if name not in target or type2 is not None:
+                target[name] = type2
+                changed = True
+        elif type2 is None or type1 == type2:
+            continue
+        elif isinstance(type1, dict) or isinstance(type2, dict):
+            widened_type = _datatypes.merge_type_dictionaries({name: type1}, {name: type2})[name]
+            changed = changed or widened_type is not type1
+            target[name] = widened_type
+        elif not isinstance(type1, str) or not isinstance(type2, str):
+            del target[name]
+            changed = True
+        elif _datatypes.TYPE_ORDER_LOOKUP.get(type2, 100) > _datatypes.TYPE_ORDER_LOOKUP.get(type1, 100):
+            target[name] = type2
+            changed = True
+    return changed
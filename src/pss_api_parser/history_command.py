@@ -0,0 +1,121 @@
+from pathlib import Path
+from time import perf_counter
+from typing import Annotated, Optional
+
+import typer
+from rich import print as rich_print
+
+from . import ui
+from .backend.history import StructureHistory, get_kind
+from .backend.merge import get_structure_file_paths
+
+
+app = typer.Typer()
+
+
+DatabaseArgument = Annotated[
+    Path,
+    typer.Argument(
+        file_okay=True,
+        dir_okay=False,
+        show_default=False,
+        help="Path to the history database (SQLite)",
+    ),
+]
+ExistingDatabaseArgument = Annotated[
+    Path,
+    typer.Argument(
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+        exists=True,
+        show_default=False,
+        help="Path to the history database (SQLite)",
+    ),
+]
+
+
+@app.command("ingest", help="Add parsed flows files to the history database as new snapshots, from oldest to newest.")
+def ingest(
+    database: DatabaseArgument,
+    parsed_flows: Annotated[
+        list[Path],
+        typer.Argument(
+            file_okay=True,
+            dir_okay=True,
+            show_default=False,
+            help="Path(s) to the parsed flows file(s) to be added, oldest first. Directories and quoted glob patterns (e.g. 'parsed/*.json') are expanded",
+        ),
+    ],
+    name: Annotated[
+        Optional[str],
+        typer.Option(
+            "--name", "-n", show_default=False, help="Name of the snapshot (default: the file name without its suffix), requires a single file"
+        ),
+    ] = None,
+):
+    try:
+        file_paths = get_structure_file_paths(parsed_flows)
+    except FileNotFoundError as ex:
+        raise typer.BadParameter(str(ex)) from ex
+    if name and len(file_paths) > 1:
+        raise typer.BadParameter("--name can't be combined with more than one file.")
+
+    rich_print("Add parsed flows files to the history database.\n")
+    ui.print_input_output(parsed_flows, database)
+    ui.print_step(f"Files to add: {len(file_paths)}", "yellow")
+
+    start = perf_counter()
+    with StructureHistory(database) as history:
+        for file_path in file_paths:
+            try:
+                summary = history.ingest_file(file_path, snapshot_name=name)
+            except ValueError as ex:
+                raise typer.BadParameter(str(ex)) from ex
+            ui.print_list_item(
+                f"{file_path}: {summary.added} added, {summary.changed} changed, {summary.removed} removed, {summary.unchanged} unchanged endpoints and entities"
+            )
+    end = perf_counter()
+    ui.print_step(f"All files added in {end-start:.2f} seconds.", "blue")
+
+
+@app.command("snapshots", help="List the snapshots in the history database, optionally only those containing an endpoint or entity.")
+def snapshots(
+    database: ExistingDatabaseArgument,
+    name: Annotated[
+        Optional[str],
+        typer.Argument(show_default=False, help="Name of an endpoint ('Service/Endpoint') or entity"),
+    ] = None,
+):
+    with StructureHistory(database) as history:
+        found_snapshots = history.get_snapshots(get_kind(name), name) if name else history.get_snapshots()
+
+    if name:
+        ui.print_step(f"Snapshots containing {name}: {len(found_snapshots)}", "blue")
+    else:
+        ui.print_step(f"Snapshots: {len(found_snapshots)}", "blue")
+    for snapshot in found_snapshots:
+        ui.print_list_item(f"{snapshot.name} (added {snapshot.ingested_at} from {snapshot.source_path})")
+
+
+@app.command("property", help="Show the types a property of an endpoint or entity had over time.")
+def property_history(
+    database: ExistingDatabaseArgument,
+    name: Annotated[str, typer.Argument(show_default=False, help="Name of an endpoint ('Service/Endpoint') or entity")],
+    path: Annotated[
+        str,
+        typer.Argument(
+            show_default=False, help="Path of the property, separated by '/' (e.g. 'ShipStatus' or 'response_structure/ShipService/Ships')"
+        ),
+    ],
+):
+    with StructureHistory(database) as history:
+        property_versions = history.get_property_history(get_kind(name), name, path.split("/"))
+
+    ui.print_step(f"Types of {name}: {path}", "blue")
+    if not property_versions:
+        ui.print_step(f"Not found in any snapshot: {name}", "blue")
+    for property_version in property_versions:
+        last_snapshot = property_version.last_snapshot or "latest"
+        property_type = "missing" if property_version.type is None else property_version.type
+        ui.print_list_item(f"{property_version.first_snapshot} - {last_snapshot}: {property_type}")
@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 from time import perf_counter
 from typing import Annotated, Optional
@@ -5,12 +6,15 @@ from typing import Annotated, Optional
 import typer
 from rich import print as rich_print
 
-from . import __version__, parse_command, ui
-from .backend.anonymize import anonymize_file
+from . import __version__, history_command, parse_command, ui
+from .backend.anonymize import anonymize_files
 from .backend.enums import ProgrammingLanguage
 from .backend.generate import generate_source_code
-from .backend.merge import apply_overrides, merge_api_structures, read_structure_json
+from .backend.merge import get_structure_file_paths, merge_structure_files
+from .backend.overrides import load_overrides
 from .backend.parse import store_structure_json
+from .backend.structurediff import CHANGE_ADDED, CHANGE_CHANGED, CHANGE_REMOVED, diff_structures, has_changes
+from .backend.structurefile import convert_structure_file, read_structure_dict
 
 
 app = typer.Typer(
@@ -21,6 +25,7 @@ app = typer.Typer(
     no_args_is_help=True,
 )
 app.add_typer(parse_command.app, name="parse", help="Commands for parsing enumerations and network traffic into JSON files.")
+app.add_typer(history_command.app, name="history", help="Commands for keeping parsed flows files in a history database and querying it.")
 
 
 @app.command("anon", help="Remove personal and confidential data from mitmproxy flows files.")
@@ -47,21 +52,148 @@ def anonymize(
             help="Path(s) to the mitmproxy flows file(s) to be anonymized",
         ),
     ],
+    endpoint: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            "--endpoint",
+            "-e",
+            show_default=False,
+            help="Only anonymize the flows of this endpoint ('Service/Endpoint'), looked up in the index of each flows file. Can be specified multiple times",
+        ),
+    ] = None,
+    jobs: Annotated[
+        int,
+        typer.Option("--jobs", "-j", min=1, help="Number of worker processes anonymizing chunks of flows of all files at the same time"),
+    ] = 1,
 ):
     rich_print("Anonymize mitmproxy flows files.\n")
     ui.print_input_output(flows, out_dir)
+    ui.print_step(f"Parallel jobs: {jobs}", "yellow")
     ui.print_step("Anonymizing captured flows...", "blue")
     start = perf_counter()
 
-    for in_path in flows:
-        ui.print_step(f"Anonymizing file: {in_path}", "blue")
-        out_path = anonymize_file(in_path, out_dir)
+    with ui.create_file_progress() as progress:
+        task_ids = [
+            progress.add_task(in_path.name, total=in_path.stat().st_size, item_count=0, item_name="flows", items_per_second=0) for in_path in flows
+        ]
+        file_starts = {}
+
+        def update_progress(file_index: int, flow_count: int, position: int) -> None:
+            file_start = file_starts.setdefault(file_index, perf_counter())
+            items_per_second = flow_count / max(perf_counter() - file_start, 1e-9)
+            progress.update(task_ids[file_index], completed=position, item_count=flow_count, items_per_second=items_per_second)
+
+        out_paths = anonymize_files(flows, out_dir, endpoints=endpoint, jobs=jobs, progress=update_progress)
+        for task_id, in_path in zip(task_ids, flows):
+            progress.update(task_id, completed=in_path.stat().st_size)
+
+    for out_path in out_paths:
         ui.print_step(f"Stored anonymized flows at: {out_path}", "blue")
 
     end = perf_counter()
     ui.print_step(f"All files anonymized in {end-start:.2f} seconds.", "blue")
 
 
+@app.command("convert", help="Convert a parsed flows file from JSON into the binary structure format and vice versa.")
+def convert(
+    out_file: Annotated[
+        Path,
+        typer.Argument(
+            file_okay=True,
+            dir_okay=False,
+            writable=True,
+            show_default=False,
+            help="Target path for the converted file",
+        ),
+    ],
+    parsed_flows: Annotated[
+        Path,
+        typer.Argument(
+            file_okay=True,
+            dir_okay=False,
+            readable=True,
+            exists=True,
+            show_default=False,
+            help="Path to the parsed flows file to be converted",
+        ),
+    ],
+    uncompressed: Annotated[bool, typer.Option("--uncompressed", "-u", show_default=False, help="Preserve whitespace in a JSON output file")] = False,
+):
+    rich_print("Convert a parsed flows file.\n")
+    ui.print_input_output([parsed_flows], out_file)
+
+    start = perf_counter()
+    binary = convert_structure_file(parsed_flows, out_file, compressed=(not uncompressed))
+    end = perf_counter()
+
+    ui.print_step(f"Converted to {'binary' if binary else 'JSON'} in {end-start:.2f} seconds.", "blue")
+
+
+@app.command("diff", help="Compare two parsed flows files and list the changes of the API structure.")
+def diff(
+    old_parsed_flows: Annotated[
+        Path,
+        typer.Argument(
+            file_okay=True,
+            dir_okay=False,
+            readable=True,
+            exists=True,
+            show_default=False,
+            help="Path to the parsed flows file of the older API structure",
+        ),
+    ],
+    new_parsed_flows: Annotated[
+        Path,
+        typer.Argument(
+            file_okay=True,
+            dir_okay=False,
+            readable=True,
+            exists=True,
+            show_default=False,
+            help="Path to the parsed flows file of the newer API structure",
+        ),
+    ],
+    out_file: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--out",
+            "-o",
+            file_okay=True,
+            dir_okay=False,
+            writable=True,
+            show_default=False,
+            help="Target path for the change set as JSON",
+        ),
+    ] = None,
+):
+    rich_print("Compare parsed flows files.\n")
+    if out_file:
+        ui.print_input_output([old_parsed_flows, new_parsed_flows], out_file)
+    else:
+        ui.print_step(f"Comparing: {old_parsed_flows} -> {new_parsed_flows}", "yellow")
+
+    start = perf_counter()
+    change_set = diff_structures(
+        read_structure_dict(old_parsed_flows), read_structure_dict(new_parsed_flows), include_fingerprints=out_file is not None
+    )
+    if out_file:
+        with open(out_file, "w") as fp:
+            json.dump(change_set, fp, indent=2)
+    end = perf_counter()
+
+    for name in ("services", "endpoints", "entities"):
+        for change in (CHANGE_ADDED, CHANGE_REMOVED):
+            for element_name in change_set[name][change]:
+                ui.print_list_item(f"{change.capitalize()} {name[:-1]}: {element_name}")
+        for element_name, changes in change_set[name].get(CHANGE_CHANGED, {}).items():
+            ui.print_list_item(f"Changed {name[:-1]}: {element_name}")
+            for change in changes:
+                ui.print_list_item(f"  {change['change'].capitalize()}: {'/'.join(change['path'])} ({change['old']} -> {change['new']})")
+    if not has_changes(change_set):
+        ui.print_step("No changes found.", "blue")
+    ui.print_step(f"Compared in {end-start:.2f} seconds.", "blue")
+
+
 @app.command(name="gen", help="Generate pssapi library code.")
 def gen(
     out_dir: Annotated[
@@ -166,11 +298,9 @@ def merge(
         list[Path],
         typer.Argument(
             file_okay=True,
-            dir_okay=False,
-            readable=True,
-            exists=True,
+            dir_okay=True,
             show_default=False,
-            help="Path(s) to the parsed mitmproxy flows file(s) to be merged",
+            help="Path(s) to the parsed mitmproxy flows file(s) to be merged. Directories and quoted glob patterns (e.g. 'parsed/**/*.json') are expanded",
         ),
     ],
     overrides: Annotated[
@@ -186,23 +316,41 @@ def merge(
         ),
     ] = None,
     uncompressed: Annotated[bool, typer.Option("--uncompressed", "-u", show_default=False, help="Preserve whitespace in the output file")] = False,
+    jobs: Annotated[int, typer.Option("--jobs", "-j", min=1, help="Number of worker processes used to read the parsed flows files")] = 1,
+    binary: Annotated[
+        bool,
+        typer.Option("--binary", "-b", show_default=False, help="Store the output file in the binary structure format, which loads faster than JSON"),
+    ] = False,
+    cache_overrides: Annotated[
+        bool,
+        typer.Option(
+            "--cache-overrides",
+            show_default=False,
+            help="Keep the compiled overrides in a cache file next to the overrides file, which is used as long as the overrides file doesn't change",
+        ),
+    ] = False,
 ):
+    try:
+        file_paths = get_structure_file_paths(parsed_flows)
+    except FileNotFoundError as ex:
+        raise typer.BadParameter(str(ex)) from ex
+
     rich_print("Merge parsed mitmproxy flows files.\n")
     ui.print_input_output(parsed_flows, out_file)
+    ui.print_step(f"Files to merge: {len(file_paths)}", "yellow")
     ui.print_step(f"Compressed storage: {'No' if uncompressed else 'Yes'}", "yellow")
+    if binary:
+        ui.print_step("Binary storage: Yes", "yellow")
+    ui.print_step(f"Parallel jobs: {jobs}", "yellow")
     ui.print_step("Merging parsed flows...", "blue")
 
     start = perf_counter()
-    result = read_structure_json(parsed_flows[0])
-
-    for merge_with in parsed_flows[1:]:
-        result = merge_api_structures(result, read_structure_json(merge_with))
+    result = merge_structure_files(file_paths, jobs)
 
     if overrides:
-        overrides = read_structure_json(overrides)
-        result = apply_overrides(result, overrides)
+        result = load_overrides(overrides, use_cache=cache_overrides).apply(result)
 
-    store_structure_json(out_file, result, (not uncompressed))
+    store_structure_json(out_file, result, (not uncompressed), binary=binary)
 
     end = perf_counter()
     ui.print_step(f"All flow files merged in {end-start:.2f} seconds.", "blue")
@@ -1,12 +1,16 @@
 from pathlib import Path
-from typing import Annotated
+from time import perf_counter
+from typing import Annotated, Optional
 
 import typer
 from rich import print as rich_print
 
 from . import ui
+from .backend.anonymize import anonymize_and_parse_file
 from .backend.enums import parse_csharp_dump_file, store_enum_file
+from .backend.flowsindex import create_index, get_endpoint_summaries
 from .backend.parse import parse_flows_file, store_structure_json
+from .backend.structurefile import BINARY_STRUCTURE_FILE_SUFFIX
 
 
 app = typer.Typer()
@@ -86,20 +90,236 @@ def parse_flows(
     ],
     verbose: Annotated[bool, typer.Option("--verbose", "-v", show_default=False, help="Print additional output")] = False,
     uncompressed: Annotated[bool, typer.Option("--uncompressed", "-u", show_default=False, help="Preserve whitespace in the output file")] = False,
+    jobs: Annotated[int, typer.Option("--jobs", "-j", min=1, help="Number of worker processes used to parse each flows file")] = 1,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            "--resume",
+            "-r",
+            show_default=False,
+            help="Keep a checkpoint next to each flows file and only parse flows appended since the last run",
+        ),
+    ] = False,
+    debug: Annotated[
+        bool, typer.Option("--debug", show_default=False, help="Keep the original mitmproxy flows in memory while parsing (requires --jobs 1)")
+    ] = False,
+    stable_rows: Annotated[
+        Optional[int],
+        typer.Option(
+            "--stable-rows",
+            min=1,
+            show_default=False,
+            help="Stop inferring the types of repeated XML elements once they haven't changed for this many elements in a row (faster, but may miss rare types)",
+        ),
+    ] = None,
+    include: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            "--include",
+            show_default=False,
+            help="Only parse endpoints matching this pattern (e.g. 'ItemService/*' or 'List*Designs*'), can be specified multiple times",
+        ),
+    ] = None,
+    exclude: Annotated[
+        Optional[list[str]],
+        typer.Option("--exclude", show_default=False, help="Skip endpoints matching this pattern, can be specified multiple times"),
+    ] = None,
+    endpoint: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            "--endpoint",
+            "-e",
+            show_default=False,
+            help="Only parse the flows of this endpoint ('Service/Endpoint'), looked up in the index of each flows file. Can be specified multiple times",
+        ),
+    ] = None,
+    flow_reader: Annotated[
+        bool,
+        typer.Option("--flow-reader", show_default=False, help="Read the flows files with mitmproxy's FlowReader instead of the faster lean reader"),
+    ] = False,
+    binary: Annotated[
+        bool,
+        typer.Option(
+            "--binary", "-b", show_default=False, help="Store the output files in the binary structure format, which loads faster than JSON"
+        ),
+    ] = False,
 ):
+    if debug and jobs > 1:
+        raise typer.BadParameter("--debug can't be combined with --jobs greater than 1.")
+    if endpoint and resume:
+        raise typer.BadParameter("--endpoint can't be combined with --resume.")
+
     rich_print("Parse mitmproxy flows files.\n")
     ui.print_input_output(flows, out_dir)
     if verbose:
         ui.print_step("Verbose: Yes", "yellow")
     ui.print_step(f"Compressed storage: {'No' if uncompressed else 'Yes'}", "yellow")
+    if binary:
+        ui.print_step("Binary storage: Yes", "yellow")
+    ui.print_step(f"Parallel jobs: {jobs}", "yellow")
+    if resume:
+        ui.print_step("Resume from checkpoints: Yes", "yellow")
+    __print_parse_options(stable_rows, include, exclude, endpoint)
     ui.print_step("Parsing captured flows...", "blue")
 
     for file_path in flows:
         ui.print_step(f"Processing file: {file_path}", "blue")
 
-        output_file_name = f"{file_path.stem}.json"
+        output_file_name = f"{file_path.stem}{BINARY_STRUCTURE_FILE_SUFFIX if binary else '.json'}"
         output_file_path = out_dir / output_file_name
-        parsed_flows = parse_flows_file(file_path, verbose)
-        store_structure_json(output_file_path, parsed_flows, compressed=(not uncompressed))
+        parsed_flows = parse_flows_file(
+            file_path,
+            verbose,
+            jobs,
+            keep_original_flows=debug,
+            resume=resume,
+            stable_row_count=stable_rows,
+            include_patterns=include,
+            exclude_patterns=exclude,
+            use_flow_reader=flow_reader,
+            endpoints=endpoint,
+        )
+        store_structure_json(output_file_path, parsed_flows, compressed=(not uncompressed), binary=binary)
+
+        ui.print_step(f"Stored parsed services, endpoints and entities at: {output_file_path}", "blue")
+
+
+@app.command("anon-flows", help="Anonymize captured mitmproxy flows and parse the anonymized flows into a JSON file, reading each flow only once.")
+def anonymize_and_parse_flows(
+    out_dir: Annotated[
+        Path,
+        typer.Argument(
+            file_okay=False,
+            dir_okay=True,
+            writable=True,
+            exists=True,
+            show_default=False,
+            help="Target directory for the anonymized flows file(s) and the parsed flows file(s)",
+        ),
+    ],
+    flows: Annotated[
+        list[Path],
+        typer.Argument(
+            file_okay=True,
+            dir_okay=False,
+            readable=True,
+            exists=True,
+            show_default=False,
+            help="Path(s) to the mitmproxy flows file(s) to be anonymized and parsed",
+        ),
+    ],
+    uncompressed: Annotated[bool, typer.Option("--uncompressed", "-u", show_default=False, help="Preserve whitespace in the output file")] = False,
+    stable_rows: Annotated[
+        Optional[int],
+        typer.Option(
+            "--stable-rows",
+            min=1,
+            show_default=False,
+            help="Stop inferring the types of repeated XML elements once they haven't changed for this many elements in a row (faster, but may miss rare types)",
+        ),
+    ] = None,
+    include: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            "--include",
+            show_default=False,
+            help="Only parse endpoints matching this pattern (e.g. 'ItemService/*' or 'List*Designs*'), can be specified multiple times",
+        ),
+    ] = None,
+    exclude: Annotated[
+        Optional[list[str]],
+        typer.Option("--exclude", show_default=False, help="Skip endpoints matching this pattern when parsing, can be specified multiple times"),
+    ] = None,
+    endpoint: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            "--endpoint",
+            "-e",
+            show_default=False,
+            help="Only anonymize and parse the flows of this endpoint ('Service/Endpoint'), looked up in the index of each flows file. Can be specified multiple times",
+        ),
+    ] = None,
+    binary: Annotated[
+        bool,
+        typer.Option(
+            "--binary", "-b", show_default=False, help="Store the parsed flows files in the binary structure format, which loads faster than JSON"
+        ),
+    ] = False,
+):
+    rich_print("Anonymize and parse mitmproxy flows files.\n")
+    ui.print_input_output(flows, out_dir)
+    ui.print_step(f"Compressed storage: {'No' if uncompressed else 'Yes'}", "yellow")
+    if binary:
+        ui.print_step("Binary storage: Yes", "yellow")
+    __print_parse_options(stable_rows, include, exclude, endpoint)
+    ui.print_step("Anonymizing and parsing captured flows...", "blue")
+    start = perf_counter()
+
+    for file_path in flows:
+        ui.print_step(f"Processing file: {file_path}", "blue")
+        with ui.create_file_progress() as progress:
+            task_id = progress.add_task(file_path.name, total=file_path.stat().st_size, item_count=0, item_name="flows", items_per_second=0)
+            file_start = perf_counter()
+
+            def update_progress(flow_count: int, position: int) -> None:
+                items_per_second = flow_count / max(perf_counter() - file_start, 1e-9)
+                progress.update(task_id, completed=position, item_count=flow_count, items_per_second=items_per_second)
 
+            anonymized_file_path, parsed_flows = anonymize_and_parse_file(
+                file_path,
+                out_dir,
+                endpoints=endpoint,
+                include_patterns=include,
+                exclude_patterns=exclude,
+                stable_row_count=stable_rows,
+                progress=update_progress,
+            )
+            progress.update(task_id, completed=file_path.stat().st_size)
+
+        # Named like the output of 'parse flows' for the anonymized flows file
+        output_file_path = out_dir / f"{anonymized_file_path.stem}{BINARY_STRUCTURE_FILE_SUFFIX if binary else '.json'}"
+        store_structure_json(output_file_path, parsed_flows, compressed=(not uncompressed), binary=binary)
+
+        ui.print_step(f"Stored anonymized flows at: {anonymized_file_path}", "blue")
         ui.print_step(f"Stored parsed services, endpoints and entities at: {output_file_path}", "blue")
+
+    end = perf_counter()
+    ui.print_step(f"All files anonymized and parsed in {end-start:.2f} seconds.", "blue")
+
+
+@app.command("index", help="Index the records in mitmproxy flows files by endpoint for 'parse flows --endpoint'.")
+def index_flows(
+    flows: Annotated[
+        list[Path],
+        typer.Argument(
+            file_okay=True,
+            dir_okay=False,
+            readable=True,
+            exists=True,
+            show_default=False,
+            help="Path(s) to the mitmproxy flows file(s) to be indexed",
+        ),
+    ],
+    verbose: Annotated[bool, typer.Option("--verbose", "-v", show_default=False, help="Print the number of flows per endpoint")] = False,
+):
+    rich_print("Index mitmproxy flows files.\n")
+    ui.print_step("Indexing captured flows...", "blue")
+
+    for file_path in flows:
+        ui.print_step(f"Processing file: {file_path}", "blue")
+        index_file_path = create_index(file_path)
+        if verbose:
+            for service, endpoint, flow_count, response_size in get_endpoint_summaries(file_path):
+                ui.print_list_item(f"{service}/{endpoint}: {flow_count} flows, {response_size} response bytes")
+        ui.print_step(f"Stored index at: {index_file_path}", "blue")
+
+
+def __print_parse_options(stable_rows: Optional[int], include: Optional[list[str]], exclude: Optional[list[str]], endpoint: Optional[list[str]]):
+    if stable_rows:
+        ui.print_step(f"Stop inferring XML types after stable rows: {stable_rows}", "yellow")
+    if include:
+        ui.print_step(f"Included endpoints: {', '.join(include)}", "yellow")
+    if exclude:
+        ui.print_step(f"Excluded endpoints: {', '.join(exclude)}", "yellow")
+    if endpoint:
+        ui.print_step(f"Selected endpoints: {', '.join(endpoint)}", "yellow")
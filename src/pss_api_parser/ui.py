@@ -2,6 +2,7 @@ from pathlib import Path
 from typing import Iterable
 
 from rich import print
+from rich.progress import BarColumn, DownloadColumn, Progress, TextColumn, TimeElapsedColumn, TransferSpeedColumn
 from rich.text import Text
 
 
@@ -24,3 +25,15 @@ def print_input_output(in_files: Iterable[Path], out: Path):
         print_step("Output file:", "yellow")
     print_list_item(out)
     print()
+
+
+def create_file_progress() -> Progress:
+    # A progress bar for reading a file, with the number of bytes read, the throughput and the number of items processed
+    return Progress(
+        TextColumn("{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TextColumn("{task.fields[item_count]} {task.fields[item_name]} ({task.fields[items_per_second]:.0f}/s)"),
+        TimeElapsedColumn(),
+    )
@@ -0,0 +1,41 @@
+import asyncio as _asyncio
+import json as _json
+
+import src.pss_api_parser.backend.parse as _parse
+from mitmproxy.io import FlowReader as _FlowReader
+from mitmproxy.test import taddons as _taddons
+from src.pss_api_parser import addon as _addon
+
+
+FLOWS_FILE_PATH = "examples/pss_api_steam_anonymized.flows"
+
+
+def replay_flows(file_path, shutdown: bool = True, **options) -> _addon.PssApiStructureAddon:
+    async def replay():
+        addon = _addon.PssApiStructureAddon()
+        with _taddons.context(addon) as tctx:
+            tctx.configure(addon, **options)
+            with open(file_path, "rb") as fp:
+                for flow in _FlowReader(fp).stream():
+                    await tctx.cycle(addon, flow)
+            if shutdown:
+                addon.done()
+        return addon
+
+    return _asyncio.run(replay())
+
+
+def test_addon__matches_parse_flows_file(tmp_path):
+    file_path = tmp_path / "structure.json"
+    expected_file_path = tmp_path / "expected.json"
+    _parse.store_structure_json(expected_file_path, _parse.parse_flows_file(FLOWS_FILE_PATH))
+
+    replay_flows(FLOWS_FILE_PATH, pss_structure_file=str(file_path))
+    assert _json.loads(file_path.read_text()) == _json.loads(expected_file_path.read_text())
+
+
+def test_addon__flushes_at_intervals(tmp_path):
+    file_path = tmp_path / "structure.json"
+    addon = replay_flows(FLOWS_FILE_PATH, shutdown=False, pss_structure_file=str(file_path), pss_flush_interval=0, pss_include=["ShipService/*"])
+    assert addon.accumulated_structure["flow_count"] > 0
+    assert list(_json.loads(file_path.read_text())["endpoints"]) == ["ShipService"]
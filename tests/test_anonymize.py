@@ -0,0 +1,176 @@
+import base64 as _base64
+import re as _re
+import zlib as _zlib
+from pathlib import Path
+
+import pytest
+import src.pss_api_parser.backend.anonymize as _anonymize
+import src.pss_api_parser.backend.parse as _parse
+from mitmproxy.io import FlowReader as _FlowReader
+from mitmproxy.io import FlowWriter as _FlowWriter
+
+
+FLOWS_FILE_PATH = "examples/pss_api_steam_anonymized.flows"
+SECRET_ATTRIBUTES = (
+    ' Email="someone@example.com"',
+    ' SteamId="76561190012345678"',
+    ' FacebookTokenExpiryDate="2023-04-01T10:11:12"',
+    ' DeviceKey=""',
+)
+
+
+def __read_flows(file_path) -> list:
+    with open(file_path, "rb") as fp:
+        return list(_FlowReader(fp).stream())
+
+
+def __get_flow_contents(flows) -> list:
+    return [(flow.request.url, flow.request.content, flow.response.content if flow.response else None) for flow in flows]
+
+
+def __store_flows_with_secrets(tmp_path):
+    # Adds confidential attributes to the first elements of each response and an access token to each request
+    flows = __read_flows(FLOWS_FILE_PATH)
+    for i, flow in enumerate(flows):
+        attributes = "".join(SECRET_ATTRIBUTES[i % len(SECRET_ATTRIBUTES) :] + SECRET_ATTRIBUTES[: i % len(SECRET_ATTRIBUTES)]).encode("utf-8")
+        flow.response.content = _re.sub(rb"<[A-Z][A-Za-z]+(?= [A-Z])", lambda match: match.group(0) + attributes, flow.response.content, count=20)
+        flow.request.query["accessToken"] = f"secret-token-{i}"
+
+    file_path = tmp_path / "secrets.flows"
+    with open(file_path, "wb") as fp:
+        flow_writer = _FlowWriter(fp)
+        for flow in flows:
+            flow_writer.add(flow)
+    return file_path
+
+
+def test_anonymize_file__streams_anonymized_flows(tmp_path):
+    file_path = __store_flows_with_secrets(tmp_path)
+    output_folder = tmp_path / "anonymized"
+    output_folder.mkdir()
+    expected_contents = __get_flow_contents(_anonymize.anonymize_flow(flow) for flow in __read_flows(file_path))
+    assert b"someone@example.com" not in b"".join(content for *_, content in expected_contents)
+
+    progress = []
+    output_file_path = _anonymize.anonymize_file(
+        file_path, output_folder, progress=lambda flow_count, position: progress.append((flow_count, position))
+    )
+    assert __get_flow_contents(__read_flows(output_file_path)) == expected_contents
+    assert [flow_count for flow_count, _ in progress] == list(range(1, len(expected_contents) + 1))
+    assert progress[-1][1] == file_path.stat().st_size
+    assert [path.name for path in output_folder.iterdir()] == [output_file_path.name]
+
+
+def test_anonymize_response_content__masks_confidential_properties():
+    content = (
+        '<User Id="12" SteamId="76561190012345678" Email="jörg@example.com" email="jörg@example.com" GameCenterName=""'
+        ' FacebookTokenExpiryDate="2023-04-01T10:11:12.5" Name="jörg" />'
+    ).encode("utf-8")
+    expected_content = (
+        '<User Id="12" SteamId="00000000000000000" Email="xxxxxxxxxxxxxxxx" email="xxxxxxxxxxxxxxxx" GameCenterName=""'
+        ' FacebookTokenExpiryDate="2016-01-06T00:00:00" Name="jörg" />'
+    ).encode("utf-8")
+    assert _anonymize.anonymize_response_content(content) == expected_content
+
+
+def test_anonymize_and_parse_file__matches_parsing_anonymized_file(tmp_path):
+    file_path = Path(FLOWS_FILE_PATH)
+    output_folder = tmp_path / "anonymized"
+    fused_output_folder = tmp_path / "fused"
+    output_folder.mkdir()
+    fused_output_folder.mkdir()
+    anonymized_file_path = _anonymize.anonymize_file(file_path, output_folder)
+    _parse.store_structure_json(tmp_path / "expected.json", _parse.parse_flows_file(str(anonymized_file_path), exclude_patterns=["UserService/*"]))
+
+    fused_file_path, api_structure = _anonymize.anonymize_and_parse_file(file_path, fused_output_folder, exclude_patterns=["UserService/*"])
+    _parse.store_structure_json(tmp_path / "fused.json", api_structure)
+    assert fused_file_path.name == anonymized_file_path.name
+    assert __get_flow_contents(__read_flows(fused_file_path)) == __get_flow_contents(__read_flows(anonymized_file_path))
+    assert (tmp_path / "fused.json").read_bytes() == (tmp_path / "expected.json").read_bytes()
+
+
+def test_anonymize_and_parse_file__inflates_compressed_responses_once(tmp_path, monkeypatch):
+    flows = __read_flows(FLOWS_FILE_PATH)
+    for flow in flows:
+        flow.response.content = _base64.b64encode(_zlib.compress(flow.response.content, wbits=_zlib.MAX_WBITS | 16))
+    file_path = tmp_path / "compressed.flows"
+    with open(file_path, "wb") as fp:
+        flow_writer = _FlowWriter(fp)
+        for flow in flows:
+            flow_writer.add(flow)
+    output_folder = tmp_path / "anonymized"
+    fused_output_folder = tmp_path / "fused"
+    output_folder.mkdir()
+    fused_output_folder.mkdir()
+    anonymized_file_path = _anonymize.anonymize_file(file_path, output_folder)
+    _parse.store_structure_json(tmp_path / "expected.json", _parse.parse_flows_file(str(anonymized_file_path)))
+
+    def fail_decompress(*_):
+        raise AssertionError("A compressed response got inflated again")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(_zlib, "decompress", fail_decompress)
+        fused_file_path, api_structure = _anonymize.anonymize_and_parse_file(file_path, fused_output_folder)
+    _parse.store_structure_json(tmp_path / "fused.json", api_structure)
+    assert __get_flow_contents(__read_flows(fused_file_path)) == __get_flow_contents(__read_flows(anonymized_file_path))
+    assert (tmp_path / "fused.json").read_bytes() == (tmp_path / "expected.json").read_bytes()
+    assert b'"response_gzipped":true' in (tmp_path / "fused.json").read_bytes()
+
+
+def test_anonymize_files__writes_parallel_chunks_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(_anonymize, "__FLOW_CHUNK_SIZE", 7)
+    file_paths = [__store_flows_with_secrets(tmp_path), Path(FLOWS_FILE_PATH)]
+    serial_folder = tmp_path / "serial"
+    parallel_folder = tmp_path / "parallel"
+    serial_folder.mkdir()
+    parallel_folder.mkdir()
+
+    serial_file_paths = _anonymize.anonymize_files(file_paths, serial_folder)
+    progress = []
+    parallel_file_paths = _anonymize.anonymize_files(
+        file_paths, parallel_folder, jobs=2, progress=lambda file_index, flow_count, position: progress.append((file_index, flow_count, position))
+    )
+    assert [path.name for path in parallel_file_paths] == [path.name for path in serial_file_paths]
+    for serial_file_path, parallel_file_path in zip(serial_file_paths, parallel_file_paths):
+        assert __get_flow_contents(__read_flows(parallel_file_path)) == __get_flow_contents(__read_flows(serial_file_path))
+    flow_count = len(__read_flows(file_paths[0]))
+    assert [count for file_index, count, _ in progress if file_index == 0] == [*range(7, flow_count, 7), flow_count]
+    assert [position for file_index, _, position in progress if file_index == 1][-1] == file_paths[1].stat().st_size
+
+
+@pytest.mark.parametrize("wbits", [_zlib.MAX_WBITS | 16, _zlib.MAX_WBITS])
+def test_anonymize_response_content__scrubs_compressed_content_in_chunks(monkeypatch, wbits):
+    monkeypatch.setattr(_anonymize, "__BASE64_CHUNK_SIZE", 8)
+    monkeypatch.setattr(_anonymize, "__INFLATED_CHUNK_SIZE", 16)
+    content = "".join(f'<User Id="{i}" SteamId="7656119001234567{i}" Email="user{i}@example.com" Name="Bob" />' for i in range(50)).encode("utf-8")
+    compressor = _zlib.compressobj(wbits=wbits)
+    compressed_content = _base64.b64encode(compressor.compress(content) + compressor.flush()) + b"\n"
+
+    anonymized_content = _anonymize.anonymize_response_content(compressed_content)
+    assert anonymized_content.endswith(b"\n")
+    assert _zlib.decompress(_base64.b64decode(anonymized_content), wbits) == _anonymize.anonymize_response_content(content)
+    assert _base64.b64decode(anonymized_content)[:2] == _base64.b64decode(compressed_content)[:2]
+
+    unchanged_content = _base64.b64encode(_zlib.compress(b'<User Id="1" Name="Bob" />'))
+    assert _anonymize.anonymize_response_content(unchanged_content) == unchanged_content
+    # Nothing can be inflated from the first 40 characters, but the first half has been inflated partly
+    assert _anonymize.anonymize_response_content(compressed_content[:40]) == compressed_content[:40]
+    with pytest.raises(ValueError):
+        _anonymize.anonymize_response_content(compressed_content[:296])
+
+
+@pytest.mark.parametrize("content", [b"eJzz", b"H4sIabc"])
+def test_anonymize_response_content__base64_content_looking_compressed(content):
+    # Starts like zlib or gzip data, but nothing can be inflated from it
+    assert _anonymize.anonymize_response_content(content) == content
+
+
+def test_anonymize_response_content__scrubs_line_wrapped_compressed_content():
+    content = "".join(f'<User Id="{i}" Email="user{i}@example.com" />' for i in range(50)).encode("utf-8")
+    compressed_content = _base64.encodebytes(_zlib.compress(content)).replace(b"\n", b"\r\n")
+
+    anonymized_content = _anonymize.anonymize_response_content(compressed_content)
+    assert b"@example.com" not in _zlib.decompress(_base64.b64decode(anonymized_content))
+    assert _zlib.decompress(_base64.b64decode(anonymized_content)) == _anonymize.anonymize_response_content(content)
+    assert {len(line) for line in anonymized_content.split(b"\r\n")[:-2]} == {76}
+    assert anonymized_content.endswith(b"\r\n")
@@ -0,0 +1,98 @@
+import pickle as _pickle
+
+import pytest
+import src.pss_api_parser.backend.datatypes as _datatypes
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "",
+        " ",
+        "0",
+        "-0",
+        "+12",
+        "007",
+        "1" * 400,
+        "1_000",
+        " 42 ",
+        "1.",
+        ".5",
+        "-1.5e10",
+        "1e5",
+        "1e999",
+        "nan",
+        "-Infinity",
+        "true",
+        "False",
+        "TRUE",
+        "2023-03-17T09:46:40",
+        "2023-03-17T09:46:40.123",
+        "2023-03-17T09:46:40.123456Z",
+        "2023-03-17t09:46:40",
+        "2023-3-7T9:46:40",
+        "2023-02-29T00:00:00",
+        "2024-02-29T00:00:00",
+        "2023-13-01T00:00:00",
+        "2023-01-01T24:00:00",
+        "2023-01-01T00:00:60",
+        "0000-01-01T00:00:00",
+        "xxxxxxxx",
+        "Some description.",
+        "fine",
+        "٣",
+        "ÄÖÜ",
+    ],
+)
+def test_determine_data_type__matches_trial_conversion(value: str):
+    # The trial conversion only gets called for non-empty values
+    assert _datatypes.determine_data_type(value) == (_datatypes.__determine_str_data_type_slow(value) if value else None)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected_result"),
+    [(None, None), (True, "bool"), (1.5, "float"), (2, "int")],
+)
+def test_determine_data_type__non_str_values(value, expected_result):
+    assert _datatypes.determine_data_type(value) == expected_result
+
+
+def test_merge_type_dictionaries__widens_types():
+    d1 = {"Id": "int", "Name": None, "Price": "int", "Designs": {"Design": {"Id": "int", "Rarity": "str"}}, "Custom": "Rarity"}
+    d2 = {"Id": "int", "Name": "str", "Price": "float", "Designs": {"Design": {"Id": "str", "Level": "int"}}, "Custom": "str", "Count": None}
+
+    assert _datatypes.merge_type_dictionaries(d1, d2) == {
+        "Id": "int",
+        "Name": "str",
+        "Price": "float",
+        "Designs": {"Design": {"Id": "str", "Rarity": "str", "Level": "int"}},
+        "Custom": "Rarity",
+        "Count": None,
+    }
+
+
+def test_merge_type_dictionaries__second_overrides_first_in_nested_dicts():
+    d1 = {"Id": "str", "Designs": {"Design": {"Id": "str", "Rarity": "str"}}}
+    d2 = {"Id": "int", "Designs": {"Design": {"Id": "int"}}}
+
+    assert _datatypes.merge_type_dictionaries(d1, d2, second_overrides_first=True) == {
+        "Id": "int",
+        "Designs": {"Design": {"Id": "int", "Rarity": "str"}},
+    }
+
+
+def test_type_dictionary_accumulator__does_not_modify_added_dicts():
+    d1 = {"Designs": {"Design": {"Id": "int"}}, "Version": "int"}
+    d2 = {"Designs": {"Design": {"Id": "float", "Name": "str"}}}
+    d3 = {"Designs": {"Design": {"Id": "str"}}, "Version": "datetime"}
+
+    accumulator = _datatypes.TypeDictionaryAccumulator(d1)
+    accumulator.add(d2)
+    accumulator = _pickle.loads(_pickle.dumps(accumulator))
+    accumulator.add(d3)
+    accumulator.add(d1)
+
+    assert accumulator.result == {"Designs": {"Design": {"Id": "str", "Name": "str"}}, "Version": "int"}
+    assert d1 == {"Designs": {"Design": {"Id": "int"}}, "Version": "int"}
+    assert d2 == {"Designs": {"Design": {"Id": "float", "Name": "str"}}}
+    assert d3 == {"Designs": {"Design": {"Id": "str"}}, "Version": "datetime"}
@@ -0,0 +1,36 @@
+import pytest
+import src.pss_api_parser.backend.endpointfilter as _endpointfilter
+
+
+@pytest.mark.parametrize(
+    ["path", "expected"],
+    [
+        ("/BattleService/ListBattles", False),
+        ("/ItemService/ListItemDesigns2?languageKey=en", True),
+        ("/ItemService/PurchaseCatalog", False),
+        ("/UserService/HeartBeat?accessToken=x", False),
+        ("/UserService/HeartBeats", False),
+        ("/UserService/SteamLogin6", True),
+    ],
+)
+def test_create_endpoint_filter__blacklists(path: str, expected: bool):
+    assert _endpointfilter.create_endpoint_filter().matches(path) == expected
+
+
+@pytest.mark.parametrize(
+    ["path", "expected"],
+    [
+        ("/ItemService/ListItemDesigns2", False),
+        ("/ItemService/ListItemsOfAShip", False),
+        ("/ItemService/ListItems", True),
+        ("/ShipService/ListItems", False),
+        ("/ShipService/InspectShip2", True),
+        ("/ShipService/GetShipByUserId", False),
+    ],
+)
+def test_create_endpoint_filter__patterns(path: str, expected: bool):
+    endpoint_filter = _endpointfilter.create_endpoint_filter(
+        include_patterns=["ItemService/*", "Inspect*"],
+        exclude_patterns=["*Designs2", "ShipService/Get*"],
+    )
+    assert endpoint_filter.matches(path) == expected
@@ -0,0 +1,49 @@
+import src.pss_api_parser.backend.flowsindex as _flowsindex
+import src.pss_api_parser.backend.flowsreader as _flowsreader
+import src.pss_api_parser.backend.parse as _parse
+
+
+FLOWS_FILE_PATH = "examples/pss_api_steam_anonymized.flows"
+ENDPOINTS = ["DesignService/ListAllDesigns4", "ShipService/InspectShip2"]
+
+
+def copy_flows_file(tmp_path, record_count: int = None):
+    with open(FLOWS_FILE_PATH, "rb") as fp:
+        flows_data = fp.read()
+    if record_count is not None:
+        flows_data = flows_data[: list(_flowsreader.read_flow_record_summaries(FLOWS_FILE_PATH))[record_count].offset]
+    file_path = tmp_path / "capture.flows"
+    file_path.write_bytes(flows_data)
+    return file_path
+
+
+def test_get_record_offsets(tmp_path):
+    file_path = copy_flows_file(tmp_path)
+    expected_offsets = [
+        summary.offset for summary in _flowsreader.read_flow_record_summaries(file_path) if summary.path.split("?")[0].removeprefix("/") in ENDPOINTS
+    ]
+
+    offsets = _flowsindex.get_record_offsets(file_path, ENDPOINTS)
+    assert offsets
+    assert offsets == expected_offsets
+    assert _flowsindex.is_index_valid(file_path)
+
+
+def test_get_record_offsets__updates_stale_index(tmp_path):
+    file_path = copy_flows_file(tmp_path, record_count=10)
+    _flowsindex.create_index(file_path)
+    flow_count = sum(summary[2] for summary in _flowsindex.get_endpoint_summaries(file_path))
+
+    copy_flows_file(tmp_path)
+    assert not _flowsindex.is_index_valid(file_path)
+    assert sum(summary[2] for summary in _flowsindex.get_endpoint_summaries(file_path)) > flow_count
+
+
+def test_parse_flows_file__endpoints(tmp_path):
+    file_path = copy_flows_file(tmp_path)
+    expected_result = _parse.parse_flows_file(FLOWS_FILE_PATH, include_patterns=ENDPOINTS)
+    result = _parse.parse_flows_file(file_path, endpoints=ENDPOINTS)
+    assert _parse.__convert_api_structured_flows_to_dict(result) == _parse.__convert_api_structured_flows_to_dict(expected_result)
+
+    result = _parse.parse_flows_file(file_path, endpoints=ENDPOINTS, use_flow_reader=True)
+    assert _parse.__convert_api_structured_flows_to_dict(result) == _parse.__convert_api_structured_flows_to_dict(expected_result)
@@ -0,0 +1,44 @@
+import src.pss_api_parser.backend.endpointfilter as _endpointfilter
+import src.pss_api_parser.backend.flowsreader as _flowsreader
+from mitmproxy.io import FlowReader as _FlowReader
+from mitmproxy.io import tnetstring as _tnetstring
+
+
+FLOWS_FILE_PATH = "examples/pss_api_steam_anonymized.flows"
+
+
+def read_flow_records_with_flow_reader(file_path) -> list:
+    with open(file_path, "rb") as fp:
+        return [_flowsreader.get_flow_record(flow) for flow in _FlowReader(fp).stream()]
+
+
+def test_read_flow_records__matches_flow_reader():
+    expected_flow_records = read_flow_records_with_flow_reader(FLOWS_FILE_PATH)
+    end_offset = [0]
+    flow_records = list(_flowsreader.read_flow_records(FLOWS_FILE_PATH, end_offset=end_offset))
+    assert flow_records == expected_flow_records
+    with open(FLOWS_FILE_PATH, "rb") as fp:
+        assert end_offset[0] == len(fp.read())
+
+
+def test_read_flow_records__start_offset_and_filter():
+    with open(FLOWS_FILE_PATH, "rb") as fp:
+        _tnetstring.load(fp)
+        start_offset = fp.tell()
+    endpoint_filter = _endpointfilter.EndpointFilter(include_patterns=["ShipService/*"])
+    expected_flow_records = [record for record in read_flow_records_with_flow_reader(FLOWS_FILE_PATH)[1:] if endpoint_filter.matches(record.path)]
+
+    flow_records = list(_flowsreader.read_flow_records(FLOWS_FILE_PATH, start_offset=start_offset, endpoint_filter=endpoint_filter))
+    assert flow_records
+    assert flow_records == expected_flow_records
+
+
+def test_read_flow_records__other_format_version(tmp_path):
+    file_path = tmp_path / "capture.flows"
+    with open(FLOWS_FILE_PATH, "rb") as fp, open(file_path, "wb") as out_fp:
+        for _ in range(5):
+            state = _tnetstring.load(fp)
+            state["version"] = _flowsreader.FLOW_FORMAT_VERSION - 1
+            _tnetstring.dump(state, out_fp)
+
+    assert list(_flowsreader.read_flow_records(file_path)) == read_flow_records_with_flow_reader(FLOWS_FILE_PATH)[:5]
@@ -0,0 +1,78 @@
+import json as _json
+import sqlite3 as _sqlite3
+
+import pytest
+import src.pss_api_parser.backend.history as _history
+
+
+def __create_structure_dict(ship_properties: dict, ladders: bool = True) -> dict:
+    endpoints = {"ShipService": {"ListAllShipDesigns2": {"method": "GET", "response_structure": {"ShipDesigns": {"ShipDesign": "ShipDesign"}}}}}
+    if ladders:
+        endpoints["LadderService"] = {"ListLadders": {"method": "GET", "response_structure": {"Ladders": {"Ladder": "Ladder"}}}}
+    return {"endpoints": endpoints, "entities": {"Ship": ship_properties, "User": {"Id": "int"}}}
+
+
+def test_structure_history__ingests_changes_only(tmp_path):
+    database_file_path = tmp_path / "history.db"
+    with _history.StructureHistory(database_file_path) as history:
+        summaries = [
+            history.ingest(__create_structure_dict({"ShipId": "int", "ShipStatus": "str"}), "build-1"),
+            history.ingest(__create_structure_dict({"ShipId": "int", "ShipStatus": "str"}, ladders=False), "build-2"),
+            history.ingest(__create_structure_dict({"ShipId": "int", "ShipStatus": "int"}), "build-3"),
+            history.ingest(__create_structure_dict({"ShipId": "int", "ShipStatus": "int", "ShipName": "str"}), "build-4"),
+        ]
+        assert [summary[1:] for summary in summaries] == [(4, 0, 0, 0), (0, 0, 1, 3), (1, 1, 0, 2), (0, 1, 0, 3)]
+        with pytest.raises(ValueError):
+            history.ingest(__create_structure_dict({}), "build-4")
+
+        assert [snapshot.name for snapshot in history.get_snapshots()] == ["build-1", "build-2", "build-3", "build-4"]
+        assert [snapshot.name for snapshot in history.get_snapshots(_history.KIND_ENDPOINT, "LadderService/ListLadders")] == [
+            "build-1",
+            "build-3",
+            "build-4",
+        ]
+        assert [snapshot.name for snapshot in history.get_snapshots(_history.KIND_ENTITY, "User")] == ["build-1", "build-2", "build-3", "build-4"]
+
+        assert history.get_property_history(_history.KIND_ENTITY, "Ship", ["ShipStatus"]) == [
+            _history.PropertyVersion("build-1", "build-2", "str"),
+            _history.PropertyVersion("build-3", None, "int"),
+        ]
+        assert history.get_property_history(_history.KIND_ENDPOINT, "LadderService/ListLadders", ["response_structure", "Ladders", "Ladder"]) == [
+            _history.PropertyVersion("build-1", "build-1", "Ladder"),
+            _history.PropertyVersion("build-3", None, "Ladder"),
+        ]
+        ship_versions = history.get_schema_versions(_history.KIND_ENTITY, "Ship")
+        assert [(version.first_snapshot, version.last_snapshot) for version in ship_versions] == [
+            ("build-1", "build-2"),
+            ("build-3", "build-3"),
+            ("build-4", None),
+        ]
+        assert ship_versions[-1].schema == {"ShipId": "int", "ShipStatus": "int", "ShipName": "str"}
+
+    with _sqlite3.connect(database_file_path) as connection:
+        # The reappearing endpoint reuses its schema
+        assert connection.execute("SELECT COUNT(*) FROM schemas").fetchone()[0] == 6
+
+
+def test_structure_history__ingest_file_with_same_contents(tmp_path):
+    structure_file_path = tmp_path / "build-1.json"
+    structure_file_path.write_text(_json.dumps(__create_structure_dict({"ShipId": "int"})))
+    with _history.StructureHistory(tmp_path / "history.db") as history:
+        summary = history.ingest_file(structure_file_path)
+        assert history.ingest_file(structure_file_path, snapshot_name="build-2")[1:] == (0, 0, 0, summary.added)
+
+        structure_file_path.write_text(_json.dumps(__create_structure_dict({"ShipId": "int"}, ladders=False)))
+        assert history.ingest_file(structure_file_path, snapshot_name="build-3")[1:] == (0, 0, 1, 3)
+        assert [snapshot.name for snapshot in history.get_snapshots(_history.KIND_ENTITY, "Ship")] == ["build-1", "build-2", "build-3"]
+
+
+def test_structure_history__migrates_version_1(tmp_path):
+    database_file_path = tmp_path / "history.db"
+    with _sqlite3.connect(database_file_path) as connection:
+        connection.executescript(_history.StructureHistory._StructureHistory__SCHEMA_SQL.replace(",\n        file_hash TEXT", ""))
+        connection.execute("PRAGMA user_version = 1")
+    connection.close()
+
+    with _history.StructureHistory(database_file_path) as history:
+        history.ingest(__create_structure_dict({"ShipId": "int"}), "build-1")
+        assert [snapshot.name for snapshot in history.get_snapshots()] == ["build-1"]
@@ -0,0 +1,63 @@
+import pytest
+import src.pss_api_parser.backend.merge as _merge
+import src.pss_api_parser.backend.parse as _parse
+
+
+FLOWS_FILE_PATH = "examples/pss_api_steam_anonymized.flows"
+STRUCTURE_FILE_PATH = "examples/pss_api_complete_structure.json"
+OVERRIDES_FILE_PATH = "examples/pss_api_overrides.json"
+
+
+def __store_partial_structures(tmp_path):
+    file_paths = []
+    for i, include_patterns in enumerate((["ItemService/*", "ShipService/*"], ["ShipService/*", "UserService/*"], ["*"])):
+        file_path = tmp_path / f"structure_{i}.json"
+        _parse.store_structure_json(file_path, _parse.parse_flows_file(FLOWS_FILE_PATH, include_patterns=include_patterns))
+        file_paths.append(str(file_path))
+    return file_paths
+
+
+def test_merge_structure_files__matches_pairwise_merge(tmp_path):
+    file_paths = [STRUCTURE_FILE_PATH] + __store_partial_structures(tmp_path)
+    expected_result = _merge.read_structure_json(file_paths[0])
+    for file_path in file_paths[1:]:
+        expected_result = _merge.merge_api_structures(expected_result, _merge.read_structure_json(file_path))
+    overrides = _merge.read_structure_json(OVERRIDES_FILE_PATH)
+
+    result = _merge.merge_structure_files(file_paths)
+    assert _parse.__convert_api_structured_flows_to_dict(result) == _parse.__convert_api_structured_flows_to_dict(expected_result)
+    assert _parse.__convert_api_structured_flows_to_dict(_merge.apply_overrides(result, overrides)) == _parse.__convert_api_structured_flows_to_dict(
+        _merge.apply_overrides(expected_result, overrides)
+    )
+
+
+def test_merge_structure_files__parallel_matches_serial(tmp_path):
+    file_paths = [STRUCTURE_FILE_PATH] + __store_partial_structures(tmp_path) + [STRUCTURE_FILE_PATH]
+    expected_result = _merge.merge_structure_files(file_paths)
+    result = _merge.merge_structure_files(file_paths, jobs=2)
+    assert _parse.__convert_api_structured_flows_to_dict(result) == _parse.__convert_api_structured_flows_to_dict(expected_result)
+
+
+def test_get_structure_file_paths__expands_directories_and_globs(tmp_path):
+    file_paths = __store_partial_structures(tmp_path)
+    (tmp_path / "notes.txt").write_text("")
+    assert _merge.get_structure_file_paths([tmp_path]) == file_paths
+    assert _merge.get_structure_file_paths([str(tmp_path / "structure_[12].json"), STRUCTURE_FILE_PATH]) == file_paths[1:] + [STRUCTURE_FILE_PATH]
+    with pytest.raises(FileNotFoundError):
+        _merge.get_structure_file_paths([str(tmp_path / "missing_*.json")])
+
+
+def test_merge_structure_files__keeps_empty_values_missing_from_later_inputs():
+    file_paths = [STRUCTURE_FILE_PATH, OVERRIDES_FILE_PATH]
+    expected_result = _merge.merge_api_structures(_merge.read_structure_json(file_paths[0]), _merge.read_structure_json(file_paths[1]))
+
+    result = _parse.__convert_api_structured_flows_to_dict(_merge.merge_structure_files(file_paths))
+    assert result["endpoints"]["MessageService"]["ListActiveMarketplaceMessages5"]["content_type"] == ""
+    assert result == _parse.__convert_api_structured_flows_to_dict(expected_result)
+
+
+def test_merge_structure_files__parallel_keeps_empty_values_missing_from_later_inputs():
+    file_paths = [STRUCTURE_FILE_PATH, OVERRIDES_FILE_PATH, OVERRIDES_FILE_PATH]
+    expected_result = _merge.merge_structure_files(file_paths)
+    result = _merge.merge_structure_files(file_paths, jobs=2)
+    assert _parse.__convert_api_structured_flows_to_dict(result) == _parse.__convert_api_structured_flows_to_dict(expected_result)
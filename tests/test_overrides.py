@@ -0,0 +1,87 @@
+import os as _os
+import shutil as _shutil
+
+import src.pss_api_parser.backend.merge as _merge
+import src.pss_api_parser.backend.overrides as _overrides
+import src.pss_api_parser.backend.parse as _parse
+import src.pss_api_parser.backend.structurefile as _structurefile
+
+
+STRUCTURE_FILE_PATH = "examples/pss_api_complete_structure.json"
+OVERRIDES_FILE_PATH = "examples/pss_api_overrides.json"
+
+
+def test_compiled_overrides__apply_matches_override_functions():
+    structure = _merge.read_structure_json(STRUCTURE_FILE_PATH)
+    expected_structure_dict = _parse.__convert_api_structured_flows_to_dict(structure)
+    overrides = _merge.read_structure_json(OVERRIDES_FILE_PATH)
+    compiled_overrides = _overrides.load_overrides(OVERRIDES_FILE_PATH)
+
+    result = compiled_overrides.apply(structure)
+    assert _parse.__convert_api_structured_flows_to_dict(structure) == expected_structure_dict
+    expected_result = {
+        "endpoints": _merge.override_organized_flows(structure["endpoints"], overrides["endpoints"]),
+        "entities": _merge.override_object_structures(structure["entities"], overrides["entities"]),
+    }
+    assert _parse.__convert_api_structured_flows_to_dict(result) == _parse.__convert_api_structured_flows_to_dict(expected_result)
+    assert _parse.__convert_api_structured_flows_to_dict(
+        _merge.apply_overrides(structure, overrides)
+    ) == _parse.__convert_api_structured_flows_to_dict(result)
+
+
+def test_load_overrides__cache_invalidated_by_content_hash(tmp_path):
+    overrides_file_path = tmp_path / "overrides.json"
+    _shutil.copy(OVERRIDES_FILE_PATH, overrides_file_path)
+    cache_file_path = _overrides.get_overrides_cache_file_path(overrides_file_path)
+    structure = _merge.read_structure_json(STRUCTURE_FILE_PATH)
+    expected_result = _parse.__convert_api_structured_flows_to_dict(_overrides.load_overrides(overrides_file_path).apply(structure))
+    assert not cache_file_path.exists()
+
+    compiled_overrides = _overrides.load_overrides(overrides_file_path, use_cache=True)
+    cache_data = cache_file_path.read_bytes()
+    cached_overrides = _overrides.load_overrides(overrides_file_path, use_cache=True)
+    assert cache_file_path.read_bytes() == cache_data
+    assert cached_overrides.content_hash == compiled_overrides.content_hash
+    assert _parse.__convert_api_structured_flows_to_dict(cached_overrides.apply(structure)) == expected_result
+
+    cache_dict = dict(_structurefile.read_structure_dict(cache_file_path))
+    cache_dict["entities"] = {"Cached": {"Id": "int"}}
+    _structurefile.store_structure_dict(cache_file_path, cache_dict, binary=True)
+    assert list(_overrides.load_overrides(overrides_file_path, use_cache=True).entities) == ["Cached"]
+    cache_data = cache_file_path.read_bytes()
+
+    overrides_file_path.write_text('{"entities": {"Test": {"Id": "int"}}}')
+    changed_overrides = _overrides.load_overrides(overrides_file_path, use_cache=True)
+    assert changed_overrides.content_hash != compiled_overrides.content_hash
+    assert list(changed_overrides.entities) == ["Test"]
+    assert not changed_overrides.endpoints
+    assert cache_file_path.read_bytes() != cache_data
+
+    cache_data = bytearray(cache_file_path.read_bytes())
+    cache_data[len(_structurefile.BINARY_STRUCTURE_MAGIC)] += 1
+    cache_file_path.write_bytes(bytes(cache_data))
+    assert list(_overrides.load_overrides(overrides_file_path, use_cache=True).entities) == ["Test"]
+    assert _structurefile.read_structure_dict(cache_file_path)["entities"] == {"Test": {"Id": "int"}}
+
+
+def test_load_overrides__cache_validated_by_file_stat(tmp_path, monkeypatch):
+    overrides_file_path = tmp_path / "overrides.json"
+    _shutil.copy(OVERRIDES_FILE_PATH, overrides_file_path)
+    cache_file_path = _overrides.get_overrides_cache_file_path(overrides_file_path)
+    compiled_overrides = _overrides.load_overrides(overrides_file_path, use_cache=True)
+    file_stat = overrides_file_path.stat()
+    _os.utime(cache_file_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 10**9))
+
+    def fail_sha256(*_):
+        raise AssertionError("The overrides file got hashed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(_overrides._hashlib, "sha256", fail_sha256)
+        cached_overrides = _overrides.load_overrides(overrides_file_path, use_cache=True)
+    assert cached_overrides.content_hash == compiled_overrides.content_hash
+    assert list(cached_overrides.entities) == list(compiled_overrides.entities)
+
+    _os.utime(overrides_file_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 2 * 10**9))
+    touched_overrides = _overrides.load_overrides(overrides_file_path, use_cache=True)
+    assert touched_overrides.content_hash == compiled_overrides.content_hash
+    assert _structurefile.read_structure_dict(cache_file_path)["mtime_ns"] == file_stat.st_mtime_ns + 2 * 10**9
@@ -0,0 +1,113 @@
+import pytest
+import src.pss_api_parser.backend.checkpoint as _checkpoint
+import src.pss_api_parser.backend.parse as _parse
+from mitmproxy import exceptions as _mitmproxy_exceptions
+from mitmproxy.io import tnetstring as _tnetstring
+
+
+FLOWS_FILE_PATH = "examples/pss_api_steam_anonymized.flows"
+
+
+def test_parse_flows_file__matches_batch_merge():
+    flow_records = _parse.__read_flow_records_from_file(FLOWS_FILE_PATH)
+    flows = sorted(_parse.__get_flow_details_from_flow_records(flow_records), key=lambda x: str(x))
+    object_structures = {}
+    for flow in flows:
+        for object_name, object_structure in _parse.__get_object_structures_from_response_structure(flow.response_structure).items():
+            object_structures[object_name] = _parse.merge_object_structures(object_structure, object_structures.get(object_name))
+    expected_result = {
+        "endpoints": _parse.organize_flows(_parse.singularize_flows(_parse.organize_flows(flows))),
+        "entities": sorted(object_structures.values(), key=lambda x: x.object_type_name),
+    }
+
+    result = _parse.parse_flows_file(FLOWS_FILE_PATH)
+    assert _parse.__convert_api_structured_flows_to_dict(result) == _parse.__convert_api_structured_flows_to_dict(expected_result)
+
+
+def test_parse_flows_file__parallel_matches_serial():
+    expected_result = _parse.parse_flows_file(FLOWS_FILE_PATH)
+    result = _parse.parse_flows_file(FLOWS_FILE_PATH, jobs=2)
+    assert _parse.__convert_api_structured_flows_to_dict(result) == _parse.__convert_api_structured_flows_to_dict(expected_result)
+
+
+def test_parse_flows_file__resume_after_append(tmp_path):
+    with open(FLOWS_FILE_PATH, "rb") as fp:
+        for _ in range(30):
+            _tnetstring.load(fp)
+        prefix_length = fp.tell()
+        fp.seek(0)
+        flows_data = fp.read()
+    file_path = tmp_path / "capture.flows"
+    file_path.write_bytes(flows_data[:prefix_length])
+    _parse.parse_flows_file(file_path, resume=True)
+    assert _checkpoint.read_checkpoint(file_path)["offset"] == prefix_length
+
+    file_path.write_bytes(flows_data)
+    expected_result = _parse.parse_flows_file(FLOWS_FILE_PATH)
+    result = _parse.parse_flows_file(file_path, resume=True)
+    assert _parse.__convert_api_structured_flows_to_dict(result) == _parse.__convert_api_structured_flows_to_dict(expected_result)
+    assert _checkpoint.read_checkpoint(file_path)["offset"] == len(flows_data)
+
+
+@pytest.mark.parametrize("use_flow_reader", [False, True])
+@pytest.mark.parametrize("cut_length", [3, 1000])
+def test_parse_flows_file__resume_with_incomplete_last_record(tmp_path, use_flow_reader, cut_length):
+    with open(FLOWS_FILE_PATH, "rb") as fp:
+        for _ in range(30):
+            _tnetstring.load(fp)
+        prefix_length = fp.tell()
+        fp.seek(0)
+        flows_data = fp.read()
+    # The 31st record is still being written
+    file_path = tmp_path / "capture.flows"
+    file_path.write_bytes(flows_data[: prefix_length + cut_length])
+    _parse.parse_flows_file(file_path, resume=True, use_flow_reader=use_flow_reader)
+    assert _checkpoint.read_checkpoint(file_path)["offset"] == prefix_length
+
+    file_path.write_bytes(flows_data)
+    expected_result = _parse.parse_flows_file(FLOWS_FILE_PATH)
+    result = _parse.parse_flows_file(file_path, resume=True, use_flow_reader=use_flow_reader)
+    assert _parse.__convert_api_structured_flows_to_dict(result) == _parse.__convert_api_structured_flows_to_dict(expected_result)
+    assert _checkpoint.read_checkpoint(file_path)["offset"] == len(flows_data)
+
+
+@pytest.mark.parametrize("use_flow_reader", [False, True])
+@pytest.mark.parametrize("cut_length", [3, 1000])
+def test_parse_flows_file__incomplete_last_record_without_resume(tmp_path, use_flow_reader, cut_length):
+    with open(FLOWS_FILE_PATH, "rb") as fp:
+        for _ in range(30):
+            _tnetstring.load(fp)
+        prefix_length = fp.tell()
+        fp.seek(0)
+        flows_data = fp.read()
+    file_path = tmp_path / "capture.flows"
+    file_path.write_bytes(flows_data[: prefix_length + cut_length])
+    with pytest.raises((ValueError, _mitmproxy_exceptions.FlowReadException)):
+        _parse.parse_flows_file(file_path, use_flow_reader=use_flow_reader)
+
+
+def test_parse_flows_file__duplicate_flows_reuse_parsed_contents(tmp_path):
+    with open(FLOWS_FILE_PATH, "rb") as fp:
+        flows_data = fp.read()
+    file_path = tmp_path / "capture.flows"
+    file_path.write_bytes(flows_data * 2)
+
+    expected_result = _parse.__parse_flow_records(_parse.__read_flow_records_from_file(FLOWS_FILE_PATH))
+    result = _parse.__parse_flow_records(_parse.__read_flow_records_from_file(file_path))
+    assert result["flow_count"] == 2 * expected_result["flow_count"]
+    assert result["duplicate_count"] >= expected_result["flow_count"]
+    assert _parse.__convert_api_structured_flows_to_dict(
+        _parse.get_api_structure_from_accumulated_structure(result)
+    ) == _parse.__convert_api_structured_flows_to_dict(_parse.get_api_structure_from_accumulated_structure(expected_result))
+
+
+def test_parse_flows_file__resume_with_other_settings(tmp_path):
+    with open(FLOWS_FILE_PATH, "rb") as fp:
+        flows_data = fp.read()
+    file_path = tmp_path / "capture.flows"
+    file_path.write_bytes(flows_data)
+    _parse.parse_flows_file(file_path, resume=True, include_patterns=["ShipService/*"])
+
+    expected_result = _parse.parse_flows_file(FLOWS_FILE_PATH)
+    result = _parse.parse_flows_file(file_path, resume=True)
+    assert _parse.__convert_api_structured_flows_to_dict(result) == _parse.__convert_api_structured_flows_to_dict(expected_result)
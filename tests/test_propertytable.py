@@ -0,0 +1,69 @@
+import pickle as _pickle
+import tracemalloc as _tracemalloc
+
+import src.pss_api_parser.backend.datatypes as _datatypes
+from src.pss_api_parser.backend.propertytable import PropertyTable
+
+
+PROPERTIES = [
+    {"ItemDesignId": "int", "ItemDesignName": "str", "ImageSpriteId": None, "ItemDesignActions": "ItemDesignActions"},
+    {"ItemDesignId": "int", "ItemDesignName": "str", "ImageSpriteId": "int", "ItemDesignActions": "ItemDesignActions"},
+    {"ItemDesignId": "float", "Rarity": "str", "ItemDesignActions": "Actions"},
+    {"ItemDesignId": "int", "ItemDesignName": "int", "ImageSpriteId": "datetime", "Rarity": None},
+]
+
+
+def test_property_table__widens_like_merge_type_dictionaries():
+    property_table = PropertyTable()
+    expected_result = {}
+    for properties in PROPERTIES:
+        property_table.add(properties)
+        expected_result = _datatypes.merge_type_dictionaries(properties, expected_result)
+    assert property_table.to_dict() == expected_result
+    assert list(property_table.to_dict()) == sorted(expected_result)
+
+
+def test_property_table__widen_matches_add():
+    expected_result = PropertyTable()
+    property_table_1 = PropertyTable()
+    property_table_2 = PropertyTable()
+    for i, properties in enumerate(PROPERTIES):
+        expected_result.add(properties)
+        (property_table_1 if i < 2 else property_table_2).add(properties)
+
+    property_table_1.widen(_pickle.loads(_pickle.dumps(property_table_2)))
+    assert property_table_1.to_dict() == expected_result.to_dict()
+
+
+def test_property_table__shares_name_tables_and_widens_without_allocating():
+    property_table_1 = PropertyTable(PROPERTIES[0])
+    property_table_2 = PropertyTable(PROPERTIES[1])
+    assert property_table_1.names is property_table_2.names
+
+    _tracemalloc.start()
+    start, _ = _tracemalloc.get_traced_memory()
+    for _ in range(10000):
+        property_table_1.add(PROPERTIES[1])
+        property_table_1.widen(property_table_2)
+    _, peak = _tracemalloc.get_traced_memory()
+    _tracemalloc.stop()
+    assert peak - start < 1024
+    assert property_table_1.to_dict() == PROPERTIES[1]
+
+
+def test_property_table__widen_with_same_names_matches_add():
+    type_names = list(_datatypes.TYPE_ORDER_LOOKUP) + ["ItemDesignActions"]
+    properties_1 = {f"Property{i}": type_names[i % len(type_names)] for i in range(100)}
+    properties_2 = {f"Property{i}": type_names[i * 7 % len(type_names)] for i in range(100)}
+    expected_result = PropertyTable(properties_1)
+    expected_result.add(properties_2)
+
+    property_table_1 = PropertyTable(properties_1)
+    property_table_1.widen(_pickle.loads(_pickle.dumps(PropertyTable(properties_2))))
+    assert property_table_1.to_dict() == expected_result.to_dict()
+
+
+def test_property_table__name_tables_are_bounded():
+    for i in range(5000):
+        PropertyTable({f"Property{i}": "int"})
+    assert len(PropertyTable._PropertyTable__NAME_TABLES) <= PropertyTable._PropertyTable__MAX_NAME_TABLES
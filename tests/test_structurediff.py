@@ -0,0 +1,57 @@
+import src.pss_api_parser.backend.structurediff as _structurediff
+import src.pss_api_parser.backend.structurefile as _structurefile
+
+
+STRUCTURE_FILE_PATH = "examples/pss_api_complete_structure.json"
+
+
+def __create_structure_dict(response_structure: dict, entities: dict, services: tuple = ("ItemService",)) -> dict:
+    endpoints = {
+        service: {"ListItemDesigns": {"method": "GET", "query_parameters": {"languageKey": "str"}, "response_structure": response_structure}}
+        for service in services
+    }
+    return {"endpoints": endpoints, "entities": entities}
+
+
+def test_diff_structures__lists_changes():
+    old_structure_dict = __create_structure_dict(
+        {"ItemDesigns": {"ItemDesign": {"ItemDesignId": "int", "Price": "int", "Rarity": "str"}}},
+        {"ItemDesign": {"ItemDesignId": "int", "Price": "int", "Rarity": "str"}, "Ship": {"ShipId": "int"}},
+    )
+    new_structure_dict = __create_structure_dict(
+        {"ItemDesigns": {"ItemDesign": {"ItemDesignId": "int", "Price": "float", "Rarity": "int", "ImageSpriteId": "int"}}},
+        {"ItemDesign": {"ItemDesignId": "int", "Price": "float"}, "Ship": {"ShipId": "int"}, "User": {"Id": "int"}},
+        services=("ItemService", "UserService"),
+    )
+
+    change_set = _structurediff.diff_structures(old_structure_dict, new_structure_dict, include_fingerprints=True)
+    assert change_set["services"] == {"added": ["UserService"], "removed": []}
+    assert change_set["endpoints"]["added"] == ["UserService/ListItemDesigns"]
+    assert change_set["endpoints"]["changed"] == {
+        "ItemService/ListItemDesigns": [
+            {"path": ["response_structure", "ItemDesigns", "ItemDesign", "ImageSpriteId"], "change": "added", "old": None, "new": "int"},
+            {"path": ["response_structure", "ItemDesigns", "ItemDesign", "Price"], "change": "widened", "old": "int", "new": "float"},
+            {"path": ["response_structure", "ItemDesigns", "ItemDesign", "Rarity"], "change": "narrowed", "old": "str", "new": "int"},
+        ]
+    }
+    assert change_set["entities"] == {
+        "added": ["User"],
+        "removed": [],
+        "changed": {
+            "ItemDesign": [
+                {"path": ["Price"], "change": "widened", "old": "int", "new": "float"},
+                {"path": ["Rarity"], "change": "removed", "old": "str", "new": None},
+            ]
+        },
+    }
+    assert change_set["fingerprints"] == _structurediff.get_fingerprints(new_structure_dict)
+    assert _structurediff.has_changes(change_set)
+
+
+def test_diff_structures__no_changes():
+    structure_dict = _structurefile.read_structure_dict(STRUCTURE_FILE_PATH)
+    reordered_structure_dict = {key: dict(reversed(value.items())) for key, value in reversed(structure_dict.items())}
+
+    change_set = _structurediff.diff_structures(structure_dict, reordered_structure_dict)
+    assert not _structurediff.has_changes(change_set)
+    assert "fingerprints" not in change_set
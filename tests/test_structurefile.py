@@ -0,0 +1,88 @@
+import copy as _copy
+import json as _json
+
+import pytest
+import src.pss_api_parser.backend.merge as _merge
+import src.pss_api_parser.backend.parse as _parse
+import src.pss_api_parser.backend.structurefile as _structurefile
+import src.pss_api_parser.backend.utils as _utils
+
+
+STRUCTURE_FILE_PATH = "examples/pss_api_complete_structure.json"
+
+
+def test_convert_structure_file__round_trip(tmp_path):
+    binary_file_path = tmp_path / f"structure{_structurefile.BINARY_STRUCTURE_FILE_SUFFIX}"
+    json_file_path = tmp_path / "structure.json"
+
+    assert _structurefile.convert_structure_file(STRUCTURE_FILE_PATH, binary_file_path)
+    assert _structurefile.is_binary_structure_file(binary_file_path)
+    assert not _structurefile.convert_structure_file(binary_file_path, json_file_path)
+    expected_json_file_path = tmp_path / "expected.json"
+    _structurefile.store_structure_dict(expected_json_file_path, _structurefile.read_structure_dict(STRUCTURE_FILE_PATH))
+    assert json_file_path.read_bytes() == expected_json_file_path.read_bytes()
+
+    structure = _merge.read_structure_json(binary_file_path)
+    expected_structure = _merge.read_structure_json(STRUCTURE_FILE_PATH)
+    assert _parse.__convert_api_structured_flows_to_dict(structure) == _parse.__convert_api_structured_flows_to_dict(expected_structure)
+
+
+def test_store_structure_dict__stores_equal_dicts_once(tmp_path):
+    file_path = tmp_path / "structure.pssapi"
+    structure_dict = {"entities": {"A": {"Id": "int", "Flag": True}, "B": {"Flag": True, "Id": "int"}, "C": {"Id": "int", "Flag": 1}}}
+    _structurefile.store_structure_dict(file_path, structure_dict, binary=True)
+
+    result = _structurefile.read_structure_dict(file_path)
+    assert result == structure_dict
+    assert list(result["entities"]["B"]) == ["Flag", "Id"]
+    assert result["entities"]["A"] is result["entities"]["B"]
+    assert result["entities"]["A"] is not result["entities"]["C"]
+
+
+def test_read_structure_dict__incompatible_version(tmp_path):
+    file_path = tmp_path / "structure.pssapi"
+    _structurefile.store_structure_dict(file_path, {"entities": {}}, binary=True)
+    data = bytearray(file_path.read_bytes())
+    data[len(_structurefile.BINARY_STRUCTURE_MAGIC)] += 1
+    file_path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError):
+        _structurefile.read_structure_dict(file_path)
+
+
+def test_store_structure_dict__binary_round_trip_of_all_values(tmp_path):
+    file_path = tmp_path / "structure.pssapi"
+    structure_dict = {
+        "entities": {"Test": {"Names": ["b", "ä", "a", None], "Empty": {}, "None": None, "Flags": [True, False, 1, 0], "Ratio": 0.5, "Count": 3}}
+    }
+    _structurefile.store_structure_dict(file_path, structure_dict, binary=True)
+
+    result = _structurefile.read_structure_dict(file_path)
+    assert result == structure_dict
+    assert [type(value) for value in result["entities"]["Test"]["Flags"]] == [bool, bool, int, int]
+
+
+@pytest.mark.parametrize("length", [12, 40, -1])
+def test_read_structure_dict__invalid_binary_data(tmp_path, length):
+    file_path = tmp_path / "structure.pssapi"
+    _structurefile.store_structure_dict(file_path, {"entities": {"A": {"Id": "int"}}}, binary=True)
+    file_path.write_bytes(file_path.read_bytes()[:length])
+
+    with pytest.raises(ValueError):
+        _structurefile.read_structure_dict(file_path)
+
+
+@pytest.mark.parametrize("compressed", [True, False])
+def test_store_structure_dict__streams_sorted_json(tmp_path, compressed):
+    file_path = tmp_path / "structure.json"
+    structure_dict = _structurefile.read_structure_dict(STRUCTURE_FILE_PATH)
+    structure_dict["entities"]["Test"] = {"Names": ["b", "ä", "a"], "Empty": {}, "None": None, "Flag": True, "Ratio": 0.5, "Escaped": 'Quote "\n'}
+    original_structure_dict = _copy.deepcopy(structure_dict)
+    _structurefile.store_structure_dict(file_path, structure_dict, compressed=compressed)
+
+    indent, separators = (None, (",", ":")) if compressed else (2, (",", ": "))
+    expected_json = _json.dumps(_utils.get_ordered_dict(_copy.deepcopy(structure_dict)), indent=indent, separators=separators)
+    assert file_path.read_text() == expected_json
+    assert structure_dict == original_structure_dict
+    assert structure_dict["entities"]["Test"]["Names"] == ["b", "ä", "a"]
+    assert [path.name for path in tmp_path.iterdir()] == [file_path.name]
@@ -0,0 +1,83 @@
+from xml.etree import ElementTree as _ElementTree
+
+import pytest
+import src.pss_api_parser.backend.datatypes as _datatypes
+import src.pss_api_parser.backend.xmlinference as _xmlinference
+
+
+def convert_element_tree(root: _ElementTree.Element) -> dict:
+    # Converts an element tree the way the parser did before streaming the XML
+    result = {}
+    if root.attrib:
+        result["properties"] = {key: _datatypes.determine_data_type(value) for key, value in root.attrib.items()}
+    for child in root:
+        child_dict = convert_element_tree(child)
+        if child.tag in result:
+            result[child.tag]["properties"] = _datatypes.merge_type_dictionaries(result[child.tag]["properties"], child_dict[child.tag]["properties"])
+        else:
+            result[child.tag] = child_dict[child.tag]
+    return {root.tag: result}
+
+
+@pytest.mark.parametrize(
+    "xml",
+    [
+        "<A/>",
+        '<A a="1"/>',
+        '<A><B b="1"/><B b="x" c=""/><B c="2.5"/></A>',
+        '<A><B b=""/><B b="1"/><B b="true"/></A>',
+        '<A a="1"><B b="1"><C c="1"/><C c="2.5"/></B><B b="2"><D d="x"/></B></A>',
+        '<A><B b="1"><C c="1"/></B><E e="2023-03-17T09:46:40"/><B b="1.5"><C c="x"/></B></A>',
+        '<A><B b="1"/><B b="2" c="3"/></A>',
+    ],
+)
+def test_infer_xml_structure__matches_element_tree(xml: str):
+    expected = convert_element_tree(_ElementTree.fromstring(xml))
+    assert _xmlinference.infer_xml_structure(xml) == expected
+    assert _xmlinference.infer_xml_structure(xml.encode("utf-8")) == expected
+
+
+@pytest.mark.parametrize(
+    "xml",
+    [
+        "",
+        "<A>",
+        "<A></B>",
+    ],
+)
+def test_infer_xml_structure__malformed(xml: str):
+    with pytest.raises(_ElementTree.ParseError):
+        _xmlinference.infer_xml_structure(xml)
+
+
+@pytest.mark.parametrize("stable_row_count", [None, 2])
+@pytest.mark.parametrize(
+    "xml, expected",
+    [
+        ("<A><B/><B/></A>", {"A": {"B": {}}}),
+        ('<A><B/><B b="1"/><B/></A>', {"A": {"B": {"properties": {"b": "int"}}}}),
+        ('<A><B b="1"/><B/><B b="x"/></A>', {"A": {"B": {"properties": {"b": "str"}}}}),
+        ('<A><B><C c="1"/></B><B/></A>', {"A": {"B": {"C": {"properties": {"c": "int"}}}}}),
+    ],
+)
+def test_infer_xml_structure__repeated_sibling_without_attributes(xml: str, expected: dict, stable_row_count):
+    assert _xmlinference.infer_xml_structure(xml, stable_row_count=stable_row_count) == expected
+
+
+def test_infer_xml_structure__large_document():
+    rows = "".join(f'<Row Id="{i}" Name="Row {i}" Value="{i}.5" Flag="{i % 2 == 0}"/>' for i in range(20000))
+    xml = f'<Response><List Count="20000">{rows}</List></Response>'
+    assert _xmlinference.infer_xml_structure(xml) == convert_element_tree(_ElementTree.fromstring(xml))
+
+
+def test_infer_xml_structure__stable_row_count():
+    rows = "".join(f'<Row Id="{i}" Value="{i}"/>' for i in range(10))
+    xml = f'<A>{rows}<Row Id="10" Value="10.5"/><Row Id="11" Value="11" Extra="x"/><Row Id="12" Value="12" Empty=""/><Row Id="13" Value="13" Empty="y"/></A>'
+
+    exact = _xmlinference.infer_xml_structure(xml)
+    assert exact["A"]["Row"]["properties"] == {"Id": "int", "Value": "float", "Extra": "str", "Empty": "str"}
+    assert _xmlinference.infer_xml_structure(xml, stable_row_count=20) == exact
+
+    # The type of 'Value' has converged before the last rows, but new attributes and first values for untyped attributes are still picked up
+    converged = _xmlinference.infer_xml_structure(xml, stable_row_count=5)
+    assert converged["A"]["Row"]["properties"] == {"Id": "int", "Value": "int", "Extra": "str", "Empty": "str"}